@@ -46,7 +46,10 @@ from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 import veles.error as error
 from veles.memory import reshape, Array
 import veles.ocl_blas as ocl_blas
-from veles.znicz.nn_units import FullyConnectedOutput, NNLayerBase
+from veles.znicz.mixed_precision import compute_dtype, storage_dtype
+from veles.znicz.nn_units import FullyConnectedOutput, NNLayerBase, \
+    scratch_pool
+from veles.znicz.numpy_kernels import apply_bias_with_activation, softmax
 
 
 @implementer(IOpenCLUnit, ICUDAUnit, INumpyUnit)
@@ -88,6 +91,7 @@ class All2All(FullyConnectedOutput, NNLayerBase):
     __id__ = "58a5eadf-ae1e-498f-bf35-7d93939c4c86"
 
     MAPPING = {"all2all"}
+    QUANTIZABLE = True
 
     C = 10
 
@@ -161,8 +165,8 @@ class All2All(FullyConnectedOutput, NNLayerBase):
         self.weights_shape = (self.neurons_number, self.input.sample_size)
         weights_shape_t = tuple(reversed(self.weights_shape))
         if not self.weights:
-            self.weights.reset(numpy.zeros(self.weights_shape,
-                                           dtype=self.input.dtype))
+            self.weights.reset(numpy.zeros(
+                self.weights_shape, dtype=compute_dtype(self.input.dtype)))
             self.fill_array(self.weights_filling, self.weights.mem,
                             self.weights_stddev)
             if self.weights_transposed:
@@ -175,7 +179,7 @@ class All2All(FullyConnectedOutput, NNLayerBase):
             # Check that bias was not assigned from the outside
             if not self.bias:
                 self.bias.reset(numpy.zeros(
-                    self.neurons_number, self.input.dtype))
+                    self.neurons_number, compute_dtype(self.input.dtype)))
                 self.fill_array(self.bias_filling, self.bias.mem,
                                 self.bias_stddev)
             else:
@@ -190,7 +194,8 @@ class All2All(FullyConnectedOutput, NNLayerBase):
         if self.output:
             assert self.output.shape[1:] == self.output_shape[1:]
         if not self.output or self.output_shape[0] != self.output.shape[0]:
-            self.output.reset(numpy.zeros(self.output_shape, self.input.dtype))
+            self.output.reset(numpy.zeros(
+                self.output_shape, storage_dtype(self.input.dtype)))
 
     def _gpu_init(self, blas_class):
         dtype = self.input.dtype
@@ -260,12 +265,28 @@ class All2All(FullyConnectedOutput, NNLayerBase):
         self.input.map_read()
         self.weights.map_read()
         self.bias.map_read()
-        mem = numpy.dot(self.input.matrix,
-                        self.weights.mem if self.weights_transposed
-                        else self.weights.mem.transpose())
-        if self.include_bias:
-            mem += self.bias.mem
-        reshape(self.output.mem, mem.shape)[:] = mem[:]
+        weights = (self.weights.mem if self.weights_transposed
+                   else self.weights.mem.transpose())
+        output = reshape(self.output.mem, (self.input.shape[0],
+                                           weights.shape[1]))
+        if output.dtype == weights.dtype:
+            result = output
+        else:
+            # mixed precision: computed in the precision of the weights
+            result = scratch_pool(self.workflow).get(
+                (id(self), "output"), output.shape, weights.dtype)
+        if self.quantization is not None:
+            self.quantization.dot(
+                self.input.matrix, result, scratch_pool(self.workflow).get(
+                    (id(self), "int8_input"), self.input.matrix.shape,
+                    result.dtype))
+        else:
+            numpy.dot(self.input.matrix, weights, result)
+        apply_bias_with_activation(
+            result, self.bias.mem if self.include_bias else None,
+            self.activation_mode)
+        if result is not output:
+            numpy.copyto(output, result)
 
 
 class All2AllTanh(All2All):
@@ -284,16 +305,6 @@ class All2AllTanh(All2All):
         self.output.max_supposed = All2AllTanh.A
         return retval
 
-    def numpy_run(self):
-        """Forward propagation from batch on CPU only.
-        """
-        super(All2AllTanh, self).numpy_run()
-        self.output.map_write()
-        mem = self.output.mem
-        mem *= All2AllTanh.B
-        numpy.tanh(mem, mem)
-        mem *= All2AllTanh.A
-
 
 class All2AllRELU(All2All):
     """All2All with RELU activation f(x) = log(1.0 + exp(x)).
@@ -308,14 +319,6 @@ class All2AllRELU(All2All):
         self.output.max_supposed = 10
         return retval
 
-    def numpy_run(self):
-        """Forward propagation from batch on CPU only.
-        """
-        super(All2AllRELU, self).numpy_run()
-        self.output.map_write()
-        mem = self.output.mem
-        mem[:] = numpy.where(mem > 15, mem, numpy.log(numpy.exp(mem) + 1.0))
-
 
 class All2AllStrictRELU(All2All):
     """All2All with RELU activation f(x) = max(x, 0).
@@ -331,14 +334,6 @@ class All2AllStrictRELU(All2All):
         self.output.max_supposed = 10
         return retval
 
-    def numpy_run(self):
-        """Forward propagation from batch on CPU only.
-        """
-        super(All2AllStrictRELU, self).numpy_run()
-        self.output.map_write()
-        mem = self.output.mem
-        numpy.clip(mem, 0.0, 1.0e30, mem)
-
 
 class All2AllSigmoid(All2All):
     """All2All with Sigmoid activation f(x) = 1 / (1 + exp(-x)).
@@ -356,16 +351,6 @@ class All2AllSigmoid(All2All):
         self.output.supposed_max_value = 1
         return retval
 
-    def numpy_run(self):
-        """Forward propagation from batch on CPU only.
-        """
-        super(All2AllSigmoid, self).numpy_run()
-        self.output.map_write()
-        mem = self.output.mem
-        # 1 / (1 + numpy.exp(-mem))
-        numpy.exp(-mem, mem)
-        numpy.reciprocal(mem + 1, mem)
-
 
 class All2AllSoftmax(All2All):
     """All2All with linear activation and softmax normalization.
@@ -420,15 +405,8 @@ class All2AllSoftmax(All2All):
         self.output.map_write()
         self.max_idx.map_invalidate()
         out = self.output.mem
-        out = reshape(out, (out.shape[0], out.size // out.shape[0]))
-        for i, sample in enumerate(out):
-            im = sample.argmax()
-            self.max_idx[i] = im
-            m = sample[im]
-            sample -= m
-            numpy.exp(sample, sample)
-            smm = sample.sum()
-            sample /= smm
+        softmax(reshape(out, (out.shape[0], out.size // out.shape[0])),
+                self.max_idx.mem)
 
     def ocl_apply_exp(self):
         self.unmap_vectors(self.output, self.max_idx)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Health statistics of the arrays for logging: min, max, mean, standard
+deviation and the numbers of NaN and Inf values, computed in a single pass
+over the chunks of the array. Each chunk fits in the cache and needs only
+the scratch of its own size, instead of the full boolean temporaries of
+numpy.isnan() and numpy.isinf(). The huge arrays may be sampled.
+
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from __future__ import division
+from collections import namedtuple
+import math
+import numpy
+
+
+#: The number of elements processed at once.
+CHUNK_SIZE = 1 << 16
+
+
+class ArrayStats(namedtuple("ArrayStats", ("count", "min", "max", "mean",
+                                           "std", "nans", "infs",
+                                           "sampled"))):
+    """Statistics of the array. min, max, mean and std are calculated over
+    the finite values and are NaN if there are none.
+
+    Attributes:
+        count: the number of the examined elements.
+        nans: the number of NaN values.
+        infs: the number of infinite values.
+        sampled: only every n-th element was examined.
+    """
+    __slots__ = ()
+
+    @property
+    def is_finite(self):
+        return self.nans == 0 and self.infs == 0
+
+
+def _flat_chunks(array, chunk_size):
+    if array.flags.c_contiguous:
+        flat = array.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            yield flat[start:start + chunk_size]
+    else:
+        # copies only a chunk at a time
+        for start in range(0, array.size, chunk_size):
+            yield array.flat[start:start + chunk_size]
+
+
+def is_finite(array):
+    """Returns True if the array has neither NaN nor Inf. It is faster than
+    :func:`compute_stats()`: the values are only summed unless the sum is
+    not finite.
+    """
+    array = numpy.asarray(array)
+    if not numpy.issubdtype(array.dtype, numpy.inexact):
+        return True
+    with numpy.errstate(over="ignore", invalid="ignore"):
+        total = array.sum(dtype=numpy.complex128
+                          if numpy.iscomplexobj(array) else numpy.float64)
+    if numpy.isfinite(total):
+        return True
+    # the sum may overflow
+    return bool(numpy.isfinite(array).all())
+
+
+def compute_stats(array, sample_size=None, chunk_size=CHUNK_SIZE):
+    """Calculates :class:`ArrayStats` of the array in one pass. The complex
+    numbers are treated as pairs of the real values.
+
+    :param array: numpy array.
+    :param sample_size: if the array is larger, only every n-th element \
+        is examined so that there are about sample_size of them.
+    :param chunk_size: the number of elements processed at once.
+    """
+    array = numpy.asarray(array)
+    if numpy.iscomplexobj(array):
+        array = numpy.ascontiguousarray(array).view(array.real.dtype)
+    sampled = sample_size is not None and array.size > sample_size
+    if sampled:
+        # copies only the sampled elements
+        array = array.flat[::-(-array.size // sample_size)]
+    inexact = numpy.issubdtype(array.dtype, numpy.inexact)
+    count = nans = infs = 0
+    total = squares = 0.0
+    vmin = vmax = None
+    mask = numpy.empty(min(array.size, chunk_size), bool)
+    for chunk in _flat_chunks(array, chunk_size):
+        if not inexact:
+            chunk = chunk.astype(numpy.float64)
+        chunk_sum = float(chunk.sum(dtype=numpy.float64))
+        if not math.isinf(chunk_sum) and not math.isnan(chunk_sum):
+            finite = chunk
+        else:
+            chunk_mask = mask[:chunk.size]
+            nans += int(numpy.count_nonzero(
+                numpy.isnan(chunk, out=chunk_mask)))
+            infs += int(numpy.count_nonzero(
+                numpy.isinf(chunk, out=chunk_mask)))
+            finite = chunk[numpy.isfinite(chunk, out=chunk_mask)]
+            if finite.size == 0:
+                continue
+            chunk_sum = float(finite.sum(dtype=numpy.float64))
+        count += finite.size
+        total += chunk_sum
+        # the squares of float16 and float32 overflow early
+        wide = finite if finite.dtype.itemsize >= 8 else \
+            finite.astype(numpy.float64)
+        squares += float(numpy.dot(wide, wide))
+        cmin, cmax = finite.min(), finite.max()
+        vmin = cmin if vmin is None else min(vmin, cmin)
+        vmax = cmax if vmax is None else max(vmax, cmax)
+    if count == 0:
+        nan = float("nan")
+        return ArrayStats(nans + infs, nan, nan, nan, nan, nans, infs,
+                          sampled)
+    mean = total / count
+    std = math.sqrt(max(squares / count - mean * mean, 0.0))
+    return ArrayStats(count + nans + infs, float(vmin), float(vmax), mean,
+                      std, nans, infs, sampled)
@@ -39,7 +39,6 @@ under the License.
 from __future__ import division
 
 import cuda4py.blas as cublas
-import math
 from math import pi
 import numpy
 import time
@@ -48,10 +47,13 @@ from zope.interface import implementer
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 from veles.compat import from_none
 import veles.error as error
-from veles.memory import reshape_transposed
+from veles.memory import reshape
 from veles.units import Unit
 import veles.ocl_blas as ocl_blas
+from veles.znicz.mixed_precision import compute_dtype, storage_dtype
 import veles.znicz.nn_units as nn_units
+from veles.znicz.numpy_kernels import ConvolutionUnpacker, \
+    apply_bias_with_activation
 
 
 class ConvolutionalBase(Unit):
@@ -104,7 +106,10 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
                             not a shape.
     """
 
+    __id__ = "9434b459-b8c3-4775-b833-cd2944a4b34f"
+
     MAPPING = {"conv"}
+    QUANTIZABLE = True
 
     def __init__(self, workflow, **kwargs):
         super(Conv, self).__init__(workflow, **kwargs)
@@ -120,7 +125,7 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
         self.sliding = tuple(kwargs.get("sliding", (1, 1)))  # X Y
         self.activation_mode = "ACTIVATION_LINEAR"
         self.exports.extend(("activation_mode", "kx", "ky", "n_kernels",
-                             "padding", "sliding"))
+                             "padding", "sliding", "input_sample_shape"))
         self._global_size = None
         self._local_size = None
 
@@ -175,7 +180,8 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
         if self.output:
             assert self.output.shape[1:] == output_shape[1:]
         if not self.output or output_shape[0] != self.output.shape[0]:
-            self.output.reset(numpy.zeros(output_shape, self.input.dtype))
+            self.output.reset(numpy.zeros(
+                output_shape, storage_dtype(self.input.dtype)))
 
         assert self._kernel_app_per_image * self.n_kernels == \
             self.output.sample_size
@@ -312,6 +318,12 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
             self.np_one, self.weights.devmem, unpack_data,
             self.np_zero, self.output.devmem, offsetC=output_offs)
 
+    def numpy_init(self):
+        self._unpacker_ = ConvolutionUnpacker(
+            self.input.shape[1:], self.kx, self.ky, self.padding,
+            self.sliding, min(self.unpack_size, self._batch_size),
+            compute_dtype(self.input.dtype))
+
     def numpy_run(self):
         """Forward propagation from batch on CPU only.
         """
@@ -320,44 +332,36 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
         self.bias.map_read()
         self.output.map_invalidate()
 
-        sx_full = self.padding[0] + self._sx + self.padding[2]
-        sy_full = self.padding[1] + self._sy + self.padding[3]
-        nx = (sx_full - self.kx) // self.sliding[0] + 1
-        ny = (sy_full - self.ky) // self.sliding[1] + 1
-
-        weights = (reshape_transposed(self.weights.mem)
-                   if self.weights_transposed else self.weights.mem)
-
-        assert self.kx >= 0 and self.ky >= 0
-        for batch, _ in ((batch, ch)
-                         for batch in range(self._batch_size)
-                         for ch in range(self._n_channels)):
-            for k, kernel in enumerate(weights):
-                for i, j in ((i, j) for i in range(ny) for j in range(nx)):
-                    full_i1 = i * self.sliding[1]
-                    full_i2 = full_i1 + self.ky
-                    full_j1 = j * self.sliding[0]
-                    full_j2 = full_j1 + self.kx
-                    in_i1 = min(max(full_i1 - self.padding[1], 0), self._sy)
-                    in_i2 = min(max(full_i2 - self.padding[1], 0), self._sy)
-                    in_j1 = min(max(full_j1 - self.padding[0], 0), self._sx)
-                    in_j2 = min(max(full_j2 - self.padding[0], 0), self._sx)
-                    cut_i1, cut_i2 = (in_i1 - full_i1 + self.padding[1],
-                                      in_i2 - full_i1 + self.padding[1])
-                    cut_j1, cut_j2 = (in_j1 - full_j1 + self.padding[0],
-                                      in_j2 - full_j1 + self.padding[0])
-                    if in_i2 - in_i1 > 0 or in_j2 - in_j1 > 0:
-                        cut = self.input.mem[batch, in_i1:in_i2, in_j1:in_j2]
-                        kernel_3d = kernel.reshape(self.ky, self.kx,
-                                                   self._n_channels)
-                        cutted_kernel = kernel_3d[cut_i1:cut_i2,
-                                                  cut_j1:cut_j2, :]
-                        assert cut.size == cutted_kernel.size
-                        conv = numpy.sum(numpy.multiply(cut.ravel(),
-                                                        cutted_kernel.ravel()))
-                        self.output.mem[batch, i, j, k] = conv
+        weights = (self.weights.mem if self.weights_transposed
+                   else self.weights.mem.transpose())
+        output = reshape(self.output.mem, (
+            self._batch_size * self._kernel_app_per_image, self.n_kernels))
+        if output.dtype == weights.dtype:
+            result = output
+        else:
+            # mixed precision: computed in the precision of the weights
+            result = nn_units.scratch_pool(self.workflow).get(
+                (id(self), "output"), output.shape, weights.dtype)
+        unpack_size = self._unpacker_.unpack_size
+        for i in range(0, self._batch_size, unpack_size):
+            image_count = min(self._batch_size - i, unpack_size)
+            unpack_data = self._unpacker_.unpack(
+                self.input.mem[i:i + image_count])
+            out = result[i * self._kernel_app_per_image:
+                         (i + image_count) * self._kernel_app_per_image]
+            if self.quantization is not None:
+                buffer = nn_units.scratch_pool(self.workflow).get(
+                    (id(self), "int8_input"),
+                    (unpack_size * self._kernel_app_per_image,
+                     unpack_data.shape[1]), out.dtype)
+                self.quantization.dot(
+                    unpack_data, out, buffer[:unpack_data.shape[0]])
+            else:
+                numpy.dot(unpack_data, weights, out=out)
         # add bias and apply activation function
-        self.apply_activation()
+        self.apply_activation(result)
+        if result is not output:
+            numpy.copyto(output, result)
 
     def run(self):
         t1 = time.time()
@@ -366,12 +370,13 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
             return retval
         self.print_debug_data(t1)
 
-    def apply_activation(self):
-        """Add bias and apply linear activation function.
+    def apply_activation(self, output=None):
+        """Add bias and apply activation function.
         """
-        assert self.activation_mode == "ACTIVATION_LINEAR"
-        if self.include_bias:
-            self.output.mem += self.bias.mem
+        apply_bias_with_activation(
+            self.output.mem if output is None else output,
+            self.bias.mem if self.include_bias else None,
+            self.activation_mode)
 
     def _fill_array(self, filling_type, mem, stddev):
         if filling_type == "uniform":
@@ -396,8 +401,8 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
                               self.kx * self.ky * self._n_channels)
         weights_shape_t = tuple(reversed(self.weights_shape))
         if not self.weights:
-            self.weights.reset(numpy.zeros(self.weights_shape,
-                                           dtype=self.input.dtype))
+            self.weights.reset(numpy.zeros(
+                self.weights_shape, dtype=compute_dtype(self.input.dtype)))
             self._fill_array(self.weights_filling, self.weights.mem,
                              self.weights_stddev)
             if self.weights_transposed:
@@ -416,7 +421,8 @@ class Conv(ConvolutionalBase, nn_units.NNLayerBase):
         if not self.include_bias:
             return
         if not self.bias:
-            self.bias.reset(numpy.zeros(self.n_kernels, self.input.dtype))
+            self.bias.reset(numpy.zeros(
+                self.n_kernels, compute_dtype(self.input.dtype)))
             self._fill_array(self.bias_filling, self.bias.mem,
                              self.bias_stddev)
         else:
@@ -480,6 +486,8 @@ class ConvTanh(Conv):
         :math:`f(x) = 1.7159 \\tanh(0.6666 x)`.
     """
 
+    __id__ = "77354eef-428b-4fca-bc96-74ca3d620ccf"
+
     MAPPING = {"conv_tanh"}
 
     def initialize(self, device, **kwargs):
@@ -487,21 +495,14 @@ class ConvTanh(Conv):
         super(ConvTanh, self).initialize(device=device, **kwargs)
         self.output.max_supposed = 1.7159
 
-    def apply_activation(self):
-        """Add bias and apply tanh activation function.
-        """
-        assert self.activation_mode == "ACTIVATION_TANH"
-        for k in range(self.n_kernels):
-            for x in numpy.nditer(self.output.mem[:, :, :, k],
-                                  op_flags=['readwrite']):
-                x[...] = math.tanh((x + self.bias.mem[k]) * 0.6666) * 1.7159
-
 
 class ConvSigmoid(Conv):
     """Conv with Sigmoid activation \
         :math:`f(x) = 1.0 / (1.0 + exp(x))`.
     """
 
+    __id__ = "bf139d31-12f3-48ca-b7fa-902a20801fde"
+
     MAPPING = {"conv_sigmoid"}
 
     def initialize(self, device, **kwargs):
@@ -509,20 +510,13 @@ class ConvSigmoid(Conv):
         super(ConvSigmoid, self).initialize(device=device, **kwargs)
         self.output.max_supposed = 1.0
 
-    def apply_activation(self):
-        """Add bias and apply sigmoid activation function.
-        """
-        assert self.activation_mode == "ACTIVATION_SIGMOID"
-        for k in range(self.n_kernels):
-            for x in numpy.nditer(self.output.mem[:, :, :, k],
-                                  op_flags=['readwrite']):
-                x[...] = 1.0 / (1.0 + math.exp(-(x + self.bias.mem[k])))
-
 
 class ConvRELU(Conv):
     """Conv with smooth RELU activation :math:`f(x) = \\log(1 + \\exp(x))`.
     """
 
+    __id__ = "222cafaf-423f-4330-8f29-62ebf32d90e9"
+
     MAPPING = {"conv_relu"}
 
     def initialize(self, device, **kwargs):
@@ -530,19 +524,6 @@ class ConvRELU(Conv):
         super(ConvRELU, self).initialize(device=device, **kwargs)
         self.output.max_supposed = 10
 
-    def apply_activation(self):
-        """Add bias and apply RELU activation function.
-        """
-        assert self.activation_mode == "ACTIVATION_RELU"
-        for k in range(self.n_kernels):
-            for x in numpy.nditer(self.output.mem[:, :, :, k],
-                                  op_flags=['readwrite']):
-                tmp_val = x + self.bias.mem[k]
-                if tmp_val > 15:
-                    x[...] = tmp_val
-                else:
-                    x[...] = math.log(math.exp(tmp_val) + 1)
-
 
 class ConvStrictRELU(Conv):
     """
@@ -550,19 +531,11 @@ class ConvStrictRELU(Conv):
     (Just like in CAFFE)
     """
 
+    __id__ = "1c226f63-1d2c-400d-828e-07f47596b033"
+
     MAPPING = {"conv_str"}
 
     def initialize(self, device, **kwargs):
         self.activation_mode = "ACTIVATION_STRICT_RELU"
         super(ConvStrictRELU, self).initialize(device=device, **kwargs)
         self.output.max_supposed = 10
-
-    def apply_activation(self):
-        """Add bias and apply STRICT_RELU activation function.
-        """
-        assert self.activation_mode == "ACTIVATION_STRICT_RELU"
-        for k in range(self.n_kernels):
-            for x in numpy.nditer(self.output.mem[:, :, :, k],
-                                  op_flags=['readwrite']):
-                tmp_val = x + self.bias.mem[k]
-                x[...] = numpy.where(numpy.greater(tmp_val, 0), tmp_val, 0)
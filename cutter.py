@@ -42,6 +42,7 @@ from zope.interface import implementer
 
 from veles.accelerated_units import (
     AcceleratedUnit, IOpenCLUnit, ICUDAUnit, INumpyUnit)
+from veles.backends import NumpyDevice
 
 import veles.error as error
 from veles.memory import Array, reshape
@@ -89,6 +90,7 @@ class CutterBase(Unit):
 
 @implementer(IOpenCLUnit, ICUDAUnit, INumpyUnit)
 class Cutter(nn_units.Forward, CutterBase):
+    __id__ = "5c1750fe-4133-483e-91a0-61922db2cf34"
     MAPPING = {"cutter"}
     """Cuts rectangular area from an input.
 
@@ -104,10 +106,18 @@ class Cutter(nn_units.Forward, CutterBase):
     Attributes:
         input: input as batch of samples.
         output: output as batch of samples.
+        zero_copy: on CPU, output is the view of input if the cut area is \
+                   contiguous (e.g., only the rows are cut from \
+                   a single sample), so nothing is copied in run().
     """
     def __init__(self, workflow, **kwargs):
         super(Cutter, self).__init__(workflow, **kwargs)
-        self.exports.append("padding")
+        self.zero_copy = kwargs.get("zero_copy", False)
+        self.exports.extend(("padding", "input_sample_shape"))
+
+    def init_unpickled(self):
+        super(Cutter, self).init_unpickled()
+        self._is_view_ = False
 
     def initialize(self, device, **kwargs):
         if not self.input or len(self.input.shape) != 4:
@@ -126,16 +136,30 @@ class Cutter(nn_units.Forward, CutterBase):
             raise error.BadFormatError("Resulted output shape is empty")
         self.output_shape = shape
 
-        if self.output:
-            assert self.output.shape[1:] == self.output_shape[1:]
-        if not self.output or self.output.shape[0] != self.output_shape[0]:
-            self.output.reset(numpy.zeros(self.output_shape, self.input.dtype))
+        was_view = self._is_view_
+        view = self._input_view()
+        self._is_view_ = (self.zero_copy and view.flags.c_contiguous and
+                          isinstance(self.device, NumpyDevice))
+        if self._is_view_:
+            self.output.reset(view)
+        else:
+            if self.output and not was_view:
+                assert self.output.shape[1:] == self.output_shape[1:]
+            if (not self.output or was_view or
+                    self.output.shape[0] != self.output_shape[0]):
+                self.output.reset(numpy.zeros(self.output_shape,
+                                              self.input.dtype))
 
         for vec in self.input, self.output:
             vec.initialize(self.device)
 
         self.create_stuff("src")
 
+    def _input_view(self):
+        return self.input.mem[
+            :, self.padding[1]:self.padding[1] + self.output_shape[1],
+            self.padding[0]:self.padding[0] + self.output_shape[2], :]
+
     def ocl_init(self):
         pass
 
@@ -164,13 +188,13 @@ class Cutter(nn_units.Forward, CutterBase):
     def numpy_run(self):
         """Forward propagation from batch on CPU only.
         """
+        if self._is_view_:
+            self.input.map_read()
+            return
         self.output.map_invalidate()
         self.input.map_read()
         out = reshape(self.output.mem, self.output_shape)
-        inp = self.input.mem
-        out[:, :, :, :] = inp[
-            :, self.padding[1]:self.padding[1] + self.output_shape[1],
-            self.padding[0]:self.padding[0] + self.output_shape[2], :]
+        out[:, :, :, :] = self._input_view()
 
 
 @implementer(IOpenCLUnit, ICUDAUnit, INumpyUnit)
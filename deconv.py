@@ -44,10 +44,11 @@ from zope.interface import implementer
 from veles.config import root
 from veles.compat import from_none
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
-from veles.memory import Array
+from veles.memory import Array, reshape
 import veles.ocl_blas as ocl_blas
 from veles.znicz.conv import ConvolutionalBase
 import veles.znicz.nn_units as nn_units
+from veles.znicz.numpy_kernels import ConvolutionUnpacker
 from veles.distributable import TriviallyDistributable
 
 
@@ -344,5 +345,44 @@ class Deconv(TriviallyDistributable, ConvolutionalBase, nn_units.Forward):
         self.execute_kernel(self._global_size_pack(limit),
                             self._local_size_pack, self.krn_pack_)
 
+    def numpy_init(self):
+        self._unpacker_ = ConvolutionUnpacker(
+            self._output_shape[1:], self.kx, self.ky, self.padding,
+            self.sliding, min(self.unpack_size, self._output_shape[0]),
+            self._dtype)
+        assert (self._unpacker_.kernel_app_per_image ==
+                self._kernel_app_per_image)
+        if not self.hits:
+            self._hits_ = (self.kx // self.sliding[0]) * (
+                self.ky // self.sliding[1])
+            return
+        # hits depend only on the geometry, so count them once
+        ones = self._unpacker_.workspace(1)
+        ones[:] = 1
+        hits = numpy.zeros((1,) + self._output_shape[1:], dtype=self._dtype)
+        self._unpacker_.pack(ones, hits)
+        self.hits.map_invalidate()
+        self.hits.mem[:] = hits
+        self._hits_ = numpy.maximum(hits, 1)
+
     def numpy_run(self):
-        raise NotImplementedError()
+        self.input.map_read()
+        self.weights.map_read()
+        self.output.map_invalidate()
+
+        weights = (self.weights.mem.transpose() if self.weights_transposed
+                   else self.weights.mem)
+        inp = reshape(self.input.mem, (self._kernel_app_total,
+                                       self.n_kernels))
+        self.output.mem[:] = 0
+        batch_size = self.output.shape[0]
+        unpack_size = self._unpacker_.unpack_size
+        for i in range(0, batch_size, unpack_size):
+            image_count = min(batch_size - i, unpack_size)
+            unpack_data = self._unpacker_.workspace(image_count)
+            numpy.dot(inp[i * self._kernel_app_per_image:
+                          (i + image_count) * self._kernel_app_per_image],
+                      weights, out=unpack_data)
+            self._unpacker_.pack(unpack_data,
+                                 self.output.mem[i:i + image_count])
+        self.output.mem /= self._hits_
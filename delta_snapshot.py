@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Delta snapshots of the workflows. The workflow is pickled as usual, except
+that the big numpy arrays are replaced with the digests of their contents.
+The arrays themselves are stored in the snapshot files of the chain: the
+base snapshot holds all of them, and each delta after it holds only the
+arrays which are not in the chain yet, e.g. the updated weights, while the
+unchanged loader data and the rest are referenced. Every snapshot refers
+to its parent, so any of them is restored by walking the chain back to
+the base as far as the missing arrays require.
+
+The object is pickled by :meth:`DeltaChain.prepare()`, which optionally
+copies the arrays, while the arrays are hashed and written by
+:meth:`Snapshot.save()`, so the latter may run on another thread.
+
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import hashlib
+import os
+import pickle
+from six import BytesIO
+
+import numpy
+
+import veles.error as error
+
+
+FORMAT = "delta"
+VERSION = 2
+SUFFIX = ".delta.pickle"
+#: The arrays smaller than this are pickled inline.
+MIN_ARRAY_SIZE = 64 * 1024
+
+
+def digest(array):
+    """Returns the key of the contents, the dtype and the shape of the
+    array.
+    """
+    sha = hashlib.sha1()
+    sha.update(("%s%s" % (array.dtype.str, array.shape)).encode("ascii"))
+    sha.update(numpy.ascontiguousarray(array).data)
+    return sha.hexdigest()
+
+
+class _DeltaPickler(pickle.Pickler):
+    def __init__(self, fout, protocol, min_array_size, copy):
+        pickle.Pickler.__init__(self, fout, protocol)
+        self.min_array_size = min_array_size
+        self.copy = copy
+        self.arrays = []
+        self._indices = {}
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, numpy.ndarray) or obj.dtype.hasobject or \
+                obj.nbytes < self.min_array_size:
+            return None
+        # the same array is referenced many times, e.g. by Array and
+        # its linked attributes; the object is kept alive in the cache
+        index = self._indices.get(id(obj), (None,))[0]
+        if index is None:
+            index = len(self.arrays)
+            self._indices[id(obj)] = index, obj
+            self.arrays.append(numpy.array(obj) if self.copy else obj)
+        return index
+
+
+class _DeltaUnpickler(pickle.Unpickler):
+    def __init__(self, fin, arrays, keys, load_parent):
+        pickle.Unpickler.__init__(self, fin)
+        self.arrays = arrays
+        self.keys = keys
+        self.load_parent = load_parent
+
+    def persistent_load(self, pid):
+        if self.keys is not None:
+            pid = self.keys[pid]
+        while pid not in self.arrays:
+            if not self.load_parent():
+                raise error.BadFormatError(
+                    "Array %s was not found in the snapshot chain" % pid)
+        return self.arrays[pid]
+
+
+class DeltaChain(object):
+    """Writes the chain of the delta snapshots.
+
+    Attributes:
+        rebase_interval: the number of deltas after which the next
+                         snapshot is the new base.
+        min_array_size: the arrays of the smaller size in bytes are
+                        pickled inline.
+        base: the file name of the current base snapshot.
+        parent: the file name of the last snapshot in the chain.
+        length: the number of the deltas after the base.
+        digests: the digests of the arrays stored in the chain.
+        files: the file names of the snapshots in the chain.
+    """
+    def __init__(self, rebase_interval=10, min_array_size=MIN_ARRAY_SIZE):
+        self.rebase_interval = rebase_interval
+        self.min_array_size = min_array_size
+        self.rebase()
+
+    def rebase(self):
+        """Makes the next snapshot the base.
+        """
+        self.base = None
+        self.parent = None
+        self.length = 0
+        self.digests = set()
+        self.files = set()
+
+    def prepare(self, obj, file_name, copy=False,
+                protocol=pickle.HIGHEST_PROTOCOL):
+        """Pickles the next snapshot of obj, except the arrays. The
+        snapshots must be saved in the order they are prepared, and unless
+        the arrays are copied, before the arrays change.
+
+        :param copy: copy the arrays, so that obj may change before the \
+            snapshot is saved.
+        :return: :class:`Snapshot` to save.
+        """
+        buffer = BytesIO()
+        pickler = _DeltaPickler(buffer, protocol, self.min_array_size, copy)
+        pickler.dump(obj)
+        return Snapshot(self, file_name, pickler.arrays, buffer.getvalue(),
+                        protocol)
+
+    def write(self, obj, file_name, protocol=pickle.HIGHEST_PROTOCOL):
+        """Writes the next snapshot of obj to file_name.
+
+        :return: tuple (True if it is the base, the number of arrays \
+            written, their size in bytes).
+        """
+        snapshot = self.prepare(obj, file_name, protocol=protocol)
+        snapshot.save()
+        return snapshot.is_base, len(snapshot.arrays), snapshot.size
+
+    def _link(self, file_name):
+        """Returns the parent of the next snapshot, None for the base.
+        """
+        # the snapshot must not overwrite its parents
+        if self.base is not None and (
+                self.length >= self.rebase_interval or
+                os.path.basename(file_name) in self.files):
+            self.rebase()
+        if self.base is None:
+            return None
+        return os.path.basename(self.parent)
+
+    def _append(self, snapshot):
+        if snapshot.is_base:
+            self.base = snapshot.file_name
+        else:
+            self.length += 1
+        self.parent = snapshot.file_name
+        self.files.add(os.path.basename(snapshot.file_name))
+        self.digests.update(snapshot.arrays)
+
+
+class Snapshot(object):
+    """The snapshot prepared by :meth:`DeltaChain.prepare()`.
+
+    Attributes:
+        file_name: the file to write.
+        references: the list of the arrays the pickled object refers to.
+        data: the pickled object.
+        parent: the file name of the parent snapshot, None for the base;
+                it is known after :meth:`save()`.
+        arrays: dict {digest: array} of the arrays which were not in the
+                chain, written by :meth:`save()`.
+    """
+    def __init__(self, chain, file_name, references, data, protocol):
+        self.chain = chain
+        self.file_name = file_name
+        self.references = references
+        self.data = data
+        self.protocol = protocol
+        self.parent = None
+        self.arrays = {}
+
+    @property
+    def is_base(self):
+        return self.parent is None
+
+    @property
+    def size(self):
+        """The size of the written arrays in bytes.
+        """
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def save(self):
+        """Hashes the arrays, writes the snapshot and appends it to the
+        chain.
+        """
+        self.parent = self.chain._link(self.file_name)
+        keys = [digest(array) for array in self.references]
+        self.arrays = {}
+        for key, array in zip(keys, self.references):
+            if key not in self.chain.digests:
+                self.arrays[key] = array
+        header = {"format": FORMAT, "version": VERSION,
+                  "parent": self.parent}
+        tmp_name = self.file_name + ".tmp"
+        with open(tmp_name, "wb") as fout:
+            # the parents are read up to the arrays
+            pickle.dump(header, fout, self.protocol)
+            pickle.dump(self.arrays, fout, self.protocol)
+            pickle.dump(keys, fout, self.protocol)
+            fout.write(self.data)
+        os.rename(tmp_name, self.file_name)
+        self.chain._append(self)
+
+
+def _read_header(fin, file_name):
+    try:
+        header = pickle.load(fin)
+    except (pickle.UnpicklingError, EOFError, ValueError):
+        header = None
+    if not isinstance(header, dict) or header.get("format") != FORMAT or \
+            header.get("version", 0) > VERSION:
+        raise error.BadFormatError(
+            "%s is not a delta snapshot of version %d or older" %
+            (file_name, VERSION))
+    return header
+
+
+def load(file_name):
+    """Restores the object from the delta snapshot file. The parent
+    snapshots are looked up in the same directory.
+    """
+    directory = os.path.dirname(file_name)
+    with open(file_name, "rb") as fin:
+        header = _read_header(fin, file_name)
+        arrays = pickle.load(fin)
+        # version 1 refers to the arrays by their digests
+        keys = pickle.load(fin) if header["version"] > 1 else None
+        parents = [header["parent"]]
+        visited = {os.path.basename(file_name)}
+
+        def load_parent():
+            if parents[0] is None:
+                return False
+            parent = os.path.join(directory, parents[0])
+            if parents[0] in visited:
+                raise error.BadFormatError(
+                    "%s refers to itself in the snapshot chain" % parent)
+            visited.add(parents[0])
+            with open(parent, "rb") as pfin:
+                parents[0] = _read_header(pfin, parent)["parent"]
+                for key, array in pickle.load(pfin).items():
+                    arrays.setdefault(key, array)
+            return True
+
+        return _DeltaUnpickler(fin, arrays, keys, load_parent).load()
@@ -135,7 +135,12 @@ class Depooling(nn_units.Forward):
         self.execute_kernel(self._global_size, self._local_size)
 
     def numpy_run(self):
-        raise NotImplementedError()
+        self.input.map_read()
+        self.output_offset.map_read()
+        self.output.map_invalidate()
+        output = self.output.mem.ravel()
+        output[:] = 0
+        output[self.output_offset.mem.ravel()] = self.input.mem.ravel()
 
     def generate_data_for_slave(self):
         pass
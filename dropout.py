@@ -96,6 +96,7 @@ class DropoutForward(Forward, Dropout):
         self.mask = Array()  # dropout mask
         self.states = Array()
         self.rand = random_generator.get()
+        self.exports.append("input_sample_shape")
         self.demand("minibatch_class")
 
     @Dropout.dropout_ratio.setter
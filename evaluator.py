@@ -45,7 +45,7 @@ from zope.interface import implementer
 from veles.distributable import TriviallyDistributable, IDistributable
 import veles.error as error
 from veles.loader import TEST
-from veles.memory import assert_addr, ravel, Array
+from veles.memory import assert_addr, reshape, Array
 from veles.accelerated_units import AcceleratedUnit, IOpenCLUnit, ICUDAUnit, \
     INumpyUnit
 from veles.normalization import NoneNormalizer
@@ -53,6 +53,8 @@ from veles.opencl_types import numpy_dtype_to_opencl
 from veles.result_provider import IResultProvider
 from veles.unit_registry import MappedUnitRegistry
 from veles.units import Unit, UnitCommandLineArgumentsRegistry
+from veles.znicz.mixed_precision import compute_dtype
+from veles.znicz.numpy_kernels import minibatch_shards
 
 
 class EvaluatorsRegistry(UnitCommandLineArgumentsRegistry,
@@ -114,7 +116,9 @@ class EvaluatorBase(AcceleratedUnit, TriviallyDistributable):
 
         self.krn_constants_i_ = numpy.zeros(1, numpy.int32)
         self.krn_constants_f_ = numpy.zeros(1, dtype)
-        self.err_output.reset(numpy.zeros_like(self.output.mem, dtype))
+        # the errors are not scaled yet, so they are kept in full precision
+        self.err_output.reset(numpy.zeros_like(
+            self.output.mem, compute_dtype(dtype)))
 
         for vec in self.output, self.err_output:
             vec.initialize(self.device)
@@ -276,40 +280,56 @@ class EvaluatorSoftmax(EvaluatorBase):
             vec.map_write()
 
         batch_size = self.batch_size
-        labels = self.labels.mem
-        confusion_matrix = self.confusion_matrix.mem
-
-        n_ok = 0
-        n_total = 0
         multiplier = 1.0 / batch_size if self.mean else 1.0
-        for i in range(batch_size):  # loop by batch
-            if labels[i] < 0:
-                self.err_output.mem[i] = 0.0
-                continue
-            output = ravel(self.output[i])
-            err_output = ravel(self.err_output[i])
-
-            max_idx = self.max_idx[i]
-            confusion_matrix[max_idx, labels[i]] += 1
-            if max_idx == labels[i]:
-                n_ok += 1
-            n_total += 1
+        sample_size = self.output.sample_size
+        labels = self.labels.mem[:batch_size]
+        output = reshape(self.output.mem, (self.output.shape[0],
+                                           sample_size))[:batch_size]
+        err_output = reshape(self.err_output.mem, (self.err_output.shape[0],
+                                                   sample_size))
+        # Set errors for excessive samples to zero
+        err_output[batch_size:] = 0.0
+        err_output = err_output[:batch_size]
+        if batch_size == 0:
+            return
+
+        max_idx = self.max_idx.mem
+        complex_output = err_output.dtype in (numpy.complex64,
+                                              numpy.complex128)
+
+        def evaluate(start, stop):
+            shard = err_output[start:stop]
+            labels_shard = labels[start:stop]
+            labeled = numpy.nonzero(labels_shard >= 0)[0]
+            real = labels_shard[labeled]
+            max_idx_shard = max_idx[start:stop][labeled]
+            confusion = None
+            if self.confusion_matrix:
+                confusion = numpy.bincount(
+                    max_idx_shard * sample_size + real,
+                    minlength=sample_size * sample_size)
+            n_err = stop - start - numpy.count_nonzero(max_idx_shard == real)
 
             # Compute softmax output error gradient
-            err_output[:] = output[:]
-            err_output[labels[i]] -= 1.0
-            err_output *= multiplier
-            if err_output.dtype in (numpy.complex64, numpy.complex128):
-                self.max_err_output_sum[0] = max(
-                    self.max_err_output_sum[0], numpy.linalg.norm(err_output))
+            shard[:] = output[start:stop]
+            shard[labeled, real] -= 1.0
+            shard[labels_shard < 0] = 0.0
+            shard *= multiplier
+            if complex_output:
+                err_sum = numpy.linalg.norm(shard, axis=1).max()
             else:
-                self.max_err_output_sum[0] = max(
-                    self.max_err_output_sum[0], (numpy.fabs(err_output)).sum())
-        # Set errors for excessive samples to zero
-        if batch_size < self.err_output.mem.shape[0]:
-            self.err_output.mem[batch_size:] = 0.0
-        self.n_err[0] += batch_size - n_ok
-        self.n_err[1] += n_total
+                err_sum = numpy.fabs(shard).sum(axis=1).max()
+            return confusion, n_err, labeled.size, err_sum
+
+        partials = minibatch_shards().map(evaluate, batch_size, sample_size)
+        for confusion, n_err, n_labeled, err_sum in partials:
+            if confusion is not None:
+                self.confusion_matrix.mem += confusion.reshape(
+                    sample_size, sample_size)
+            self.max_err_output_sum[0] = max(
+                self.max_err_output_sum[0], err_sum)
+            self.n_err[0] += n_err
+            self.n_err[1] += n_labeled
 
     def get_metric_values(self):
         if self.testing:
@@ -440,7 +460,7 @@ class EvaluatorMSE(EvaluatorBase):
                       self.metrics, self.mse.devmem, self.err_output)
 
         if self.labels and self.class_targets:
-            assert(self.labels.dtype == self.n_err.dtype == numpy.int32)
+            assert (self.labels.dtype == self.n_err.dtype == numpy.int32)
             self.krn_find_closest_ = self.get_kernel("mse_find_closest")
             self.krn_find_closest_.set_args(
                 self.output.devmem,
@@ -501,7 +521,7 @@ class EvaluatorMSE(EvaluatorBase):
         self.err_output.map_invalidate()
         self.mse.map_invalidate()
 
-        assert(self.output.size == self.target.size == self.err_output.size)
+        assert (self.output.size == self.target.size == self.err_output.size)
         batch_size = self.batch_size
         err_output = self.err_output.matrix[:batch_size]
         assert_addr(err_output, self.err_output.mem)
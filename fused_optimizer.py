@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Fused optimizer engine for the CPU (numpy) backend. The weights, the biases,
+their gradients, moments and solver state of all the gradient descent units
+of a workflow are packed into contiguous flat buffers, and a single
+vectorized in-place pass updates every parameter per step. The units keep
+working with their arrays, which become the views into those buffers.
+
+It is enabled with root.common.engine.fused_gd = True.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from __future__ import division
+import numpy
+
+from veles.logger import Logger
+from veles.znicz.numpy_kernels import adjacent_view
+
+
+class FlatGroup(object):
+    """Flat buffers of the units which share the same solver variant.
+
+    Attributes:
+        units: the units packed into the buffers.
+        segments: maps each unit to the slice of its parameters.
+        params: weights and biases of all the units. If they are already
+                adjacent (see :class:`veles.znicz.nn_units.ParameterStore`),
+                this is the view of their memory.
+        gradients: their gradients.
+        moments: their gradients with moments.
+        adagrad: adagrad state or None.
+    """
+
+    def __init__(self, units, dtype, variant_gradient, adagrad_epsilon,
+                 apply_gradient):
+        self.units = tuple(sorted(
+            units, key=lambda unit: unit.weights.mem.ctypes.data))
+        self.dtype = numpy.dtype(dtype)
+        self.variant_gradient = variant_gradient
+        self.adagrad_epsilon = adagrad_epsilon
+        self.apply_gradient = apply_gradient
+        self.segments = {}
+        parts = []
+        size = 0
+        for unit in self.units:
+            start = size
+            for part in FusedOptimizer.parts(unit):
+                parts.append((unit, part, size))
+                size += part[0].size
+            self.segments[unit] = slice(start, size)
+        self.size = size
+        self.gradients, self.moments, self._step, self._temp = (
+            numpy.zeros(size, self.dtype) for _ in range(4))
+        self.params = adjacent_view([part[0].mem for _, part, _ in parts])
+        adopted = self.params is not None and self.params.dtype == self.dtype
+        if not adopted:
+            self.params = numpy.zeros(size, self.dtype)
+        self.adagrad = (numpy.zeros(size, self.dtype)
+                        if adagrad_epsilon is not None else None)
+        # coefficients of each element: -learning rate, L2 and L1 decay,
+        # moment and the factor of the gradient added to the moment
+        self._neg_lr, self._l2, self._l1, self._moment, self._alpha = (
+            numpy.zeros(size, self.dtype) for _ in range(5))
+        self._use_l1 = False
+        self._hyperparams = {}
+        self._views = []
+        buffers = (self.params, self.gradients, self.moments, self.adagrad)
+        for unit, part, offset in parts:
+            for array, flat in zip(part, buffers):
+                if array is None or flat is None:
+                    continue
+                view = flat[offset:offset + part[0].size].reshape(
+                    part[0].shape)
+                if adopted and array is part[0]:
+                    self._views.append((array, array.mem))
+                elif array:
+                    array.map_read()
+                    view[:] = array.mem
+                    array.reset(view)
+                    self._views.append((array, view))
+
+    @property
+    def is_valid(self):
+        """False if any unit replaced its arrays after packing."""
+        return all(array.mem is view for array, view in self._views)
+
+    def update_hyperparams(self):
+        """Refreshes the coefficients of the units whose learning rate,
+        decay or moment has changed since the previous step.
+        """
+        for unit in self.units:
+            hyperparams = (unit.learning_rate, unit.weights_decay,
+                           unit.l1_vs_l2, unit.gradient_moment,
+                           unit.variant_moment_gradient)
+            if self._hyperparams.get(unit) == hyperparams:
+                continue
+            self._hyperparams[unit] = hyperparams
+            lr, factor_l12, l1_vs_l2, moment, variant_moment = hyperparams
+            offset = self.segments[unit].start
+            for part in FusedOptimizer.parts(unit):
+                segment = slice(offset, offset + part[0].size)
+                offset = segment.stop
+                has_moment = bool(part[2])
+                self._neg_lr[segment] = -lr
+                self._l2[segment] = factor_l12 * (1.0 - l1_vs_l2)
+                self._l1[segment] = 0.5 * factor_l12 * l1_vs_l2
+                self._moment[segment] = moment if has_moment else 0
+                self._alpha[segment] = (
+                    1 - moment if has_moment and not variant_moment else 1)
+        self._use_l1 = bool(self._l1.any())
+
+    def update(self, segment=slice(None)):
+        """Applies the solver to the elements of the segment in-place,
+        the same way :meth:`veles.znicz.gd.GradientDescent.numpy_update()`
+        does.
+        """
+        weights, gradient, moment, step, temp = (
+            buf[segment] for buf in (self.params, self.gradients,
+                                     self.moments, self._step, self._temp))
+        neg_lr, l2, l1, moment_factor, alpha = (
+            buf[segment] for buf in (self._neg_lr, self._l2, self._l1,
+                                     self._moment, self._alpha))
+
+        def regularize(value):
+            numpy.multiply(weights, l2, step)
+            numpy.add(step, value, step)
+            if self._use_l1:
+                numpy.sign(weights, temp)
+                numpy.multiply(temp, l1, temp)
+                numpy.add(step, temp, step)
+            numpy.multiply(step, neg_lr, step)
+
+        def add_to_moment(value):
+            numpy.multiply(moment, moment_factor, moment)
+            numpy.multiply(value, alpha, temp)
+            numpy.add(moment, temp, moment)
+
+        if self.variant_gradient:
+            regularize(gradient)
+            add_to_moment(step)
+            result = moment
+        else:
+            add_to_moment(gradient)
+            regularize(moment)
+            result = step
+        if self.adagrad is not None:
+            adagrad = self.adagrad[segment]
+            if result is moment:
+                numpy.copyto(step, moment)
+                result = step
+            numpy.square(moment, temp)
+            adagrad += temp
+            numpy.add(adagrad, self.adagrad_epsilon, temp)
+            result *= numpy.sqrt(temp, temp)
+        if self.apply_gradient:
+            weights += result
+
+
+class FusedOptimizer(Logger):
+    """Updates the parameters of the registered
+    :class:`veles.znicz.gd.GradientDescent` units in the flat buffers.
+
+    Each unit submits itself after its gradients are computed instead of
+    applying them. When all the registered units have submitted, the whole
+    buffers are updated at once. If a unit starts again before that (some
+    units were skipped), only the segments of the submitted units are
+    updated.
+    """
+
+    def __init__(self):
+        super(FusedOptimizer, self).__init__()
+        self._units = []
+        self._groups = None
+        self._pending = set()
+
+    @property
+    def units(self):
+        return tuple(self._units)
+
+    @property
+    def groups(self):
+        """The list of :class:`FlatGroup`, the units are packed on demand.
+        """
+        if self._groups is None or \
+                not all(group.is_valid for group in self._groups):
+            self._groups = self._pack()
+        return self._groups
+
+    @staticmethod
+    def supports(unit):
+        """Returns True if the solver of the unit is element-wise and
+        can be fused.
+        """
+        return (unit.need_gradient_weights and bool(unit.weights) and
+                bool(unit.gradient_weights) and not unit.factor_ortho and
+                not unit.accumulate_gradient and
+                not unit.solvers.intersection(("fast", "adadelta")))
+
+    @staticmethod
+    def parts(unit):
+        """Returns the tuples (parameter, gradient, moment, adagrad state)
+        of the weights and of the bias of the unit.
+        """
+        adagrad = getattr(unit, "adagrad", None)
+        yield (unit.weights, unit.gradient_weights,
+               unit.gradient_weights_with_moment,
+               adagrad.weights if adagrad is not None else None)
+        if unit.include_bias and unit.bias and unit.gradient_bias:
+            yield (unit.bias, unit.gradient_bias,
+                   unit.gradient_bias_with_moment,
+                   adagrad.bias if adagrad is not None else None)
+
+    def register(self, unit):
+        if unit not in self._units:
+            self._units.append(unit)
+        self._groups = None
+        self._pending.discard(unit)
+
+    def unregister(self, unit):
+        if unit in self._units:
+            self._units.remove(unit)
+        self._groups = None
+        self._pending.discard(unit)
+
+    def start(self, unit):
+        """Must be called before the unit computes its gradients: applies
+        the pending ones if they were not applied yet.
+        """
+        if unit in self._pending:
+            self.flush()
+
+    def submit(self, unit):
+        """Marks the gradients of the unit as computed.
+        """
+        self._pending.add(unit)
+        if len(self._pending) == len(self._units):
+            self.flush()
+
+    def discard(self):
+        """Forgets the submitted units without updating them.
+        """
+        self._pending.clear()
+
+    def flush(self):
+        """Updates the parameters of all the submitted units.
+        """
+        pending, self._pending = self._pending, set()
+        if not pending:
+            return
+        for group in self.groups:
+            group.update_hyperparams()
+            if pending.issuperset(group.units):
+                group.update()
+                continue
+            for unit in group.units:
+                if unit in pending:
+                    group.update(group.segments[unit])
+
+    def group_order(self):
+        """Maps the id of the weights of each unit to the index of the group
+        the unit is packed into.
+        """
+        keys, members = self._group_members()
+        return {id(unit.weights): index for index, key in enumerate(keys)
+                for unit in members[key]}
+
+    def _group_members(self):
+        keys = []
+        members = {}
+        for unit in self._units:
+            adagrad = getattr(unit, "adagrad", None)
+            key = (unit.weights.dtype.str, bool(unit.variant_gradient),
+                   adagrad.epsilon if "adagrad" in unit.solvers else None,
+                   bool(unit.apply_gradient))
+            if key not in members:
+                keys.append(key)
+                members[key] = []
+            members[key].append(unit)
+        return keys, members
+
+    def _pack(self):
+        keys, members = self._group_members()
+        groups = [FlatGroup(members[key], *key) for key in keys]
+        self.debug("Packed %d units into %d flat groups of %d parameters",
+                   len(self._units), len(groups),
+                   sum(group.size for group in groups))
+        return groups
+
+
+def fused_optimizer(workflow):
+    """Returns the :class:`FusedOptimizer` shared by the units of the
+    workflow. It is not pickled.
+    """
+    optimizer = getattr(workflow, "fused_optimizer_", None)
+    if optimizer is None:
+        optimizer = workflow.fused_optimizer_ = FusedOptimizer()
+    return optimizer
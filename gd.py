@@ -49,10 +49,13 @@ import cuda4py.blas as cublas
 import numpy
 from zope.interface import implementer
 
+from veles.config import root
 from veles.memory import reshape, Array
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 import veles.ocl_blas as ocl_blas
+from veles.znicz.fused_optimizer import FusedOptimizer, fused_optimizer
 import veles.znicz.nn_units as nn_units
+from veles.znicz.numpy_kernels import sum_rows
 from collections import namedtuple
 
 
@@ -169,6 +172,10 @@ class GradientDescent(nn_units.GradientDescentBase):
 
         self.last_minibatch = kwargs.get("last_minibatch", False)
 
+    def init_unpickled(self):
+        super(GradientDescent, self).init_unpickled()
+        self._fused_optimizer_ = None
+
     def initialize(self, device, **kwargs):
         if not self.input:
             return True
@@ -312,25 +319,42 @@ class GradientDescent(nn_units.GradientDescentBase):
         self._global_size_ortho = (other, 1, 1)
         self._local_size_ortho = (self.reduce_size, 1, 1)
 
-    def moment_use(self, gradient_w_moment, grad):
-        if gradient_w_moment:
-            if self.variant_moment_gradient:
-                gradients = (grad +
-                             gradient_w_moment.mem * self.gradient_moment)
-            else:
-                gradients = (
-                    (1 - self.gradient_moment) * grad +
-                    gradient_w_moment.mem * self.gradient_moment)
-            gradient_w_moment.mem[:] = gradients[:]
+    def moment_use(self, gradient_w_moment, grad, out=None):
+        """Applies the moment to grad. The result is written to out (may be
+        grad itself) or to the new array if it is None.
+        """
+        if not gradient_w_moment:
+            return grad
+        if out is None:
+            out = numpy.empty_like(grad)
+        moment = gradient_w_moment.mem
+        moment *= self.gradient_moment
+        if self.variant_moment_gradient:
+            moment += grad
         else:
-            gradients = grad
-        return gradients
+            numpy.multiply(grad, 1 - self.gradient_moment, out)
+            moment += out
+        numpy.copyto(out, moment)
+        return out
 
     def apply_gradient_f(self, gradient, vec, transposed):
         if self.apply_gradient:
             vec.mem += gradient
 
+    def numpy_init(self):
+        if self._fused_optimizer_ is not None:
+            self._fused_optimizer_.unregister(self)
+            self._fused_optimizer_ = None
+        if (root.common.engine.__content__.get("fused_gd", False) and
+                FusedOptimizer.supports(self)):
+            self._fused_optimizer_ = fused_optimizer(self.workflow)
+            self._fused_optimizer_.register(self)
+
     def numpy_update(self, s):
+        if self._fused_optimizer_ is not None or self._gradient_overflow_:
+            # the fused units are updated all at once after they submit,
+            # the overflowed gradients are not applied at all
+            return
         f_ortho_use = False if s == 'bias' else self.factor_ortho
 
         if s == 'weights':
@@ -352,35 +376,47 @@ class GradientDescent(nn_units.GradientDescentBase):
         grad_vec = getattr(self, "gradient_" + s)
         acc_vec = getattr(self, "accumulated_gradient_" + s)
         vec_old = getattr(self, "gradient_%s_with_moment" % s)
+        state = [vec, acc_vec, vec_old]
         if "fast" in self.solvers:
             f_vec = getattr(self.fast, s)
+            state.append(f_vec)
         if "adagrad" in self.solvers:
             adagard_vec = getattr(self.adagrad, s)
+            state.append(adagard_vec)
         if "adadelta" in self.solvers:
             adadelta_vec = getattr(self.adadelta, s)
             adadelta_gvec = getattr(self.adadelta, "g" + s)
+            state.extend((adadelta_vec, adadelta_gvec))
+        self.numpy_protect(*state)
 
         lr = self.learning_rate
         factor_l12 = self.weights_decay
         l1_vs_l2 = self.l1_vs_l2
 
+        # the workspace is reused on each iteration instead of temporaries
+        step = self.numpy_scratch(s, vec.mem)
+        temp = self.numpy_scratch(s + "_temp", vec.mem)
         if self.variant_gradient:
-            gradient = -nn_units.GradientDescentBase.numpy_gradient_step(
+            gradient = nn_units.GradientDescentBase.numpy_gradient_step(
                 vec.mem, grad_vec.mem, lr, factor_l12, l1_vs_l2, f_ortho_use,
-                v_trans)
+                v_trans, out=step, temp=temp)
+            numpy.negative(gradient, gradient)
             gradient = self.accumulate_gradient_f(acc_vec, gradient)
             # if "momentum" in self.solvers:
-            gradient = self.moment_use(vec_old, gradient)
+            gradient = self.moment_use(vec_old, gradient, step)
         else:
             # it is RNN
-            gradient = self.accumulate_gradient_f(acc_vec, grad_vec)
+            numpy.copyto(step, grad_vec.mem)
+            gradient = self.accumulate_gradient_f(acc_vec, step)
 
-            gradient = self.moment_use(vec_old, gradient)
-            gradient = -nn_units.GradientDescentBase.numpy_gradient_step(
+            gradient = self.moment_use(vec_old, gradient, step)
+            gradient = nn_units.GradientDescentBase.numpy_gradient_step(
                 vec.mem, gradient, lr, factor_l12, l1_vs_l2, f_ortho_use,
-                v_trans)
+                v_trans, out=step, temp=temp)
+            numpy.negative(gradient, gradient)
         if "adagrad" in self.solvers:
-            gradient = self.apply_adagrad(adagard_vec, vec_old, gradient)
+            gradient = self.apply_adagrad(adagard_vec, vec_old, gradient,
+                                          temp)
         if "adadelta" in self.solvers:
             gradient = self.apply_adadelta(adadelta_vec, adadelta_gvec,
                                            vec_old, gradient)
@@ -396,11 +432,15 @@ class GradientDescent(nn_units.GradientDescentBase):
         f_vec.mem *= 0.95
         f_vec.mem[:] = f_vec + self.fast.learning_rate * vec_old.mem
 
-    def apply_adagrad(self, adagard_vec, vec_old, gradient):
+    def apply_adagrad(self, adagard_vec, vec_old, gradient, temp=None):
+        if temp is None:
+            temp = numpy.empty_like(gradient)
         adagard_vec.map_write()
-        adagard_vec.mem += (vec_old.mem ** 2)
+        numpy.square(vec_old.mem, temp)
+        adagard_vec.mem += temp
         adagard_vec.map_read()
-        gradient *= numpy.sqrt(adagard_vec.mem + self.adagrad.epsilon)
+        numpy.add(adagard_vec.mem, self.adagrad.epsilon, temp)
+        gradient *= numpy.sqrt(temp, temp)
 
         return gradient
 
@@ -425,9 +465,9 @@ class GradientDescent(nn_units.GradientDescentBase):
         self.output.map_read()
         self.err_output.map_write()
 
-        err_output = reshape(
+        err_output = self.numpy_widen("err_output", reshape(
             self.err_output.mem,
-            [self.err_output.shape[0], self.err_output.sample_size])
+            [self.err_output.shape[0], self.err_output.sample_size]))
 
         inp = reshape(
             self.input.mem, [self.input.shape[0], self.input.sample_size])
@@ -438,7 +478,8 @@ class GradientDescent(nn_units.GradientDescentBase):
         else:
             numpy.dot(err_output.transpose(), inp, self.gradient_weights.mem)
 
-        self.numpy_update('weights')
+        if self.numpy_unscale(self.gradient_weights.mem):
+            self.numpy_update('weights')
 
     def numpy_bias_update(self):
         if not self.need_gradient_weights or not self.include_bias:
@@ -446,9 +487,14 @@ class GradientDescent(nn_units.GradientDescentBase):
         self.err_output.map_read()
 
         self.gradient_bias.map_write()
-        self.gradient_bias.mem[:] = self.err_output.mem.sum(axis=0)
+        err_output = self.err_output.mem
+        sum_rows(self.numpy_widen("err_output", reshape(
+            err_output, (err_output.shape[0],
+                         err_output.size // err_output.shape[0]))),
+                 self.gradient_bias.mem)
 
-        self.numpy_update('bias')
+        if self.numpy_unscale(self.gradient_bias.mem):
+            self.numpy_update('bias')
 
     def numpy_err_input_update(self):
         """Backpropagate error (will compute err_input).
@@ -458,27 +504,47 @@ class GradientDescent(nn_units.GradientDescentBase):
         self.err_input.map_invalidate()
         self.err_output.map_read()
         self.weights.map_read()
-        err_output = reshape(
+        err_output = self.numpy_widen("err_output", reshape(
             self.err_output.mem,
-            [self.err_output.shape[0], self.err_output.sample_size])
+            [self.err_output.shape[0], self.err_output.sample_size]))
         err_input = reshape(
             self.err_input.mem,
             [self.err_input.shape[0], self.err_input.sample_size])
-        if self.weights_transposed:
-            bp = numpy.dot(err_output, self.weights.mem.transpose())
-        else:
-            bp = numpy.dot(err_output, self.weights.mem)
-        bp *= self.err_input_alpha
+        weights = (self.weights.mem.transpose() if self.weights_transposed
+                   else self.weights.mem)
+        alpha = self.err_input_alpha * self.numpy_err_input_scale
+        if self.err_input_beta == 0 and err_input.dtype == weights.dtype:
+            numpy.dot(err_output, weights, err_input)
+            if alpha != 1:
+                err_input *= alpha
+            return
+        bp = self.numpy_scratch("err_input", err_input, weights.dtype)
+        numpy.dot(err_output, weights, bp)
+        bp *= alpha
+        if self.err_input_beta == 0:
+            numpy.copyto(err_input, bp)
+            return
         err_input *= self.err_input_beta
         err_input += bp
 
     def numpy_run(self):
         """Do gradient descent.
         """
+        if self._fused_optimizer_ is not None:
+            self._fused_optimizer_.start(self)
+        self.numpy_begin_loss_scaling()
         self.numpy_err_output_update()
         self.numpy_err_input_update()
         self.numpy_weights_update()
         self.numpy_bias_update()
+        if self._fused_optimizer_ is not None:
+            if self._gradient_overflow_:
+                # the whole step is skipped
+                self._fused_optimizer_.discard()
+            else:
+                for part in FusedOptimizer.parts(self):
+                    self.numpy_protect(part[0], *part[2:])
+                self._fused_optimizer_.submit(self)
         self.print_debug_data()
 
     def ocl_run(self):
@@ -582,7 +648,11 @@ class GDTanh(nn_units.GradientDescentWithActivation, GradientDescent):
         self.output.map_read()
         self.err_output.map_write()
         output = self.output.mem
-        self.err_output.mem *= output * output * (-0.388484177) + 1.14381894
+        derivative = self.numpy_scratch("derivative", output)
+        numpy.multiply(output, output, derivative)
+        derivative *= -0.388484177
+        derivative += 1.14381894
+        self.err_output.mem *= derivative
 
     def initialize(self, device, **kwargs):
         self.sources_["gradient_descent_tanh"] = {
@@ -611,7 +681,11 @@ class GDRELU(nn_units.GradientDescentWithActivation, GradientDescent):
         self.output.map_read()
         self.err_output.map_write()
         output = self.output.mem
-        self.err_output.mem *= 1.0 - numpy.exp(-output)
+        derivative = self.numpy_scratch("derivative", output)
+        numpy.negative(output, derivative)
+        numpy.exp(derivative, derivative)
+        numpy.subtract(1.0, derivative, derivative)
+        self.err_output.mem *= derivative
 
     def initialize(self, device, **kwargs):
         self.sources_["gradient_descent_relu"] = {
@@ -659,7 +733,10 @@ class GDSigmoid(nn_units.GradientDescentWithActivation, GradientDescent):
         self.output.map_read()
         self.err_output.map_write()
         output = self.output.mem
-        self.err_output.mem *= output * (1.0 - output)
+        derivative = self.numpy_scratch("derivative", output)
+        numpy.subtract(1.0, output, derivative)
+        derivative *= output
+        self.err_output.mem *= derivative
 
     def initialize(self, device, **kwargs):
         self.sources_["gradient_descent_sigmoid"] = {
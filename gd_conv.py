@@ -44,16 +44,17 @@ under the License.
 from __future__ import division
 
 import cuda4py.blas as cublas
-from itertools import product
 import numpy
 from zope.interface import implementer
 
 import veles.error as error
-from veles.memory import reshape_transposed
+from veles.memory import reshape
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 import veles.ocl_blas as ocl_blas
 from veles.znicz.conv import ConvolutionalBase
 import veles.znicz.nn_units as nn_units
+from veles.znicz.mixed_precision import compute_dtype
+from veles.znicz.numpy_kernels import ConvolutionUnpacker, sum_rows
 
 
 @implementer(IOpenCLUnit, ICUDAUnit, INumpyUnit)
@@ -450,6 +451,12 @@ class GradientDescentConv(ConvolutionalBase, nn_units.GradientDescentBase):
                 self.np_one if start_image else self.np_zero,
                 self.gradient_weights.devmem, offsetB=output_offs)
 
+    def numpy_init(self):
+        self._unpacker_ = ConvolutionUnpacker(
+            self.input.shape[1:], self.kx, self.ky, self.padding,
+            self.sliding, min(self.unpack_size, self._batch_size),
+            compute_dtype(self._dtype))
+
     def numpy_weights_update(self):
         if not self.need_gradient_weights:
             return
@@ -459,76 +466,53 @@ class GradientDescentConv(ConvolutionalBase, nn_units.GradientDescentBase):
         self.gradient_weights.map_write()
         self.accumulated_gradient_weights.map_write()
 
-        dtype = self.weights.dtype
-        sy = self.input.shape[1]
-        sx = self.input.shape[2]
-        n_channels = self.input.size // (self.input.shape[0] * sx * sy)
-
-        sx_full = self.padding[0] + sx + self.padding[2]
-        sy_full = self.padding[1] + sy + self.padding[3]
-        nx = (sx_full - self.kx) // self.sliding[0] + 1
-        ny = (sy_full - self.ky) // self.sliding[1] + 1
-        sample_shape = (nx * ny, self.kx * self.ky * n_channels)
-
-        sh = self.err_output.shape
-        if len(sh) == 3:
-            sh[1] *= sh[2]
-            sh[2] = 1
-
-        # calculate gradient for weights
-        gd_weights = (reshape_transposed(self.gradient_weights.mem)
-                      if self.weights_transposed
-                      else self.gradient_weights.mem)
-        gd_weights[:] = 0
-        cut = numpy.empty((self.ky, self.kx, n_channels), dtype=dtype)
-        sample = numpy.empty(sample_shape, dtype=dtype)
-        for batch in range(self.current_batch_size):
-            # input data unrolling
-            sample = numpy.empty(sample_shape)
-            for by, bx in ((by, bx) for by in range(ny) for bx in range(nx)):
-                y1, y2 = (by * self.sliding[1],
-                          by * self.sliding[1] + self.ky)
-                x1, x2 = (bx * self.sliding[0],
-                          bx * self.sliding[0] + self.kx)
-                i1, i2 = (min(max(y1 - self.padding[1], 0), sy),
-                          min(max(y2 - self.padding[1], 0), sy))
-                j1, j2 = (min(max(x1 - self.padding[0], 0), sx),
-                          min(max(x2 - self.padding[0], 0), sx))
-                cut_i1, cut_i2 = (i1 - y1 + self.padding[1],
-                                  i2 - y1 + self.padding[1])
-                cut_j1, cut_j2 = (j1 - x1 + self.padding[0],
-                                  j2 - x1 + self.padding[0])
-                cut = numpy.zeros((self.ky, self.kx, n_channels),
-                                  dtype=self.input.mem.dtype)
-                cut[cut_i1:cut_i2, cut_j1:cut_j2, :] = \
-                    self.input.mem[batch, i1:i2, j1:j2, :].reshape(i2 - i1,
-                                                                   j2 - j1,
-                                                                   n_channels)
-                sample[by * nx + bx] = cut.ravel()
-            err_out_shape = self.err_output.mem.shape
-            out = self.err_output.mem[batch].reshape(err_out_shape[1] *
-                                                     err_out_shape[2],
-                                                     self.n_kernels)
-            gd_weights += numpy.dot(out.transpose(),
-                                    sample)
-        if self.weights_transposed:
-            gd_weights = reshape_transposed(gd_weights)
+        # calculate gradient for weights: err_output * unpacked input
+        gd_weights = self.gradient_weights.mem
+        err_output = reshape(self.err_output.mem, (
+            self._kernel_app_total, self.n_kernels))
+        batch_size = self.current_batch_size
+        unpack_size = self._unpacker_.unpack_size
+        for i in range(0, batch_size, unpack_size):
+            image_count = min(batch_size - i, unpack_size)
+            unpack_data = self._unpacker_.unpack(
+                self.input.mem[i:i + image_count])
+            err = err_output[i * self._kernel_app_per_image:
+                             (i + image_count) * self._kernel_app_per_image]
+            if self.weights_transposed:
+                product = (unpack_data.transpose(), err)
+            else:
+                product = (err.transpose(), unpack_data)
+            if i:
+                partial = self.numpy_scratch("gradient_weights", gd_weights)
+                numpy.dot(*product, out=partial)
+                gd_weights += partial
+            else:
+                numpy.dot(*product, out=gd_weights)
+        if not self.numpy_unscale(gd_weights):
+            return
+        self.numpy_protect(self.weights, self.accumulated_gradient_weights,
+                           self.gradient_weights_with_moment)
 
         # update weights
         lr = self.learning_rate
         factor_l12 = self.weights_decay
         l1_vs_l2 = self.l1_vs_l2
-        gradient = -nn_units.GradientDescentBase.numpy_gradient_step(
+        gradient = nn_units.GradientDescentBase.numpy_gradient_step(
             self.weights.mem, gd_weights, lr, factor_l12, l1_vs_l2,
-            self.factor_ortho, self.weights_transposed)
+            self.factor_ortho, self.weights_transposed,
+            out=self.numpy_scratch("weights", gd_weights),
+            temp=self.numpy_scratch("weights_temp", gd_weights))
+        numpy.negative(gradient, gradient)
 
         if self.accumulate_gradient:
             self.accumulate_gradient_f(self.accumulated_gradient_weights.mem,
                                        gradient)
 
         if self.gradient_weights_with_moment:
-            gradient += (self.gradient_weights_with_moment.mem *
-                         self.gradient_moment)
+            moment = self.numpy_scratch("weights_temp", gd_weights)
+            numpy.multiply(self.gradient_weights_with_moment.mem,
+                           self.gradient_moment, moment)
+            gradient += moment
             self.gradient_weights.mem[:] = gradient[:]
         if self.apply_gradient:
             self.weights.mem += gradient
@@ -542,31 +526,35 @@ class GradientDescentConv(ConvolutionalBase, nn_units.GradientDescentBase):
         self.gradient_bias.map_write()
         self.accumulated_gradient_bias.map_write()
 
-        err_out_shape = self.err_output.mem.shape
-
         # calculate gradient for bias
         gd_bias = self.gradient_bias.mem
-        gd_bias[:] = 0
-        for batch in range(self.current_batch_size):
-            out = self.err_output.mem[batch].reshape(err_out_shape[1] *
-                                                     err_out_shape[2],
-                                                     self.n_kernels)
-            gd_bias += numpy.add.reduce(out)
+        sum_rows(reshape(self.err_output.mem, (
+            self._kernel_app_total, self.n_kernels))[
+            :self.current_batch_size * self._kernel_app_per_image], gd_bias)
+        if not self.numpy_unscale(gd_bias):
+            return
+        self.numpy_protect(self.bias, self.accumulated_gradient_bias,
+                           self.gradient_bias_with_moment)
         # update bias
         lr = self.learning_rate_bias
         factor_l12 = self.weights_decay_bias
         l1_vs_l2 = self.l1_vs_l2_bias
 
-        gd_bias_reg = -nn_units.GradientDescentBase.numpy_gradient_step(
-            self.bias.mem, gd_bias, lr, factor_l12, l1_vs_l2)
+        gd_bias_reg = nn_units.GradientDescentBase.numpy_gradient_step(
+            self.bias.mem, gd_bias, lr, factor_l12, l1_vs_l2,
+            out=self.numpy_scratch("bias", gd_bias),
+            temp=self.numpy_scratch("bias_temp", gd_bias))
+        numpy.negative(gd_bias_reg, gd_bias_reg)
 
         if self.accumulate_gradient:
             self.accumulate_gradient_f(self.accumulated_gradient_bias.mem,
                                        gd_bias_reg)
 
         if self.gradient_bias_with_moment:
-            gd_bias_reg += (self.gradient_bias_with_moment.mem *
-                            self.gradient_moment_bias)
+            moment = self.numpy_scratch("bias_temp", gd_bias)
+            numpy.multiply(self.gradient_bias_with_moment.mem,
+                           self.gradient_moment_bias, moment)
+            gd_bias_reg += moment
             self.gradient_bias_with_moment.mem[:] = gd_bias_reg[:]
         if self.apply_gradient:
             self.bias.mem += gd_bias_reg
@@ -577,47 +565,32 @@ class GradientDescentConv(ConvolutionalBase, nn_units.GradientDescentBase):
         if not self.need_err_input:
             return
 
-        from scipy.signal import convolve2d
-
-        self.err_input.map_invalidate()
+        self.err_input.map_write()
         self.err_output.map_read()
         self.weights.map_read()
 
-        batch_size = self.input.mem.shape[0]
-        sy = self.input.mem.shape[1]
-        sx = self.input.mem.shape[2]
-        n_channels = self.input.mem.size // (batch_size * sx * sy)
-        sx_full = self.padding[0] + sx + self.padding[2]
-        sy_full = self.padding[1] + sy + self.padding[3]
-
-        weights = (reshape_transposed(self.weights.mem)
-                   if self.weights_transposed else self.weights.mem)
+        weights = (self.weights.mem.transpose() if self.weights_transposed
+                   else self.weights.mem)
 
         if not self.err_input_beta:
             self.err_input.mem[:] = 0
         else:
             self.err_input.mem *= self.err_input_beta
-        err_input = numpy.zeros_like(self.err_input.mem)
-        # initialize sparse output error
-        sparse_err_output = numpy.zeros((
-            batch_size, sy_full - self.ky + 1, sx_full - self.kx + 1,
-            self.n_kernels), dtype=self.err_output.dtype)
-        for (batch, i, j, k), err in numpy.ndenumerate(self.err_output.mem):
-            sparse_err_output[batch, i * self.sliding[1],
-                              j * self.sliding[0], k] = err
-        err_sample = numpy.zeros(
-            (sy_full - self.ky + 1, sx_full - self.kx + 1),
-            dtype=err_input.dtype)
-        for batch, k in product(range(batch_size), range(self.n_kernels)):
-            err_sample[:] = sparse_err_output[batch, :, :, k]
-            cur_kernel = weights[k].reshape(self.ky, self.kx, n_channels)
-            for ch in range(n_channels):
-                err_input_full = convolve2d(err_sample, cur_kernel[:, :, ch],
-                                            mode='full')
-                err_input[batch, :, :, ch] += \
-                    err_input_full[self.padding[1]:(sy_full - self.padding[3]),
-                                   self.padding[0]:(sx_full - self.padding[2])]
-        self.err_input.mem += err_input * self.err_input_alpha
+        err_output = reshape(self.err_output.mem, (
+            self._kernel_app_total, self.n_kernels))
+        alpha = self.err_input_alpha * self.numpy_err_input_scale
+        unpack_size = self._unpacker_.unpack_size
+        for i in range(0, self._batch_size, unpack_size):
+            image_count = min(self._batch_size - i, unpack_size)
+            unpack_data = self._unpacker_.workspace(image_count)
+            numpy.dot(err_output[i * self._kernel_app_per_image:
+                                 (i + image_count) *
+                                 self._kernel_app_per_image],
+                      weights, out=unpack_data)
+            if alpha != 1:
+                unpack_data *= alpha
+            self._unpacker_.pack(unpack_data,
+                                 self.err_input.mem[i:i + image_count])
 
     def gpu_run(self):
         """Do gradient descent for OpenCL and CUDA.
@@ -635,6 +608,7 @@ class GradientDescentConv(ConvolutionalBase, nn_units.GradientDescentBase):
         self.gpu_run()
 
     def numpy_run(self):
+        self.numpy_begin_loss_scaling()
         self.numpy_err_output_update()
         self.numpy_err_input_update()
         self.numpy_weights_update()
@@ -43,10 +43,12 @@ from zope.interface import implementer
 from veles.compat import from_none
 
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
+from veles.memory import reshape
 import veles.ocl_blas as ocl_blas
 import veles.znicz.nn_units as nn_units
 from veles.znicz.conv import ConvolutionalBase
 from veles.znicz.deconv import Deconv
+from veles.znicz.numpy_kernels import ConvolutionUnpacker
 
 
 @implementer(IOpenCLUnit, ICUDAUnit, INumpyUnit)
@@ -405,5 +407,102 @@ class GDDeconv(ConvolutionalBase, nn_units.GradientDescentBase):
                 self.np_one if start_image else self.np_zero,
                 self.gradient_weights.devmem, offsetB=output_offs)
 
+    def numpy_init(self):
+        self._unpacker_ = ConvolutionUnpacker(
+            self.err_output.shape[1:], self.kx, self.ky, self.padding,
+            self.sliding, min(self.unpack_size, self._batch_size),
+            self.err_output.dtype)
+        assert (self._unpacker_.kernel_app_per_image ==
+                self._kernel_app_per_image)
+
+    def numpy_err_output_update(self):
+        """Divide err_output by hits count.
+        """
+        self.err_output.map_write()
+        if self.hits:
+            self.hits.map_read()
+            self.err_output.mem /= numpy.maximum(self.hits.mem, 1)
+        else:
+            self.err_output.mem /= (self.kx // self.sliding[0]) * (
+                self.ky // self.sliding[1])
+
+    def numpy_weights_update(self):
+        if not self.need_gradient_weights:
+            return
+        self.weights.map_write()
+        self.gradient_weights.map_write()
+        self.accumulated_gradient_weights.map_write()
+
+        # update weights
+        gd_weights = self.gradient_weights.mem
+        gradient = nn_units.GradientDescentBase.numpy_gradient_step(
+            self.weights.mem, gd_weights, self.learning_rate,
+            self.weights_decay, self.l1_vs_l2, self.factor_ortho,
+            self.weights_transposed,
+            out=self.numpy_scratch("weights", gd_weights),
+            temp=self.numpy_scratch("weights_temp", gd_weights))
+        numpy.negative(gradient, gradient)
+
+        if self.accumulate_gradient:
+            self.accumulate_gradient_f(self.accumulated_gradient_weights.mem,
+                                       gradient)
+
+        if self.gradient_weights_with_moment:
+            moment = self.numpy_scratch("weights_temp", gd_weights)
+            numpy.multiply(self.gradient_weights_with_moment.mem,
+                           self.gradient_moment, moment)
+            gradient += moment
+            self.gradient_weights.mem[:] = gradient[:]
+        if self.apply_gradient:
+            self.weights.mem += gradient
+
     def numpy_run(self):
-        raise NotImplementedError()
+        self.numpy_err_output_update()
+
+        # Update err_input and simultaneousely accumulate gradient
+        self.input.map_read()
+        self.weights.map_read()
+        if self.need_err_input:
+            self.err_input.map_write()
+            err_input = reshape(self.err_input.mem, (
+                self._kernel_app_total, self.n_kernels))
+            weights = (self.weights.mem if self.weights_transposed
+                       else self.weights.mem.transpose())
+        if self.need_gradient_weights:
+            self.gradient_weights.map_write()
+            gd_weights = self.gradient_weights.mem
+        inp = reshape(self.input.mem, (self._kernel_app_total,
+                                       self.n_kernels))
+        unpack_size = self._unpacker_.unpack_size
+        for i in range(0, self._batch_size, unpack_size):
+            image_count = min(self._batch_size - i, unpack_size)
+            unpack_data = self._unpacker_.unpack(
+                self.err_output.mem[i:i + image_count])
+            rows = slice(i * self._kernel_app_per_image,
+                         (i + image_count) * self._kernel_app_per_image)
+
+            if self.need_err_input:
+                if self.err_input_beta:
+                    err_input[rows] *= self.err_input_beta
+                    err_input[rows] += self.err_input_alpha * numpy.dot(
+                        unpack_data, weights)
+                else:
+                    numpy.dot(unpack_data, weights, out=err_input[rows])
+                    if self.err_input_alpha != 1:
+                        err_input[rows] *= self.err_input_alpha
+
+            if not self.need_gradient_weights:
+                continue
+
+            if self.weights_transposed:
+                product = (unpack_data.transpose(), inp[rows])
+            else:
+                product = (inp[rows].transpose(), unpack_data)
+            if i:
+                partial = self.numpy_scratch("gradient_weights", gd_weights)
+                numpy.dot(*product, out=partial)
+                gd_weights += partial
+            else:
+                numpy.dot(*product, out=gd_weights)
+
+        self.numpy_weights_update()
@@ -51,6 +51,7 @@ import veles.error as error
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 import veles.znicz.nn_units as nn_units
 from veles.distributable import TriviallyDistributable
+from veles.znicz.numpy_kernels import PoolingWindows, minibatch_shards
 from veles.znicz.pooling import PoolingBase
 
 
@@ -236,14 +237,30 @@ class GDMaxPooling(GDPooling):
         self.err_output.map_read()
         self.input_offset.map_read()
         self.err_input.map_invalidate()
-        self.err_input.mem[:] = 0
 
-        # self.input_offset can contain equal values
-        for err, offset in numpy.nditer([self.err_output.mem,
-                                         self.input_offset.mem]):
-            batch, y, x, ch = numpy.unravel_index(offset,
-                                                  self.err_input.shape)
-            self.err_input.mem[batch, y, x, ch] += err
+        batch_size = self.current_batch_size
+        self.err_input.mem[batch_size:] = 0
+        minibatch_shards().map(self._numpy_run_shard, batch_size,
+                               self.err_input.sample_size)
+
+    def _numpy_run_shard(self, start, stop):
+        # the offsets of each sample point to the same sample of err_input
+        out_size = self.err_output.sample_size
+        in_size = self.err_input.sample_size
+        err_output = self.err_output.mem.ravel()[
+            start * out_size:stop * out_size]
+        input_offset = self.input_offset.mem.ravel()[
+            start * out_size:stop * out_size]
+        err_input = self.err_input.mem.ravel()[start * in_size:stop * in_size]
+        if self.sliding[0] >= self.kx and self.sliding[1] >= self.ky:
+            # windows do not overlap, so offsets are unique
+            err_input[:] = 0
+            err_input[input_offset - start * in_size] = err_output
+        else:
+            # self.input_offset can contain equal values
+            err_input[:] = numpy.bincount(
+                input_offset - start * in_size, weights=err_output,
+                minlength=err_input.size)
 
 
 class GDMaxAbsPooling(GDMaxPooling):
@@ -269,19 +286,22 @@ class GDAvgPooling(GDPooling):
         self.kernel_name = "gd_avg_pooling"
         super(GDAvgPooling, self).initialize(device=device, **kwargs)
 
+    def numpy_init(self):
+        self._windows_ = PoolingWindows(
+            self.input.shape, self.kx, self.ky, self.sliding, self.out_sx,
+            self.out_sy, self.err_output.dtype)
+
     def numpy_run(self):
         self.err_output.map_read()
         self.err_input.map_invalidate()
-        self.err_input.mem[:] = 0
-
-        for (batch, y, x, ch), err in numpy.ndenumerate(self.err_output.mem):
-            hx1 = x * self.sliding[0]
-            hx2 = hx1 + self.kx
-            hx2 = hx2 if hx2 < self.sx else self.sx
-            hy1 = y * self.sliding[1]
-            hy2 = hy1 + self.ky
-            hy2 = hy2 if hy2 < self.sy else self.sy
-            delta = err / ((hx2 - hx1) * (hy2 - hy1))
-            for i, j in ((ii, jj) for ii in range(hy1, hy2)
-                         for jj in range(hx1, hx2)):
-                self.err_input.mem[batch, i, j, ch] += delta
+        batch_size = self.current_batch_size
+        self.err_input.mem[batch_size:] = 0
+        minibatch_shards().map(self._numpy_run_shard, batch_size,
+                               self.err_input.sample_size)
+
+    def _numpy_run_shard(self, start, stop):
+        err_input = self.err_input.mem[start:stop]
+        err_input[:] = 0
+        self._windows_.spread(
+            self.err_output.mem[start:stop] / self._windows_.counts,
+            err_input, start)
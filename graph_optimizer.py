@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Graph-level optimization of the extracted forward workflows. The layers of
+the training workflow are rewritten before the forward units are created:
+the units which pass the data through unchanged in forward mode are dropped,
+the standalone activation units are folded into the linear All2All or Conv
+kernels before them, and the remaining Cutter units output the views of
+their input when the cut area is contiguous.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from veles.znicz.activation import ForwardRELU, ForwardSigmoid, \
+    ForwardStrictRELU, ForwardTanh
+from veles.znicz.all2all import All2All, All2AllRELU, All2AllSigmoid, \
+    All2AllStrictRELU, All2AllTanh
+from veles.znicz.conv import Conv, ConvRELU, ConvSigmoid, ConvStrictRELU, \
+    ConvTanh
+from veles.znicz.cutter import Cutter
+from veles.znicz.dropout import DropoutForward
+
+
+# activation units which compute the same as the activation_mode of kernels
+FOLDABLE_ACTIVATIONS = {
+    ForwardTanh: "ACTIVATION_TANH",
+    ForwardSigmoid: "ACTIVATION_SIGMOID",
+    ForwardRELU: "ACTIVATION_RELU",
+    ForwardStrictRELU: "ACTIVATION_STRICT_RELU",
+}
+
+# (linear kernel class, activation_mode) -> class with that activation
+FOLDED_KERNELS = {
+    (All2All, "ACTIVATION_TANH"): All2AllTanh,
+    (All2All, "ACTIVATION_SIGMOID"): All2AllSigmoid,
+    (All2All, "ACTIVATION_RELU"): All2AllRELU,
+    (All2All, "ACTIVATION_STRICT_RELU"): All2AllStrictRELU,
+    (Conv, "ACTIVATION_TANH"): ConvTanh,
+    (Conv, "ACTIVATION_SIGMOID"): ConvSigmoid,
+    (Conv, "ACTIVATION_RELU"): ConvRELU,
+    (Conv, "ACTIVATION_STRICT_RELU"): ConvStrictRELU,
+}
+
+
+def is_identity(unit):
+    """Returns True if the forward unit copies its input to the output
+    in forward mode.
+    """
+    if isinstance(unit, DropoutForward):
+        return True
+    if isinstance(unit, Cutter):
+        return not any(unit.padding)
+    return False
+
+
+def layer_type(cls):
+    """Returns the layer type which creates the forward units of cls.
+    """
+    return next(iter(sorted(cls.MAPPING)))
+
+
+class OptimizationReport(object):
+    """The number of applied optimizations of each kind.
+    """
+
+    def __init__(self):
+        self.identities = 0
+        self.activations = 0
+        self.views = 0
+
+    def __str__(self):
+        return ("%d identity units dropped, %d activations folded, %d "
+                "zero-copy cutters" % (
+                    self.identities, self.activations, self.views))
+
+
+def optimize_layers(layers, forwards):
+    """Rewrites the layers of a trained workflow for forward propagation.
+
+    :param layers: the "layers" configuration of the workflow.
+    :param forwards: the forward units created from layers.
+    :return: the tuple (optimized layers, the indices of forwards the units \
+        created from the optimized layers take their data from, \
+        :class:`OptimizationReport`).
+    """
+    assert len(layers) == len(forwards)
+    result = []
+    sources = []
+    report = OptimizationReport()
+    # the index in result of the linear kernel the next activation may
+    # be folded into
+    kernel = None
+    for index, (layer, unit) in enumerate(zip(layers, forwards)):
+        if is_identity(unit):
+            report.identities += 1
+            continue
+        mode = FOLDABLE_ACTIVATIONS.get(type(unit))
+        if mode is not None and kernel is not None:
+            folded = FOLDED_KERNELS[type(forwards[sources[kernel]]), mode]
+            result[kernel] = dict(result[kernel], type=layer_type(folded))
+            kernel = None
+            report.activations += 1
+            continue
+        kernel = None
+        if type(unit) in (All2All, Conv):
+            kernel = len(result)
+        elif isinstance(unit, Cutter):
+            layer = dict(layer)
+            layer["->"] = dict(layer.get("->", {}), zero_copy=True)
+            report.views += 1
+        result.append(layer)
+        sources.append(index)
+    return result, sources, report
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Local inference service over the forward units of a workflow. The clients
+send individual samples over a local socket (a named pipe on Windows), the
+server coalesces them into minibatches of up to max_minibatch_size samples,
+waiting no longer than max_latency after the first sample of a minibatch,
+runs the forward units once per minibatch and sends each client its own
+results back.
+
+Usage::
+
+    fwd = workflow.extract_forward_workflow(...)
+    fwd.initialize(device=NumpyDevice())
+    with InferenceServer(fwd.forwards, max_latency=0.002) as server:
+        client = InferenceClient(server.address)
+        probabilities = client.infer(sample)
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from __future__ import division
+from collections import deque
+import itertools
+import multiprocessing
+from multiprocessing.connection import Client, Listener
+import threading
+import time
+
+import numpy
+from six.moves import queue
+
+from veles.logger import Logger
+
+
+class InferenceStats(object):
+    """Latency and throughput counters of :class:`InferenceServer`.
+
+    Attributes:
+        requests: the number of processed samples.
+        batches: the number of processed minibatches.
+        compute_time: the total time spent in the forward units.
+        latencies: the latest request latencies (from receiving a sample to
+                   sending its result), in seconds.
+    """
+
+    def __init__(self, history=10000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.compute_time = 0.0
+        self.latencies = deque(maxlen=history)
+        self._started = time.time()
+
+    def record(self, latencies, compute_time):
+        with self._lock:
+            self.requests += len(latencies)
+            self.batches += 1
+            self.compute_time += compute_time
+            self.latencies.extend(latencies)
+
+    @property
+    def mean_batch_size(self):
+        return self.requests / self.batches if self.batches > 0 else 0
+
+    @property
+    def throughput(self):
+        """The number of samples per second since the server started.
+        """
+        return self.requests / max(time.time() - self._started, 1e-9)
+
+    def latency(self, percentile):
+        """Returns the given percentile of the latest latencies in seconds.
+        """
+        with self._lock:
+            if len(self.latencies) == 0:
+                return 0.0
+            return float(numpy.percentile(self.latencies, percentile))
+
+    def __str__(self):
+        return ("%d requests in %d minibatches (%.1f per minibatch), %.1f "
+                "requests/sec, latency p50 %.2f ms, p99 %.2f ms" % (
+                    self.requests, self.batches, self.mean_batch_size,
+                    self.throughput, self.latency(50) * 1000,
+                    self.latency(99) * 1000))
+
+
+class InferenceServer(Logger):
+    """Serves the initialized forward units to the local clients, see
+    :class:`InferenceClient`.
+
+    The samples are written into the input of the first unit, so it must
+    not be overwritten by the loader while the server is running.
+
+    Attributes:
+        forwards: the forward units in the order of execution.
+        max_minibatch_size: the maximal number of samples in a minibatch, \
+            it may not exceed the number of samples the first unit's input \
+            holds (the default).
+        max_latency: the maximal time in seconds to wait for more samples \
+            after the first sample of a minibatch arrived.
+        address: the address the clients connect to.
+        authkey: the key the clients authenticate with, since the requests \
+            are unpickled. It is the process' authkey by default, which the \
+            child processes inherit.
+        stats: :class:`InferenceStats`.
+    """
+
+    def __init__(self, forwards, max_minibatch_size=None, max_latency=0.002,
+                 address=None, family=None, authkey=None):
+        super(InferenceServer, self).__init__()
+        self.forwards = forwards
+        capacity = forwards[0].input.shape[0]
+        if max_minibatch_size is None:
+            max_minibatch_size = capacity
+        if not 0 < max_minibatch_size <= capacity:
+            raise ValueError(
+                "max_minibatch_size must be in [1, %d], got %s" %
+                (capacity, max_minibatch_size))
+        self.max_minibatch_size = max_minibatch_size
+        self.max_latency = max_latency
+        self.stats = InferenceStats()
+        if authkey is None:
+            authkey = multiprocessing.current_process().authkey
+        self._listener = Listener(address, family, authkey=authkey)
+        self._family = family
+        self._authkey = authkey
+        self._requests = queue.Queue()
+        self._threads = []
+        self._running = False
+
+    @property
+    def address(self):
+        return self._listener.address
+
+    @property
+    def authkey(self):
+        return self._authkey
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        self._running = True
+        for target in self._accept_loop, self._batch_loop:
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        self.info("Serving %d forward units on %s", len(self.forwards),
+                  self.address)
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._requests.put(None)
+        # closing the listener does not interrupt accept() on Linux
+        try:
+            Client(self.address, self._family, authkey=self._authkey).close()
+        except (OSError, IOError, EOFError):
+            pass
+        self._listener.close()
+        for thread in self._threads:
+            thread.join()
+        del self._threads[:]
+        self.info("Stopped: %s", self.stats)
+
+    def infer(self, samples):
+        """Runs the forward units on the samples.
+
+        :param samples: numpy array, one sample per row.
+        :return: the outputs of the last unit, one per sample.
+        """
+        first, last = self.forwards[0], self.forwards[-1]
+        capacity = first.input.shape[0]
+        results = []
+        for start in range(0, len(samples), capacity):
+            chunk = samples[start:start + capacity]
+            count = len(chunk)
+            first.input.map_write()
+            first.input.mem[:count] = chunk.reshape(
+                (count,) + first.input.shape[1:])
+            for unit in self.forwards:
+                unit.run()
+            last.output.map_read()
+            results.append(last.output.mem[:count].copy())
+        return numpy.concatenate(results) if len(results) > 1 else results[0]
+
+    def _accept_loop(self):
+        # stop() wakes accept() up by connecting, which must not wait for
+        # the authentication forever
+        while True:
+            try:
+                conn = self._listener.accept()
+            except multiprocessing.AuthenticationError as e:
+                self.warning("Rejected the client: %s", e)
+                continue
+            except (OSError, IOError, EOFError):
+                break
+            if not self._running:
+                conn.close()
+                break
+            thread = threading.Thread(target=self._read_loop, args=(conn,))
+            thread.daemon = True
+            thread.start()
+
+    def _read_loop(self, conn):
+        lock = threading.Lock()
+        inp = self.forwards[0].input
+        while self._running:
+            try:
+                request_id, sample = conn.recv()
+            except (OSError, IOError, EOFError):
+                break
+            # a malformed sample must not fail the whole minibatch
+            try:
+                sample = numpy.asarray(sample, dtype=inp.dtype)
+                if sample.size != inp.sample_size:
+                    raise ValueError(
+                        "the sample has %d values instead of %d" %
+                        (sample.size, inp.sample_size))
+            except (TypeError, ValueError) as e:
+                self._reply(conn, lock, request_id, None,
+                            "%s: %s" % (type(e).__name__, e))
+                continue
+            self._requests.put((conn, lock, request_id,
+                                sample.reshape(inp.shape[1:]), time.time()))
+        conn.close()
+
+    @staticmethod
+    def _reply(conn, lock, request_id, result, err):
+        """Returns False if the client has disconnected.
+        """
+        try:
+            with lock:
+                conn.send((request_id, result, err))
+        except (OSError, IOError, EOFError):
+            return False
+        return True
+
+    def _batch_loop(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = request[-1] + self.max_latency
+            while len(batch) < self.max_minibatch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._process(batch)
+                    return
+                batch.append(request)
+            self._process(batch)
+
+    def _process(self, batch):
+        start = time.time()
+        try:
+            results = self.infer(numpy.stack([r[3] for r in batch]))
+            errors = itertools.repeat(None)
+        except Exception as e:
+            self.exception("Failed to process the minibatch of %d samples",
+                           len(batch))
+            results = itertools.repeat(None)
+            errors = itertools.repeat("%s: %s" % (type(e).__name__, e))
+        compute_time = time.time() - start
+        latencies = []
+        for (conn, lock, request_id, _, arrived), result, err in zip(
+                batch, results, errors):
+            if self._reply(conn, lock, request_id, result, err):
+                latencies.append(time.time() - arrived)
+        self.stats.record(latencies, compute_time)
+
+
+class InferenceClient(object):
+    """Connection to :class:`InferenceServer`. It is not thread safe, each
+    thread should open its own. authkey must be the server's one, the
+    process' authkey is used by default.
+    """
+
+    def __init__(self, address, family=None, authkey=None):
+        if authkey is None:
+            authkey = multiprocessing.current_process().authkey
+        self._conn = Client(address, family, authkey=authkey)
+        self._ids = itertools.count()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def infer(self, sample):
+        """Returns the output of the forward units for a single sample.
+        """
+        return self.infer_many((sample,))[0]
+
+    def infer_many(self, samples):
+        """Sends all the samples at once, so that the server is able to
+        put them into the same minibatch, and returns their outputs. Raises
+        RuntimeError if any of them failed, after all the replies are read.
+        """
+        ids = []
+        for sample in samples:
+            ids.append(next(self._ids))
+            self._conn.send((ids[-1], numpy.asarray(sample)))
+        pending = set(ids)
+        results = {}
+        errors = {}
+        while pending:
+            request_id, result, err = self._conn.recv()
+            if request_id not in pending:
+                # the reply to an earlier call which was interrupted
+                continue
+            pending.remove(request_id)
+            if err is not None:
+                errors[request_id] = err
+            else:
+                results[request_id] = result
+        if errors:
+            raise RuntimeError("Inference of %d of %d samples failed: %s" % (
+                len(errors), len(ids), "; ".join(
+                    "#%d: %s" % (ids.index(i), errors[i])
+                    for i in sorted(errors))))
+        return [results[i] for i in ids]
@@ -42,7 +42,7 @@ import threading
 from zope.interface import implementer
 
 from veles.units import Unit, IUnit
-from veles.memory import Array, roundup
+from veles.memory import Array, reshape, roundup
 import veles.opencl_types as opencl_types
 from veles.accelerated_units import IOpenCLUnit, AcceleratedUnit, INumpyUnit
 import veles.prng as prng
@@ -53,19 +53,35 @@ class KohonenBase(object):
     """Common base of Kohonen units.
     """
 
-    def init_unpickled(self):
-        super(KohonenBase, self).init_unpickled()
-        numpy_version = [int(mem) for mem in numpy.__version__.split('.')]
-        if numpy_version[0] == 1 and numpy_version[1] < 8:
-            self.numpy_linalg_norm = self._numpy_legacy_linalg_norm
-        else:
-            self.numpy_linalg_norm = self._numpy_1_8_linalg_norm
-
-    def _numpy_1_8_linalg_norm(self, dist):
-        return numpy.linalg.norm(dist, axis=1)
-
-    def _numpy_legacy_linalg_norm(self, dist):
-        return [numpy.linalg.norm(dist[i]) for i in range(dist.shape[0])]
+    @staticmethod
+    def numpy_squared_norms(weights):
+        """Returns the squared norm of each neuron's weights.
+        """
+        if numpy.iscomplexobj(weights):
+            return numpy.einsum("ij,ij->i", weights.conj(), weights).real
+        return numpy.einsum("ij,ij->i", weights, weights)
+
+    @staticmethod
+    def numpy_distances(samples, weights, squared_norms, out):
+        """Computes the squared distances between samples and neurons without
+        ||x||^2 term, which does not affect the winners, as
+        ||w||^2 - 2 * Re(x.w) with a single GEMM.
+
+        Arguments:
+            samples: 2D array of samples.
+            weights: 2D array of neurons' weights (neurons x sample length).
+            squared_norms: the result of :meth:`numpy_squared_norms()`.
+            out: the array of shape (len(samples), len(weights)) to use.
+
+        Returns:
+            The real view of out with the distances.
+        """
+        if numpy.iscomplexobj(samples):
+            samples = samples.conj()
+        numpy.dot(samples, weights.transpose(), out=out)
+        out *= -2
+        out += squared_norms
+        return out.real
 
 
 @implementer(IOpenCLUnit, INumpyUnit)
@@ -91,14 +107,22 @@ class KohonenForward(KohonenBase, AcceleratedUnit):
         weights: the weights of the neurons in Kohonen layer.
         output: the list of winners.
         total: if total=True is passed in __init__(), the overall winners table
+        chunk_size: the number of samples to find the winners for at once
+                    on CPU, 0 means it is derived from NUMPY_CHUNK_BYTES.
     """
+
+    # memory limit for the distances of a single chunk of samples on CPU
+    NUMPY_CHUNK_BYTES = 16 << 20
+    # the default for the units pickled before chunk_size was introduced
+    _chunk_size = 0
+
     def __init__(self, workflow, **kwargs):
         super(KohonenForward, self).__init__(workflow, **kwargs)
         self.demand("input", "weights")
         self.argmins = None
         self._distances = Array()
         self.output = Array()
-        self._chunk_size_ = 0
+        self.chunk_size = kwargs.get("chunk_size", 0)
         self.weights_transposed = False
         self.total = Array() if kwargs.get("total", False) else None
         if self.total is not None:
@@ -109,6 +133,7 @@ class KohonenForward(KohonenBase, AcceleratedUnit):
     def init_unpickled(self):
         super(KohonenForward, self).init_unpickled()
         self.sources_["kohonen"] = {"FORWARD": 1}
+        self._numpy_distances_ = None
 
     @property
     def neurons_number(self):
@@ -120,7 +145,13 @@ class KohonenForward(KohonenBase, AcceleratedUnit):
 
     @property
     def chunk_size(self):
-        return self._chunk_size_
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value):
+        if value < 0:
+            raise ValueError("chunk_size must not be negative")
+        self._chunk_size = value
 
     def initialize(self, device, **kwargs):
         super(KohonenForward, self).initialize(device=device, **kwargs)
@@ -129,10 +160,7 @@ class KohonenForward(KohonenBase, AcceleratedUnit):
         batch_size = self.input.mem.shape[0]
 
         self.output.reset(numpy.zeros(batch_size, dtype=numpy.int32))
-        if self.argmins is None:
-            self._distances.reset(numpy.zeros(
-                [batch_size, self.neurons_number],
-                dtype=self.weights.mem.dtype))
+        self._numpy_distances_ = None
 
         if self.total is not None:
             self.total.reset(numpy.zeros(self.batch_size, dtype=numpy.int32))
@@ -142,6 +170,9 @@ class KohonenForward(KohonenBase, AcceleratedUnit):
         batch_size = self.input.mem.shape[0]
         self.output.initialize(self.device)
         if self.argmins is None:
+            self._distances.reset(numpy.zeros(
+                [batch_size, self.neurons_number],
+                dtype=self.weights.mem.dtype))
             self.input.initialize(self.device)
             self.weights.initialize(self.device)
             self._distances.initialize(self.device)
@@ -231,28 +262,42 @@ class KohonenForward(KohonenBase, AcceleratedUnit):
     def numpy_run(self):
         self.output.map_invalidate()
 
+        length = self.minibatch_size if self.total is not None \
+            else self.input.mem.shape[0]
         if self.argmins is not None:
             self.argmins.map_read()
             self.output.mem[:] = self.argmins.mem
         else:
             self.input.map_read()
             self.weights.map_read()
+            self._numpy_find_winners(length)
 
         if self.total is not None:
-            self.total.map_invalidate()
+            self.total.map_write()
+            offset = self.minibatch_offset - self.minibatch_size
+            self.total.mem[offset:offset + length] = self.output.mem[:length]
 
-        length = self.minibatch_size if self.total is not None \
-            else self.input.mem.shape[0]
-        for sindex in range(length):
-            if self.argmins is None:
-                dist = self.weights.mem - self.input[sindex]
-                winner = numpy.argmin(self.numpy_linalg_norm(dist))
-                self.output[sindex] = winner
-            else:
-                winner = self.argmins[sindex]
-            if self.total is not None:
-                index = sindex + self.minibatch_offset - self.minibatch_size
-                self.total[index] = winner
+    def _numpy_find_winners(self, length):
+        if not length:
+            return
+        weights = self.weights.mem
+        inp = reshape(self.input.mem, (self.input.mem.shape[0],
+                                       self.sample_length))
+        chunk_size = self.chunk_size or max(
+            self.NUMPY_CHUNK_BYTES // (self.neurons_number * weights.itemsize),
+            1)
+        chunk_size = min(chunk_size, length)
+        if (self._numpy_distances_ is None or
+                self._numpy_distances_.shape[0] < chunk_size):
+            self._numpy_distances_ = numpy.empty(
+                (chunk_size, self.neurons_number), dtype=weights.dtype)
+        squared_norms = self.numpy_squared_norms(weights)
+        for start in range(0, length, chunk_size):
+            stop = min(start + chunk_size, length)
+            distances = self.numpy_distances(
+                inp[start:stop], weights, squared_norms,
+                self._numpy_distances_[:stop - start])
+            self.output.mem[start:stop] = distances.argmin(axis=1)
 
 
 @implementer(IOpenCLUnit, INumpyUnit)
@@ -308,6 +353,7 @@ class KohonenTrainer(KohonenBase, AcceleratedUnit):
         self._krn_gravity_ = None
         self._krn_compute_gradients_ = None
         self._krn_apply_gradients_ = None
+        self._neuron_distances_ = None
 
     @property
     def gravity_radius(self):
@@ -396,6 +442,7 @@ class KohonenTrainer(KohonenBase, AcceleratedUnit):
 
         self._sigma = (self._coords.mem.ravel().max() -
                        self._coords.mem.ravel().min()) * 1.42
+        self._neuron_distances_ = None
 
     def ocl_init(self):
         self.input.initialize(self.device)
@@ -423,7 +470,7 @@ class KohonenTrainer(KohonenBase, AcceleratedUnit):
             'NEURONS_NUMBER': self._neurons_number,
             'CHUNK_SIZE': chunk_size,
             'GRADIENT_CHUNK_SIZE': self.device.max_group_size,
-            'coord_type':  "%s%d" %
+            'coord_type': "%s%d" %
             (opencl_types.numpy_dtype_to_opencl(self._coords.mem.dtype),
              self._coords.mem.shape[-1])
         }
@@ -469,30 +516,54 @@ class KohonenTrainer(KohonenBase, AcceleratedUnit):
         wrapped.__name__ = name + '_iteration'
         return wrapped
 
+    @property
+    def neuron_distances(self):
+        """Squared distances between the neurons on the grid, they never
+        change after initialize(), so are computed once.
+        """
+        if self._neuron_distances_ is None:
+            self._coords.map_read()
+            coords = self._coords.mem
+            diff = coords[:, None, :] - coords[None, :, :]
+            self._neuron_distances_ = numpy.einsum("ijk,ijk->ij", diff, diff)
+        return self._neuron_distances_
+
     @iteration
     def numpy_run(self):
-        batch_size = self.input.mem.shape[0]
-        neurons_number = self._neurons_number
-        dists = numpy.empty(neurons_number)
-        gradients = numpy.zeros(self.weights.mem.shape)
-        sigma = self.gravity_radius
-        gmult = self.gradient_multiplier
         self.input.map_read()
-        self.weights.map_invalidate()
-        self.winners.map_invalidate()
+        self.weights.map_write()
+        self.winners.map_write()
+        self.argmins.map_invalidate()
+        self._distances.map_invalidate()
+
+        inp = reshape(self.input.mem, (self.input.mem.shape[0],
+                                       self._sample_length))
+        weights = (self.weights.mem.transpose() if self.weights_transposed
+                   else self.weights.mem)
+
+        # find the winners
+        distances = self.numpy_distances(
+            inp, weights, self.numpy_squared_norms(weights),
+            self._distances.mem)
+        argmins = self.argmins.mem
+        argmins[:] = distances.argmin(axis=1)
+        self.winners.mem += numpy.bincount(
+            argmins, minlength=self._neurons_number).astype(numpy.int32)
+
+        # compute gravity to the winners in place of distances
+        gravity = self._distances.mem
+        numpy.take(self.neuron_distances, argmins, axis=0, out=gravity,
+                   mode="clip")
+        sigma = self.gravity_radius
+        gravity *= -1.0 / (2 * sigma * sigma)
+        numpy.exp(gravity, gravity)
 
-        for sindex in range(batch_size):
-            dist = self.weights.mem - self.input[sindex]
-            winner = numpy.argmin(self.numpy_linalg_norm(dist))
-            self.winners[winner] += 1
-            winner_coords = self._coords.mem[winner]
-            for nindex in range(neurons_number):
-                dist = self._coords.mem[nindex] - winner_coords
-                dists[nindex] = numpy.sum(dist * dist)
-            gravity = numpy.exp(dists / (-2 * sigma * sigma))
-            gradients += gravity.reshape((1, neurons_number)).transpose() * \
-                (self.input[sindex] - self.weights.mem) * gmult
-        self.weights.mem += gradients
+        # sum(gravity * (input - weights)) over the batch for each neuron
+        gmult = self.gradient_multiplier
+        gradients = numpy.dot(gravity.transpose(), inp)
+        gradients *= gmult
+        weights *= (1 - gmult * gravity.sum(axis=0))[:, None]
+        weights += gradients
 
     @iteration
     def ocl_run(self):
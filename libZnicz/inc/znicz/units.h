@@ -43,10 +43,30 @@ namespace znicz {
 class All2AllTanh;
 class All2AllSoftmax;
 class All2AllLinear;
+class Conv;
+class ConvTanh;
+class ConvSigmoid;
+class ConvRELU;
+class ConvStrictRELU;
+class MaxPooling;
+class AvgPooling;
+class LRNormalizerForward;
+class DropoutForward;
+class Cutter;
 
 DECLARE_UNIT(All2AllLinear);
 DECLARE_UNIT(All2AllSoftmax);
 DECLARE_UNIT(All2AllTanh);
+DECLARE_UNIT(Conv);
+DECLARE_UNIT(ConvTanh);
+DECLARE_UNIT(ConvSigmoid);
+DECLARE_UNIT(ConvRELU);
+DECLARE_UNIT(ConvStrictRELU);
+DECLARE_UNIT(MaxPooling);
+DECLARE_UNIT(AvgPooling);
+DECLARE_UNIT(LRNormalizerForward);
+DECLARE_UNIT(DropoutForward);
+DECLARE_UNIT(Cutter);
 
 }  // namespace znicz
 }  // namespace veles
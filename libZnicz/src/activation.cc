@@ -0,0 +1,90 @@
+/*! @file activation.cc
+ *  @brief Activation functions shared by the neural network layers.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/activation.h"
+#include <cmath>
+#include <stdexcept>
+#include <simd/arithmetic.h>
+
+namespace veles {
+namespace znicz {
+
+Activation ParseActivation(const std::string& name) {
+  if (name == "ACTIVATION_LINEAR") {
+    return Activation::kLinear;
+  }
+  if (name == "ACTIVATION_TANH") {
+    return Activation::kTanh;
+  }
+  if (name == "ACTIVATION_SIGMOID") {
+    return Activation::kSigmoid;
+  }
+  if (name == "ACTIVATION_RELU") {
+    return Activation::kRelu;
+  }
+  if (name == "ACTIVATION_STRICT_RELU") {
+    return Activation::kStrictRelu;
+  }
+  throw std::invalid_argument("Unsupported activation: " + name);
+}
+
+void ApplyActivation(Activation activation, float* data, size_t length) {
+  switch (activation) {
+    case Activation::kLinear:
+      break;
+    case Activation::kTanh:
+      // f(x) = 1.7159 * tanh(0.6666 * x)
+      real_multiply_scalar(data, length, 0.6666f, data);
+      for (size_t i = 0; i < length; i++) {
+        data[i] = std::tanh(data[i]);
+      }
+      real_multiply_scalar(data, length, 1.7159f, data);
+      break;
+    case Activation::kSigmoid:
+      // f(x) = 1 / (1 + exp(-x))
+      for (size_t i = 0; i < length; i++) {
+        data[i] = 1 / (1 + std::exp(-data[i]));
+      }
+      break;
+    case Activation::kRelu:
+      // f(x) = log(1 + exp(x)), which is x for large x
+      for (size_t i = 0; i < length; i++) {
+        if (data[i] <= 15) {
+          data[i] = std::log1p(std::exp(data[i]));
+        }
+      }
+      break;
+    case Activation::kStrictRelu:
+      // f(x) = max(x, 0)
+      for (size_t i = 0; i < length; i++) {
+        data[i] = data[i] > 0? data[i] : 0;
+      }
+      break;
+  }
+}
+
+}  // namespace znicz
+}  // namespace veles
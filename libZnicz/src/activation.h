@@ -0,0 +1,61 @@
+/*! @file activation.h
+ *  @brief Activation functions shared by the neural network layers.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_ACTIVATION_H_
+#define SRC_ACTIVATION_H_
+
+#include <string>
+
+namespace veles {
+namespace znicz {
+
+/** @brief Activation functions, the names are the same as the values of
+ *  activation_mode attribute of the exported Python units.
+ */
+enum class Activation {
+  kLinear,
+  kTanh,
+  kSigmoid,
+  kRelu,
+  kStrictRelu
+};
+
+/** @brief Parses activation_mode attribute ("ACTIVATION_TANH", etc.).
+ *  @param name The value of activation_mode
+ */
+Activation ParseActivation(const std::string& name);
+
+/** @brief Applies the activation function in-place.
+ *  @param activation The activation function
+ *  @param data Vector to be transformed
+ *  @param length Number of elements in the data vector
+ */
+void ApplyActivation(Activation activation, float* data, size_t length);
+
+}  // namespace znicz
+}  // namespace veles
+
+#endif  // SRC_ACTIVATION_H_
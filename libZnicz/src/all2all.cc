@@ -29,14 +29,18 @@
  */
 
 #include "src/all2all.h"
+#include <algorithm>
+#include <cmath>
 #include <simd/matrix.h>
 #include <simd/memory.h>
+#include "src/int8_gemm.h"
 
 namespace veles {
 namespace znicz {
 
 All2All::All2All(const std::shared_ptr<Engine>& engine)
-    : Unit(engine), include_bias_(true), weights_transposed_(false) {
+    : BatchedUnit(engine), input_scale_(1), quantized_(false),
+      include_bias_(true), weights_transposed_(false) {
 }
 
 std::vector<std::pair<std::string, std::string>>
@@ -54,36 +58,76 @@ void All2All::SetParameter(const std::string& name, const Property& value) {
       weights_.transposed = true;
       std::swap(weights_.shape[0], weights_.shape[1]);
     }
+  } else if (name == "int8_weights") {
+    // always stored row by row, one row per neuron
+    int8_weights_ = value.get<PackagedNumpyArray>().get<int8_t, 2>();
+    quantized_ = true;
+  } else if (name == "weights_scales") {
+    weights_scales_ = value.get<PackagedNumpyArray>().get<float, 1>();
+  } else if (name == "input_scale") {
+    input_scale_ = value.get<float>();
   } else if (name == "bias") {
     bias_ = value.get<PackagedNumpyArray>().get<float, 1>();
   } else if (name == "weights_transposed") {
     weights_transposed_ = !value.get<bool>();
   } else if (name == "include_bias") {
     include_bias_ = value.get<bool>();
+  } else {
+    BatchedUnit::SetParameter(name, value);
   }
 }
 
-size_t All2All::OutputSize() const noexcept {
-  return weights_.shape[1] * sizeof(float);
+size_t All2All::Neurons() const noexcept {
+  return quantized_? int8_weights_.shape[0] : weights_.shape[1];
+}
+
+size_t All2All::SampleInputSize() const noexcept {
+  return (quantized_? int8_weights_.shape[1] : weights_.shape[0]) *
+      sizeof(float);
+}
+
+size_t All2All::SampleOutputSize() const noexcept {
+  return Neurons() * sizeof(float);
 }
 
 void All2All::Initialize() {
-   Unit::Initialize();
+   BatchedUnit::Initialize();
    assert(Parents().size() < 2);
-   assert(bias_.shape[0] == weights_.shape[1]);
-   assert(weights_.transposed);
+   assert(!include_bias_ || bias_.shape[0] == Neurons());
+   if (quantized_) {
+     assert(weights_scales_.shape[0] == Neurons());
+     int8_input_.resize(batch_size_ * int8_weights_.shape[1]);
+   } else {
+     assert(weights_.transposed);
+   }
+}
+
+void All2All::ExecuteInt8(const float* input, float* out) {
+  size_t length = int8_weights_.shape[1];
+  int8_input_.resize(batch_size_ * length);
+  quantize_int8(input, int8_input_.size(), input_scale_, int8_input_.data());
+  int8_gemm_transposed(int8_input_.data(), batch_size_,
+                       int8_weights_.data.get_raw(), Neurons(), length,
+                       input_scale_, weights_scales_.data.get_raw(), out);
 }
 
 void All2All::Execute() {
-  auto input = Parents().size()?
-      reinterpret_cast<float*>(Parents()[0].lock()->output()) :
-      reinterpret_cast<const float*>(workflow()->input());
+  auto input = Input();
   auto out = reinterpret_cast<float*>(output());
-  matrix_multiply_transposed(
-      true, input, weights_.data.get_raw(), weights_.shape[0], 1,
-      weights_.shape[0], weights_.shape[1], out);
+  if (quantized_) {
+    ExecuteInt8(input, out);
+  } else {
+    // (batch x inputs) * (neurons x inputs)^T
+    matrix_multiply_transposed(
+        true, input, weights_.data.get_raw(), weights_.shape[0], batch_size_,
+        weights_.shape[0], weights_.shape[1], out);
+  }
   if (include_bias_) {
-    matrix_add(true, out, bias_.data.get_raw(), 1, bias_.shape[0], out);
+    size_t neurons = Neurons();
+    for (size_t b = 0; b < batch_size_; b++) {
+      matrix_add(true, out + b * neurons, bias_.data.get_raw(), 1,
+                 bias_.shape[0], out + b * neurons);
+    }
   }
   ApplyActivationFunction();
 }
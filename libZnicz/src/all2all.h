@@ -31,21 +31,24 @@
 #ifndef SRC_ALL2ALL_H_
 #define SRC_ALL2ALL_H_
 
+#include <cstdint>
 #include <string>
 #include <memory>
 #include <vector>
 #include <functional>
 #include <unordered_map>
 #include <veles/veles.h>
+#include "src/batched_unit.h"
 
 template <class T> class All2AllTest;
 
 namespace veles {
 namespace znicz {
 
-/** @brief "All to all" neural network layer
+/** @brief "All to all" neural network layer. The whole batch is multiplied
+ *  by the weights at once.
  */
-class All2All : public Unit {
+class All2All : public BatchedUnit {
  public:
   explicit All2All(const std::shared_ptr<Engine>& engine);
   virtual void SetParameter(
@@ -54,17 +57,25 @@ class All2All : public Unit {
   virtual std::vector<std::pair<std::string, std::string>>
   GetParameterDependencies() const noexcept override;
 
-  virtual size_t OutputSize() const noexcept override final;
-
   virtual void Initialize() override;
 
  protected:
   template <class T> friend class ::All2AllTest;
 
   virtual void Execute() override;
-  /** @brief Activation function used by the neural network layer.
-   *  @param data Vector to be transformed
-   *  @param length Number of elements in the data vector
+  virtual size_t SampleInputSize() const noexcept override final;
+  virtual size_t SampleOutputSize() const noexcept override final;
+  /** @brief Computes the weighted sums with int8 weights and int8 quantized
+   *  input, see int8_gemm_transposed().
+   *  @param input The float input matrix, one sample per row
+   *  @param out The output matrix, one sample per row
+   */
+  void ExecuteInt8(const float* input, float* out);
+  /** @brief Returns the number of neurons in the layer.
+   */
+  size_t Neurons() const noexcept;
+  /** @brief Activation function used by the neural network layer, it is
+   *  applied to each of batch_size() output rows of Neurons() elements.
    */
   virtual void ApplyActivationFunction() const = 0;
 
@@ -74,8 +85,24 @@ class All2All : public Unit {
   /** @brief Bias vector
    */
   NumpyArray<float, 1> bias_;
+  /** @brief Per-neuron int8 weights matrix (neurons x inputs), exported
+   *  instead of weights_ by quantized models
+   */
+  NumpyArray<int8_t, 2> int8_weights_;
+  /** @brief Per-neuron dequantization scales of int8_weights_
+   */
+  NumpyArray<float, 1> weights_scales_;
+  /** @brief Quantization scale of the input vector
+   */
+  float input_scale_;
+  bool quantized_;
   bool include_bias_;
   bool weights_transposed_;
+
+ private:
+  /** @brief The quantized input batch
+   */
+  std::vector<int8_t> int8_input_;
 };
 
 }  // namespace znicz
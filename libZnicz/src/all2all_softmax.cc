@@ -46,13 +46,15 @@ const std::string& All2AllSoftmax::Uuid() const noexcept {
 }
 
 void All2AllSoftmax::ApplyActivationFunction() const {
-  auto out = reinterpret_cast<float*>(output());
-  int length = weights_.shape[1];
-  float max = *std::max_element(out, out + length);
-  add_to_all(out, length, -max, out);
-  exp_psv(true, out, length, out);
-  float sum_exp = sum_elements(out, length);
-  real_multiply_scalar(out, length, 1 / sum_exp, out);
+  int length = Neurons();
+  for (size_t b = 0; b < batch_size(); b++) {
+    auto out = reinterpret_cast<float*>(output()) + b * length;
+    float max = *std::max_element(out, out + length);
+    add_to_all(out, length, -max, out);
+    exp_psv(true, out, length, out);
+    float sum_exp = sum_elements(out, length);
+    real_multiply_scalar(out, length, 1 / sum_exp, out);
+  }
 }
 
 REGISTER_UNIT(All2AllSoftmax);
@@ -46,7 +46,8 @@ const std::string& All2AllTanh::Uuid() const noexcept {
 
 void All2AllTanh::ApplyActivationFunction() const {
   auto out = reinterpret_cast<float*>(output());
-  int length = weights_.shape[1];
+  // element-wise, so the whole batch is processed at once
+  int length = Neurons() * batch_size();
   real_multiply_scalar(out, length, kScaleX, out);
   for (int i = 0; i < length; i++) {
     // TODO(v.markovtsev): consider adding vectorized tanh calculation to libSimd
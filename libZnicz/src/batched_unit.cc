@@ -0,0 +1,83 @@
+/*! @file batched_unit.cc
+ *  @brief Base class of the units which process a batch of samples at once.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/batched_unit.h"
+#include <cassert>
+#include <functional>
+#include <numeric>
+
+namespace veles {
+namespace znicz {
+
+void BatchedUnit::SetParameter(const std::string& name,
+                               const Property& value) {
+  if (name == "batch_size") {
+    int batch_size = value.get<int>();
+    assert(batch_size > 0);
+    set_batch_size(batch_size);
+  }
+}
+
+void BatchedUnit::Initialize() {
+  Unit::Initialize();
+  batch_size_ = batch_size();
+}
+
+size_t BatchedUnit::OutputSize() const noexcept {
+  return batch_size() * SampleOutputSize();
+}
+
+size_t BatchedUnit::InputSize() const noexcept {
+  return batch_size() * SampleInputSize();
+}
+
+size_t BatchedUnit::batch_size() const noexcept {
+  if (batch_size_set_ || Parents().empty()) {
+    return batch_size_;
+  }
+  auto parent = std::dynamic_pointer_cast<BatchedUnit>(
+      Parents()[0].lock());
+  return parent? parent->batch_size() : batch_size_;
+}
+
+void BatchedUnit::set_batch_size(size_t value) noexcept {
+  batch_size_ = value;
+  batch_size_set_ = true;
+}
+
+size_t BatchedUnit::ShapeSize(const std::vector<int>& shape) noexcept {
+  return std::accumulate(shape.begin(), shape.end(), static_cast<size_t>(1),
+                         std::multiplies<size_t>());
+}
+
+const float* BatchedUnit::Input() const {
+  return Parents().size()?
+      reinterpret_cast<const float*>(Parents()[0].lock()->output()) :
+      reinterpret_cast<const float*>(workflow()->input());
+}
+
+}  // namespace znicz
+}  // namespace veles
@@ -0,0 +1,96 @@
+/*! @file batched_unit.h
+ *  @brief Base class of the units which process a batch of samples at once.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_BATCHED_UNIT_H_
+#define SRC_BATCHED_UNIT_H_
+
+#include <string>
+#include <memory>
+#include <vector>
+#include <veles/veles.h>
+
+namespace veles {
+namespace znicz {
+
+/** @brief Base class of the units which process a batch of samples at
+ *  once. The input and the output hold batch_size samples one after
+ *  another. The batch size is set for the whole workflow: the units
+ *  which are not given the batch_size parameter take it from their parent,
+ *  so it is enough to set it on the first unit (1 by default). It must be
+ *  set before the output buffers are allocated, and the workflow input
+ *  must be InputSize() bytes of the first unit.
+ */
+class BatchedUnit : public Unit {
+ public:
+  explicit BatchedUnit(const std::shared_ptr<Engine>& engine)
+      : Unit(engine), batch_size_(1), batch_size_set_(false) {}
+  virtual void SetParameter(
+      const std::string& name, const Property& value) override;
+
+  virtual void Initialize() override;
+  virtual size_t OutputSize() const noexcept override final;
+  /** @brief Returns the size of the input of batch_size() samples in
+   *  bytes.
+   */
+  size_t InputSize() const noexcept;
+
+  /** @brief Returns the batch size set on this unit or, if it was not set,
+   *  the batch size of the parent.
+   */
+  size_t batch_size() const noexcept;
+  /** @brief Sets the batch size of this unit and of the children which do
+   *  not set their own one.
+   */
+  void set_batch_size(size_t value) noexcept;
+
+ protected:
+  /** @brief Returns the size of a single input sample in bytes.
+   */
+  virtual size_t SampleInputSize() const noexcept = 0;
+  /** @brief Returns the size of a single output sample in bytes.
+   */
+  virtual size_t SampleOutputSize() const noexcept = 0;
+  /** @brief Returns the output of the parent unit or the workflow input
+   *  if there is no parent.
+   */
+  const float* Input() const;
+  /** @brief Returns the number of elements in the sample of the given
+   *  shape.
+   */
+  static size_t ShapeSize(const std::vector<int>& shape) noexcept;
+
+  /** @brief The batch size, batch_size() is copied here on Initialize()
+   */
+  size_t batch_size_;
+
+ private:
+  bool batch_size_set_;
+};
+
+}  // namespace znicz
+}  // namespace veles
+
+#endif  // SRC_BATCHED_UNIT_H_
@@ -0,0 +1,231 @@
+/*! @file conv.cc
+ *  @brief Convolutional neural network layer.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/conv.h"
+#include <algorithm>
+#include <cstring>
+#include <simd/matrix.h>
+#include "src/int8_gemm.h"
+
+namespace veles {
+namespace znicz {
+
+const std::string Conv::uuid_ = "9434b459-b8c3-4775-b833-cd2944a4b34f";
+const std::string ConvTanh::uuid_ = "77354eef-428b-4fca-bc96-74ca3d620ccf";
+const std::string ConvSigmoid::uuid_ = "bf139d31-12f3-48ca-b7fa-902a20801fde";
+const std::string ConvRELU::uuid_ = "222cafaf-423f-4330-8f29-62ebf32d90e9";
+const std::string ConvStrictRELU::uuid_ =
+    "1c226f63-1d2c-400d-828e-07f47596b033";
+
+Conv::Conv(const std::shared_ptr<Engine>& engine)
+    : BatchedUnit(engine), input_scale_(1), quantized_(false),
+      include_bias_(true),
+      weights_transposed_(false), activation_(Activation::kLinear),
+      kx_(0), ky_(0), n_kernels_(0), padding_(4, 0), sliding_(2, 1) {
+}
+
+const std::string& Conv::Uuid() const noexcept {
+  return uuid_;
+}
+
+const std::string& ConvTanh::Uuid() const noexcept {
+  return uuid_;
+}
+
+const std::string& ConvSigmoid::Uuid() const noexcept {
+  return uuid_;
+}
+
+const std::string& ConvRELU::Uuid() const noexcept {
+  return uuid_;
+}
+
+const std::string& ConvStrictRELU::Uuid() const noexcept {
+  return uuid_;
+}
+
+void Conv::SetParameter(const std::string& name, const Property& value) {
+  if (name == "weights") {
+    weights_ = value.get<PackagedNumpyArray>().get<float, 2>();
+  } else if (name == "int8_weights") {
+    int8_weights_ = value.get<PackagedNumpyArray>().get<int8_t, 2>();
+    quantized_ = true;
+  } else if (name == "weights_scales") {
+    weights_scales_ = value.get<PackagedNumpyArray>().get<float, 1>();
+  } else if (name == "input_scale") {
+    input_scale_ = value.get<float>();
+  } else if (name == "bias") {
+    bias_ = value.get<PackagedNumpyArray>().get<float, 1>();
+  } else if (name == "weights_transposed") {
+    weights_transposed_ = value.get<bool>();
+  } else if (name == "include_bias") {
+    include_bias_ = value.get<bool>();
+  } else if (name == "activation_mode") {
+    activation_ = ParseActivation(value.get<std::string>());
+  } else if (name == "kx") {
+    kx_ = value.get<int>();
+  } else if (name == "ky") {
+    ky_ = value.get<int>();
+  } else if (name == "n_kernels") {
+    n_kernels_ = value.get<int>();
+  } else if (name == "padding") {
+    padding_ = value.get<std::vector<int>>();
+  } else if (name == "sliding") {
+    sliding_ = value.get<std::vector<int>>();
+  } else if (name == "input_sample_shape") {
+    input_shape_ = value.get<std::vector<int>>();
+  } else {
+    BatchedUnit::SetParameter(name, value);
+  }
+}
+
+size_t Conv::Channels() const noexcept {
+  return input_shape_.size() > 2? input_shape_[2] : 1;
+}
+
+size_t Conv::KernelSize() const noexcept {
+  return kx_ * ky_ * Channels();
+}
+
+size_t Conv::KernelApplicationsX() const noexcept {
+  return 1 + (input_shape_[1] + padding_[0] + padding_[2] - kx_) /
+      sliding_[0];
+}
+
+size_t Conv::KernelApplicationsY() const noexcept {
+  return 1 + (input_shape_[0] + padding_[1] + padding_[3] - ky_) /
+      sliding_[1];
+}
+
+size_t Conv::SampleInputSize() const noexcept {
+  return input_shape_[0] * input_shape_[1] * Channels() * sizeof(float);
+}
+
+size_t Conv::SampleOutputSize() const noexcept {
+  return KernelApplicationsX() * KernelApplicationsY() * n_kernels_ *
+      sizeof(float);
+}
+
+void Conv::Initialize() {
+  BatchedUnit::Initialize();
+  assert(Parents().size() < 2);
+  assert(input_shape_.size() >= 2);
+  assert(padding_.size() == 4 && sliding_.size() == 2);
+  assert(!include_bias_ || bias_.shape[0] == static_cast<size_t>(n_kernels_));
+  size_t kernel_size = KernelSize();
+  size_t applications = KernelApplicationsX() * KernelApplicationsY();
+  unpacked_.resize(applications * kernel_size);
+  if (quantized_) {
+    // the kernels stay int8, see Execute()
+    assert(int8_weights_.shape[0] == static_cast<size_t>(n_kernels_));
+    assert(int8_weights_.shape[1] == kernel_size);
+    assert(weights_scales_.shape[0] == static_cast<size_t>(n_kernels_));
+    kernels_.clear();
+    int8_unpacked_.resize(unpacked_.size());
+    return;
+  }
+  kernels_.resize(n_kernels_ * kernel_size);
+  if (weights_transposed_) {
+    // kernel size x n_kernels
+    auto weights = weights_.data.get_raw();
+    for (int k = 0; k < n_kernels_; k++) {
+      for (size_t i = 0; i < kernel_size; i++) {
+        kernels_[k * kernel_size + i] = weights[i * n_kernels_ + k];
+      }
+    }
+  } else {
+    auto weights = weights_.data.get_raw();
+    std::copy(weights, weights + kernels_.size(), kernels_.begin());
+  }
+}
+
+void Conv::Unpack(const float* input) {
+  int height = input_shape_[0], width = input_shape_[1];
+  size_t channels = Channels(), kernel_size = KernelSize();
+  size_t kx_app = KernelApplicationsX(), ky_app = KernelApplicationsY();
+  for (size_t y = 0; y < ky_app; y++) {
+    for (size_t x = 0; x < kx_app; x++) {
+      auto row = unpacked_.data() + (y * kx_app + x) * kernel_size;
+      for (int dy = 0; dy < ky_; dy++) {
+        int iy = y * sliding_[1] + dy - padding_[1];
+        for (int dx = 0; dx < kx_; dx++) {
+          int ix = x * sliding_[0] + dx - padding_[0];
+          auto dst = row + (dy * kx_ + dx) * channels;
+          if (iy < 0 || iy >= height || ix < 0 || ix >= width) {
+            std::fill(dst, dst + channels, 0.f);
+          } else {
+            memcpy(dst, input + (iy * width + ix) * channels,
+                   channels * sizeof(float));
+          }
+        }
+      }
+    }
+  }
+}
+
+void Conv::Execute() {
+  size_t applications = KernelApplicationsX() * KernelApplicationsY();
+  size_t kernel_size = KernelSize();
+  size_t input_size = input_shape_[0] * input_shape_[1] * Channels();
+  for (size_t b = 0; b < batch_size_; b++) {
+    auto out = reinterpret_cast<float*>(output()) +
+        b * applications * n_kernels_;
+    Unpack(Input() + b * input_size);
+    if (quantized_) {
+      quantize_int8(unpacked_.data(), unpacked_.size(), input_scale_,
+                    int8_unpacked_.data());
+      int8_gemm_transposed(
+          int8_unpacked_.data(), applications, int8_weights_.data.get_raw(),
+          n_kernels_, kernel_size, input_scale_,
+          weights_scales_.data.get_raw(), out);
+    } else {
+      // (applications x kernel size) * (n_kernels x kernel size)^T
+      matrix_multiply_transposed(
+          true, unpacked_.data(), kernels_.data(), kernel_size, applications,
+          kernel_size, n_kernels_, out);
+    }
+    if (include_bias_) {
+      auto bias = bias_.data.get_raw();
+      for (size_t i = 0; i < applications; i++) {
+        auto dst = out + i * n_kernels_;
+        for (int k = 0; k < n_kernels_; k++) {
+          dst[k] += bias[k];
+        }
+      }
+    }
+  }
+  ApplyActivation(activation_, reinterpret_cast<float*>(output()),
+                  batch_size_ * applications * n_kernels_);
+}
+
+REGISTER_UNIT(Conv);
+REGISTER_UNIT(ConvTanh);
+REGISTER_UNIT(ConvSigmoid);
+REGISTER_UNIT(ConvRELU);
+REGISTER_UNIT(ConvStrictRELU);
+
+}  // namespace znicz
+}  // namespace veles
@@ -0,0 +1,184 @@
+/*! @file conv.h
+ *  @brief Convolutional neural network layer.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_CONV_H_
+#define SRC_CONV_H_
+
+#include <cstdint>
+#include <string>
+#include <memory>
+#include <vector>
+#include <veles/veles.h>
+#include "src/activation.h"
+#include "src/batched_unit.h"
+
+#if __GNUC__ >= 4
+#pragma GCC visibility push(default)
+#endif
+
+template <class T> class ConvTest;
+
+namespace veles {
+namespace znicz {
+
+/** @brief Convolutional neural network layer. The input and the output are
+ *  batches of multichannel interleaved images (height x width x channels). The
+ *  activation function defaults to the one of the class and is overridden
+ *  by activation_mode attribute.
+ */
+class Conv : public BatchedUnit {
+ public:
+  explicit Conv(const std::shared_ptr<Engine>& engine);
+  virtual const std::string& Uuid() const noexcept override;
+  virtual void SetParameter(
+      const std::string& name, const Property& value) override;
+
+  virtual void Initialize() override;
+
+ protected:
+  template <class T> friend class ::ConvTest;
+
+  virtual void Execute() override;
+  virtual size_t SampleInputSize() const noexcept override final;
+  virtual size_t SampleOutputSize() const noexcept override final;
+  /** @brief Unrolls the input image into the matrix of kernel applications
+   *  (im2col), the padding is filled with zeros.
+   *  @param input The input image
+   */
+  void Unpack(const float* input);
+
+  size_t Channels() const noexcept;
+  size_t KernelSize() const noexcept;
+  size_t KernelApplicationsX() const noexcept;
+  size_t KernelApplicationsY() const noexcept;
+
+  /** @brief Weights matrix, n_kernels x kernel size unless transposed
+   */
+  NumpyArray<float, 2> weights_;
+  /** @brief Per-kernel int8 weights of quantized models
+   */
+  NumpyArray<int8_t, 2> int8_weights_;
+  NumpyArray<float, 1> weights_scales_;
+  NumpyArray<float, 1> bias_;
+  /** @brief Quantization scale of the input of quantized models
+   */
+  float input_scale_;
+  bool quantized_;
+  bool include_bias_;
+  bool weights_transposed_;
+  Activation activation_;
+  int kx_;
+  int ky_;
+  int n_kernels_;
+  /** @brief left, top, right, bottom
+   */
+  std::vector<int> padding_;
+  /** @brief x, y
+   */
+  std::vector<int> sliding_;
+  /** @brief height, width[, channels]
+   */
+  std::vector<int> input_shape_;
+
+ private:
+  /** @brief n_kernels x kernel size float kernels, empty if quantized
+   */
+  std::vector<float> kernels_;
+  std::vector<float> unpacked_;
+  /** @brief unpacked_ quantized to int8
+   */
+  std::vector<int8_t> int8_unpacked_;
+  static const std::string uuid_;
+};
+
+/** @brief Conv with scaled tanh() activation f(x) = 1.7159 * tanh(0.6666 * x)
+ */
+class ConvTanh : public Conv {
+ public:
+  explicit ConvTanh(const std::shared_ptr<Engine>& engine) : Conv(engine) {
+    activation_ = Activation::kTanh;
+  }
+  virtual const std::string& Uuid() const noexcept override final;
+
+ private:
+  static const std::string uuid_;
+};
+
+/** @brief Conv with sigmoid activation f(x) = 1 / (1 + exp(-x))
+ */
+class ConvSigmoid : public Conv {
+ public:
+  explicit ConvSigmoid(const std::shared_ptr<Engine>& engine)
+      : Conv(engine) {
+    activation_ = Activation::kSigmoid;
+  }
+  virtual const std::string& Uuid() const noexcept override final;
+
+ private:
+  static const std::string uuid_;
+};
+
+/** @brief Conv with smooth RELU activation f(x) = log(1 + exp(x))
+ */
+class ConvRELU : public Conv {
+ public:
+  explicit ConvRELU(const std::shared_ptr<Engine>& engine) : Conv(engine) {
+    activation_ = Activation::kRelu;
+  }
+  virtual const std::string& Uuid() const noexcept override final;
+
+ private:
+  static const std::string uuid_;
+};
+
+/** @brief Conv with strict RELU activation f(x) = max(x, 0)
+ */
+class ConvStrictRELU : public Conv {
+ public:
+  explicit ConvStrictRELU(const std::shared_ptr<Engine>& engine)
+      : Conv(engine) {
+    activation_ = Activation::kStrictRelu;
+  }
+  virtual const std::string& Uuid() const noexcept override final;
+
+ private:
+  static const std::string uuid_;
+};
+
+DECLARE_UNIT(Conv);
+DECLARE_UNIT(ConvTanh);
+DECLARE_UNIT(ConvSigmoid);
+DECLARE_UNIT(ConvRELU);
+DECLARE_UNIT(ConvStrictRELU);
+
+}  // namespace znicz
+}  // namespace veles
+
+#if __GNUC__ >= 4
+#pragma GCC visibility pop
+#endif
+
+#endif  // SRC_CONV_H_
@@ -0,0 +1,98 @@
+/*! @file cutter.cc
+ *  @brief Cuts a rectangular area from the input image.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/cutter.h"
+#include <cstring>
+
+namespace veles {
+namespace znicz {
+
+const std::string Cutter::uuid_ = "5c1750fe-4133-483e-91a0-61922db2cf34";
+
+Cutter::Cutter(const std::shared_ptr<Engine>& engine)
+    : BatchedUnit(engine), padding_(4, 0) {
+}
+
+const std::string& Cutter::Uuid() const noexcept {
+  return uuid_;
+}
+
+void Cutter::SetParameter(const std::string& name, const Property& value) {
+  if (name == "padding") {
+    padding_ = value.get<std::vector<int>>();
+  } else if (name == "input_sample_shape") {
+    input_shape_ = value.get<std::vector<int>>();
+  } else {
+    BatchedUnit::SetParameter(name, value);
+  }
+}
+
+size_t Cutter::Channels() const noexcept {
+  return input_shape_.size() > 2? input_shape_[2] : 1;
+}
+
+size_t Cutter::OutputWidth() const noexcept {
+  return input_shape_[1] - padding_[0] - padding_[2];
+}
+
+size_t Cutter::OutputHeight() const noexcept {
+  return input_shape_[0] - padding_[1] - padding_[3];
+}
+
+size_t Cutter::SampleInputSize() const noexcept {
+  return ShapeSize(input_shape_) * sizeof(float);
+}
+
+size_t Cutter::SampleOutputSize() const noexcept {
+  return OutputWidth() * OutputHeight() * Channels() * sizeof(float);
+}
+
+void Cutter::Initialize() {
+  BatchedUnit::Initialize();
+  assert(Parents().size() < 2);
+  assert(input_shape_.size() >= 2 && padding_.size() == 4);
+}
+
+void Cutter::Execute() {
+  size_t channels = Channels();
+  size_t row_size = OutputWidth() * channels;
+  size_t input_row_size = input_shape_[1] * channels;
+  for (size_t b = 0; b < batch_size_; b++) {
+    auto out = reinterpret_cast<float*>(output()) +
+        b * OutputHeight() * row_size;
+    auto src = Input() + b * input_shape_[0] * input_row_size +
+        padding_[1] * input_row_size + padding_[0] * channels;
+    for (size_t y = 0; y < OutputHeight(); y++) {
+      memcpy(out + y * row_size, src + y * input_row_size,
+             row_size * sizeof(float));
+    }
+  }
+}
+
+REGISTER_UNIT(Cutter);
+
+}  // namespace znicz
+}  // namespace veles
@@ -0,0 +1,84 @@
+/*! @file cutter.h
+ *  @brief Cuts a rectangular area from the input image.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_CUTTER_H_
+#define SRC_CUTTER_H_
+
+#include <string>
+#include <memory>
+#include <vector>
+#include <veles/veles.h>
+#include "src/batched_unit.h"
+
+#if __GNUC__ >= 4
+#pragma GCC visibility push(default)
+#endif
+
+namespace veles {
+namespace znicz {
+
+/** @brief Cuts a rectangular area from the input image, padding is the
+ *  number of the left, top, right and bottom pixels to drop.
+ */
+class Cutter : public BatchedUnit {
+ public:
+  explicit Cutter(const std::shared_ptr<Engine>& engine);
+  virtual const std::string& Uuid() const noexcept override final;
+  virtual void SetParameter(
+      const std::string& name, const Property& value) override;
+
+  virtual void Initialize() override;
+
+ protected:
+  virtual void Execute() override;
+  virtual size_t SampleInputSize() const noexcept override final;
+  virtual size_t SampleOutputSize() const noexcept override final;
+
+  size_t Channels() const noexcept;
+  size_t OutputWidth() const noexcept;
+  size_t OutputHeight() const noexcept;
+
+  /** @brief left, top, right, bottom
+   */
+  std::vector<int> padding_;
+  /** @brief height, width[, channels]
+   */
+  std::vector<int> input_shape_;
+
+ private:
+  static const std::string uuid_;
+};
+
+DECLARE_UNIT(Cutter);
+
+}  // namespace znicz
+}  // namespace veles
+
+#if __GNUC__ >= 4
+#pragma GCC visibility pop
+#endif
+
+#endif  // SRC_CUTTER_H_
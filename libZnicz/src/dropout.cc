@@ -0,0 +1,67 @@
+/*! @file dropout.cc
+ *  @brief Dropout layer, which passes the input through during inference.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/dropout.h"
+#include <cstring>
+#include <functional>
+#include <numeric>
+
+namespace veles {
+namespace znicz {
+
+const std::string DropoutForward::uuid_ =
+    "c4117362-3c89-41bf-ba7d-a6b1bb0d8331";
+
+const std::string& DropoutForward::Uuid() const noexcept {
+  return uuid_;
+}
+
+void DropoutForward::SetParameter(const std::string& name,
+                                  const Property& value) {
+  if (name == "input_sample_shape") {
+    input_shape_ = value.get<std::vector<int>>();
+  } else {
+    BatchedUnit::SetParameter(name, value);
+  }
+}
+
+size_t DropoutForward::SampleInputSize() const noexcept {
+  return SampleOutputSize();
+}
+
+size_t DropoutForward::SampleOutputSize() const noexcept {
+  return std::accumulate(input_shape_.begin(), input_shape_.end(), 1,
+                         std::multiplies<int>()) * sizeof(float);
+}
+
+void DropoutForward::Execute() {
+  memcpy(output(), Input(), OutputSize());
+}
+
+REGISTER_UNIT(DropoutForward);
+
+}  // namespace znicz
+}  // namespace veles
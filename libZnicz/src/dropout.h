@@ -0,0 +1,74 @@
+/*! @file dropout.h
+ *  @brief Dropout layer, which passes the input through during inference.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_DROPOUT_H_
+#define SRC_DROPOUT_H_
+
+#include <string>
+#include <memory>
+#include <vector>
+#include <veles/veles.h>
+#include "src/batched_unit.h"
+
+#if __GNUC__ >= 4
+#pragma GCC visibility push(default)
+#endif
+
+namespace veles {
+namespace znicz {
+
+/** @brief Dropout layer. Nothing is dropped during inference, so the input
+ *  is copied to the output as is.
+ */
+class DropoutForward : public BatchedUnit {
+ public:
+  explicit DropoutForward(const std::shared_ptr<Engine>& engine)
+      : BatchedUnit(engine) {}
+  virtual const std::string& Uuid() const noexcept override final;
+  virtual void SetParameter(
+      const std::string& name, const Property& value) override;
+
+ protected:
+  virtual void Execute() override;
+  virtual size_t SampleInputSize() const noexcept override final;
+  virtual size_t SampleOutputSize() const noexcept override final;
+
+  std::vector<int> input_shape_;
+
+ private:
+  static const std::string uuid_;
+};
+
+DECLARE_UNIT(DropoutForward);
+
+}  // namespace znicz
+}  // namespace veles
+
+#if __GNUC__ >= 4
+#pragma GCC visibility pop
+#endif
+
+#endif  // SRC_DROPOUT_H_
@@ -0,0 +1,96 @@
+/*! @file int8_gemm.cc
+ *  @brief Matrix multiplication of int8 quantized matrices.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+// the release builds use -O2, which does not vectorize loops on older GCC
+#if defined(__GNUC__) && !defined(__clang__)
+#pragma GCC optimize("tree-vectorize")
+#endif
+
+#include "src/int8_gemm.h"
+#include <algorithm>
+#include <cmath>
+
+namespace veles {
+namespace znicz {
+
+namespace {
+
+/** @brief The number of rows of a multiplied by each row of b at once.
+ */
+const size_t kRowBlock = 4;
+
+}  // namespace
+
+void quantize_int8(const float* src, size_t length, float scale,
+                   int8_t* dst) {
+  float inverse_scale = 1 / scale;
+  for (size_t i = 0; i < length; i++) {
+    float value = std::round(src[i] * inverse_scale);
+    dst[i] = static_cast<int8_t>(std::min(127.f, std::max(-127.f, value)));
+  }
+}
+
+void int8_gemm_transposed(const int8_t* a, size_t rows, const int8_t* b,
+                          size_t columns, size_t length, float a_scale,
+                          const float* b_scales, float* out) {
+  size_t r = 0;
+  for (; r + kRowBlock <= rows; r += kRowBlock) {
+    const int8_t* a0 = a + r * length;
+    const int8_t* a1 = a0 + length;
+    const int8_t* a2 = a1 + length;
+    const int8_t* a3 = a2 + length;
+    for (size_t c = 0; c < columns; c++) {
+      const int8_t* row = b + c * length;
+      int32_t s0 = 0, s1 = 0, s2 = 0, s3 = 0;
+      for (size_t i = 0; i < length; i++) {
+        int16_t w = row[i];
+        s0 += static_cast<int16_t>(w * a0[i]);
+        s1 += static_cast<int16_t>(w * a1[i]);
+        s2 += static_cast<int16_t>(w * a2[i]);
+        s3 += static_cast<int16_t>(w * a3[i]);
+      }
+      float scale = a_scale * b_scales[c];
+      out[r * columns + c] = s0 * scale;
+      out[(r + 1) * columns + c] = s1 * scale;
+      out[(r + 2) * columns + c] = s2 * scale;
+      out[(r + 3) * columns + c] = s3 * scale;
+    }
+  }
+  for (; r < rows; r++) {
+    const int8_t* a0 = a + r * length;
+    for (size_t c = 0; c < columns; c++) {
+      const int8_t* row = b + c * length;
+      int32_t sum = 0;
+      for (size_t i = 0; i < length; i++) {
+        sum += static_cast<int16_t>(static_cast<int16_t>(row[i]) * a0[i]);
+      }
+      out[r * columns + c] = sum * a_scale * b_scales[c];
+    }
+  }
+}
+
+}  // namespace znicz
+}  // namespace veles
@@ -0,0 +1,69 @@
+/*! @file int8_gemm.h
+ *  @brief Matrix multiplication of int8 quantized matrices.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_INT8_GEMM_H_
+#define SRC_INT8_GEMM_H_
+
+#include <cstddef>
+#include <cstdint>
+
+namespace veles {
+namespace znicz {
+
+/** @brief Quantizes the values to int8: rounds value / scale and clamps it
+ *  to [-127, 127].
+ *  @param src The values to quantize
+ *  @param length Number of elements in src
+ *  @param scale The quantization scale
+ *  @param dst The quantized values
+ */
+void quantize_int8(const float* src, size_t length, float scale,
+                   int8_t* dst);
+
+/** @brief Calculates the dequantized product of int8 matrices,
+ *  out = (a * b^T) * a_scale * b_scales[column].
+ *
+ *  The products are widened to int16 and accumulated in int32. Each row of
+ *  b is multiplied by several rows of a at once, and the inner loop has no
+ *  dependencies but the sums, so that the compiler vectorizes it (pmaddwd
+ *  on x86, smlal on ARM).
+ *  @param a The left matrix, rows x length
+ *  @param rows Number of rows in a
+ *  @param b The right matrix, columns x length
+ *  @param columns Number of rows in b
+ *  @param length The length of the rows of a and b
+ *  @param a_scale The quantization scale of a
+ *  @param b_scales The quantization scales of the rows of b
+ *  @param out The output matrix, rows x columns
+ */
+void int8_gemm_transposed(const int8_t* a, size_t rows, const int8_t* b,
+                          size_t columns, size_t length, float a_scale,
+                          const float* b_scales, float* out);
+
+}  // namespace znicz
+}  // namespace veles
+
+#endif  // SRC_INT8_GEMM_H_
@@ -0,0 +1,107 @@
+/*! @file normalization.cc
+ *  @brief Local response normalization layer.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/normalization.h"
+#include <algorithm>
+#include <cmath>
+
+namespace veles {
+namespace znicz {
+
+const std::string LRNormalizerForward::uuid_ =
+    "811d95a5-d8a1-44c2-aea5-8f5328059eb9";
+
+LRNormalizerForward::LRNormalizerForward(
+    const std::shared_ptr<Engine>& engine)
+    : BatchedUnit(engine), alpha_(0.0001), beta_(0.75), k_(2), n_(5) {
+}
+
+const std::string& LRNormalizerForward::Uuid() const noexcept {
+  return uuid_;
+}
+
+void LRNormalizerForward::SetParameter(const std::string& name,
+                                       const Property& value) {
+  if (name == "alpha") {
+    alpha_ = value.get<float>();
+  } else if (name == "beta") {
+    beta_ = value.get<float>();
+  } else if (name == "k") {
+    k_ = value.get<float>();
+  } else if (name == "n") {
+    n_ = value.get<int>();
+  } else if (name == "input_sample_shape") {
+    input_shape_ = value.get<std::vector<int>>();
+  } else {
+    BatchedUnit::SetParameter(name, value);
+  }
+}
+
+size_t LRNormalizerForward::Channels() const noexcept {
+  return input_shape_[2];
+}
+
+size_t LRNormalizerForward::Pixels() const noexcept {
+  return input_shape_[0] * input_shape_[1];
+}
+
+size_t LRNormalizerForward::SampleInputSize() const noexcept {
+  return SampleOutputSize();
+}
+
+size_t LRNormalizerForward::SampleOutputSize() const noexcept {
+  return Pixels() * Channels() * sizeof(float);
+}
+
+void LRNormalizerForward::Initialize() {
+  BatchedUnit::Initialize();
+  assert(Parents().size() < 2);
+  assert(input_shape_.size() == 3);
+}
+
+void LRNormalizerForward::Execute() {
+  auto input = Input();
+  auto out = reinterpret_cast<float*>(output());
+  int channels = Channels(), half = n_ / 2;
+  // the pixels of all the samples are normalized independently
+  for (size_t i = 0; i < batch_size_ * Pixels(); i++) {
+    auto src = input + i * channels;
+    auto dst = out + i * channels;
+    for (int c = 0; c < channels; c++) {
+      float sum = 0;
+      for (int j = std::max(0, c - half);
+           j <= std::min(channels - 1, c + half); j++) {
+        sum += src[j] * src[j];
+      }
+      dst[c] = src[c] / std::pow(k_ + alpha_ * sum, beta_);
+    }
+  }
+}
+
+REGISTER_UNIT(LRNormalizerForward);
+
+}  // namespace znicz
+}  // namespace veles
@@ -0,0 +1,144 @@
+/*! @file pooling.cc
+ *  @brief Max and average pooling neural network layers.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#include "src/pooling.h"
+#include <algorithm>
+
+namespace veles {
+namespace znicz {
+
+const std::string MaxPooling::uuid_ = "63890b65-e66e-43a4-b616-ebbd56c36417";
+const std::string AvgPooling::uuid_ = "940ff6f4-7662-4f0c-8b72-e20bce11a434";
+
+Pooling::Pooling(const std::shared_ptr<Engine>& engine)
+    : BatchedUnit(engine), kx_(0), ky_(0) {
+}
+
+void Pooling::SetParameter(const std::string& name, const Property& value) {
+  if (name == "kx") {
+    kx_ = value.get<int>();
+  } else if (name == "ky") {
+    ky_ = value.get<int>();
+  } else if (name == "sliding") {
+    sliding_ = value.get<std::vector<int>>();
+  } else if (name == "input_sample_shape") {
+    input_shape_ = value.get<std::vector<int>>();
+  } else {
+    BatchedUnit::SetParameter(name, value);
+  }
+}
+
+size_t Pooling::Channels() const noexcept {
+  return input_shape_.size() > 2? input_shape_[2] : 1;
+}
+
+size_t Pooling::OutputWidth() const noexcept {
+  // the last window may be partial
+  return (input_shape_[1] - kx_ + sliding_[0] - 1) / sliding_[0] + 1;
+}
+
+size_t Pooling::OutputHeight() const noexcept {
+  return (input_shape_[0] - ky_ + sliding_[1] - 1) / sliding_[1] + 1;
+}
+
+size_t Pooling::SampleInputSize() const noexcept {
+  return ShapeSize(input_shape_) * sizeof(float);
+}
+
+size_t Pooling::SampleOutputSize() const noexcept {
+  return OutputWidth() * OutputHeight() * Channels() * sizeof(float);
+}
+
+void Pooling::Initialize() {
+  BatchedUnit::Initialize();
+  assert(Parents().size() < 2);
+  assert(input_shape_.size() >= 2);
+  if (sliding_.empty()) {
+    sliding_ = {kx_, ky_};
+  }
+  assert(sliding_.size() == 2);
+}
+
+void Pooling::Execute() {
+  int height = input_shape_[0], width = input_shape_[1];
+  size_t channels = Channels(), row_stride = width * channels;
+  size_t out_width = OutputWidth(), out_height = OutputHeight();
+  for (size_t b = 0; b < batch_size_; b++) {
+    auto input = Input() + b * height * row_stride;
+    auto out = reinterpret_cast<float*>(output()) +
+        b * out_height * out_width * channels;
+    for (size_t y = 0; y < out_height; y++) {
+      int iy = y * sliding_[1];
+      int window_height = std::min(ky_, height - iy);
+      for (size_t x = 0; x < out_width; x++) {
+        int ix = x * sliding_[0];
+        int window_width = std::min(kx_, width - ix);
+        auto window = input + iy * row_stride + ix * channels;
+        auto dst = out + (y * out_width + x) * channels;
+        for (size_t c = 0; c < channels; c++) {
+          dst[c] = Pool(window + c, window_width, window_height, row_stride,
+                        channels);
+        }
+      }
+    }
+  }
+}
+
+const std::string& MaxPooling::Uuid() const noexcept {
+  return uuid_;
+}
+
+float MaxPooling::Pool(const float* input, int width, int height,
+                       size_t row_stride, size_t channels) const noexcept {
+  float max = input[0];
+  for (int y = 0; y < height; y++) {
+    for (int x = 0; x < width; x++) {
+      max = std::max(max, input[y * row_stride + x * channels]);
+    }
+  }
+  return max;
+}
+
+const std::string& AvgPooling::Uuid() const noexcept {
+  return uuid_;
+}
+
+float AvgPooling::Pool(const float* input, int width, int height,
+                       size_t row_stride, size_t channels) const noexcept {
+  float sum = 0;
+  for (int y = 0; y < height; y++) {
+    for (int x = 0; x < width; x++) {
+      sum += input[y * row_stride + x * channels];
+    }
+  }
+  return sum / (width * height);
+}
+
+REGISTER_UNIT(MaxPooling);
+REGISTER_UNIT(AvgPooling);
+
+}  // namespace znicz
+}  // namespace veles
@@ -0,0 +1,130 @@
+/*! @file pooling.h
+ *  @brief Max and average pooling neural network layers.
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#ifndef SRC_POOLING_H_
+#define SRC_POOLING_H_
+
+#include <string>
+#include <memory>
+#include <vector>
+#include <veles/veles.h>
+#include "src/batched_unit.h"
+
+#if __GNUC__ >= 4
+#pragma GCC visibility push(default)
+#endif
+
+template <class T> class PoolingTest;
+
+namespace veles {
+namespace znicz {
+
+/** @brief Pooling layer base. The windows at the right and the bottom
+ *  borders may be partial, then only the existing elements are pooled.
+ */
+class Pooling : public BatchedUnit {
+ public:
+  explicit Pooling(const std::shared_ptr<Engine>& engine);
+  virtual void SetParameter(
+      const std::string& name, const Property& value) override;
+
+  virtual void Initialize() override;
+
+ protected:
+  template <class T> friend class ::PoolingTest;
+
+  virtual void Execute() override;
+  virtual size_t SampleInputSize() const noexcept override final;
+  virtual size_t SampleOutputSize() const noexcept override final;
+  /** @brief Pools a single window.
+   *  @param input Pointer to the first element of the window
+   *  @param width Number of window columns
+   *  @param height Number of window rows
+   *  @param row_stride Distance between the window rows
+   *  @param channels Distance between the window columns
+   */
+  virtual float Pool(const float* input, int width, int height,
+                     size_t row_stride, size_t channels) const noexcept = 0;
+
+  size_t Channels() const noexcept;
+  size_t OutputWidth() const noexcept;
+  size_t OutputHeight() const noexcept;
+
+  int kx_;
+  int ky_;
+  /** @brief x, y
+   */
+  std::vector<int> sliding_;
+  /** @brief height, width[, channels]
+   */
+  std::vector<int> input_shape_;
+};
+
+/** @brief Max pooling layer
+ */
+class MaxPooling : public Pooling {
+ public:
+  explicit MaxPooling(const std::shared_ptr<Engine>& engine)
+      : Pooling(engine) {}
+  virtual const std::string& Uuid() const noexcept override final;
+
+ protected:
+  virtual float Pool(const float* input, int width, int height,
+                     size_t row_stride,
+                     size_t channels) const noexcept override final;
+
+ private:
+  static const std::string uuid_;
+};
+
+/** @brief Average pooling layer
+ */
+class AvgPooling : public Pooling {
+ public:
+  explicit AvgPooling(const std::shared_ptr<Engine>& engine)
+      : Pooling(engine) {}
+  virtual const std::string& Uuid() const noexcept override final;
+
+ protected:
+  virtual float Pool(const float* input, int width, int height,
+                     size_t row_stride,
+                     size_t channels) const noexcept override final;
+
+ private:
+  static const std::string uuid_;
+};
+
+DECLARE_UNIT(MaxPooling);
+DECLARE_UNIT(AvgPooling);
+
+}  // namespace znicz
+}  // namespace veles
+
+#if __GNUC__ >= 4
+#pragma GCC visibility pop
+#endif
+
+#endif  // SRC_POOLING_H_
@@ -33,8 +33,10 @@
 
 #define GTEST_HAS_TR1_TUPLE 1
 
+#include <chrono>
 #include <cmath>
 #include <memory>
+#include <vector>
 #include <gtest/gtest.h>
 #include <veles/veles.h>
 #include <simd/memory.h>
@@ -70,7 +72,8 @@ class All2AllTest :
     public ::testing::Test,
     public veles::DefaultLogger<T, veles::Logger::COLOR_RED> {
  public:
-  All2AllTest<T>() : height_(0), width_(0), unit_(new T(nullptr)),
+  All2AllTest<T>() : height_(0), width_(0), batch_(1),
+                     unit_(new T(nullptr)),
                      parent_(new DummyUnit()) {}
   using Parent = All2AllTest<T>;
 
@@ -83,16 +86,38 @@ class All2AllTest :
     unit_->include_bias_ = true;
     unit_->bias_.shape[0] = width_;
     unit_->bias_.data = veles::shared_array<float>(bias_, width_);
-    output_ = std::shared_ptr<float>(mallocf(width_), std::free);
+    unit_->batch_size_ = batch_;
+    output_ = std::shared_ptr<float>(mallocf(width_ * batch_), std::free);
     unit_->set_output(output_.get());
-    input_ = std::shared_ptr<float>(mallocf(height_), std::free);
+    input_ = std::shared_ptr<float>(mallocf(height_ * batch_), std::free);
     parent_->set_output(input_.get());
     unit_->LinkFrom(parent_);
   }
 
+  void InitializeInt8(const std::vector<int8_t>& weights,
+                      const std::vector<float>& scales, float input_scale) {
+    Initialize();
+    auto int8_weights = std::shared_ptr<int8_t>(
+        new int8_t[weights.size()], std::default_delete<int8_t[]>());
+    std::copy(weights.begin(), weights.end(), int8_weights.get());
+    auto weights_scales = std::shared_ptr<float>(mallocf(scales.size()),
+                                                 std::free);
+    std::copy(scales.begin(), scales.end(), weights_scales.get());
+    unit_->int8_weights_ = veles::NumpyArray<int8_t, 2>();
+    unit_->int8_weights_.shape[0] = width_;
+    unit_->int8_weights_.shape[1] = height_;
+    unit_->int8_weights_.data = veles::shared_array<int8_t>(
+        int8_weights, height_ * width_);
+    unit_->weights_scales_.shape[0] = width_;
+    unit_->weights_scales_.data = veles::shared_array<float>(
+        weights_scales, width_);
+    unit_->input_scale_ = input_scale;
+    unit_->quantized_ = true;
+  }
+
   void Verify(std::initializer_list<float> input,
               std::initializer_list<float> expected) {
-    assert(input.size() == height_);
+    assert(input.size() == height_ * batch_);
     std::copy(input.begin(), input.end(), input_.get());
     unit_->Initialize();
     unit_->Execute();
@@ -102,6 +127,19 @@ class All2AllTest :
     }
   }
 
+  /** @brief Initializes the unit and executes it the given number of times.
+   *  @return The elapsed time in seconds.
+   */
+  double Run(int times) {
+    unit_->Initialize();
+    auto start = std::chrono::steady_clock::now();
+    for (int i = 0; i < times; i++) {
+      unit_->Execute();
+    }
+    return std::chrono::duration<double>(
+        std::chrono::steady_clock::now() - start).count();
+  }
+
  protected:
   static std::shared_ptr<float> CreateFloatArray(
       std::initializer_list<float> init) {
@@ -112,6 +150,7 @@ class All2AllTest :
 
   size_t height_;
   size_t width_;
+  size_t batch_;
   std::shared_ptr<float> weights_;
   std::shared_ptr<float> bias_;
   std::shared_ptr<float> input_;
@@ -0,0 +1,90 @@
+/*! @file all2all_benchmark.cc
+ *  @brief Samples per second of "All to all" unit with float and int8
+ *  weights versus the batch size
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+
+#include <cstdio>
+#include <cstdlib>
+#include <vector>
+#include "tests/all2all.h"
+#include "src/all2all_tanh.h"
+
+namespace veles {
+
+namespace znicz {
+
+class All2AllBenchmark : public All2AllTest<All2AllTanh>,
+                         public ::testing::WithParamInterface<int> {
+ protected:
+  static std::shared_ptr<float> CreateRandomArray(size_t size) {
+    auto ptr = std::shared_ptr<float>(mallocf(size), std::free);
+    for (size_t i = 0; i < size; i++) {
+      ptr.get()[i] = rand() / static_cast<float>(RAND_MAX) - 0.5f;
+    }
+    return ptr;
+  }
+
+  void SetUp() override {
+    // MNIST sized hidden layer
+    height_ = 784;
+    width_ = 100;
+    batch_ = GetParam();
+    weights_ = CreateRandomArray(height_ * width_);
+    bias_ = CreateRandomArray(width_);
+  }
+
+  void Measure(const char* name) {
+    auto input = CreateRandomArray(height_ * batch_);
+    std::copy(input.get(), input.get() + height_ * batch_, input_.get());
+    const int kSamples = 20000;
+    double elapsed = Run(kSamples / batch_);
+    printf("%s batch %4zu: %10.0f samples/sec\n", name, batch_,
+           (kSamples / batch_) * batch_ / elapsed);
+  }
+};
+
+TEST_P(All2AllBenchmark, SamplesPerSecond) {
+  Initialize();
+  Measure("float");
+}
+
+TEST_P(All2AllBenchmark, Int8SamplesPerSecond) {
+  std::vector<int8_t> weights(height_ * width_);
+  for (auto& weight : weights) {
+    weight = rand() % 255 - 127;
+  }
+  InitializeInt8(weights, std::vector<float>(width_, 1.f / 127), 1.f / 127);
+  Measure("int8 ");
+}
+
+INSTANTIATE_TEST_CASE_P(BatchSizes, All2AllBenchmark,
+                        ::testing::Values(1, 2, 4, 8, 16, 32, 64, 128, 256));
+
+}
+
+}
+
+#include "tests/google/src/gtest_main.cc"
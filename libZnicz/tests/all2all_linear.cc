@@ -29,6 +29,7 @@
  */
 
 #include "tests/all2all_linear.h"
+#include <memory>
 #include <vector>
 #include "src/all2all_linear.h"
 
@@ -48,6 +49,34 @@ TEST_F(All2AllLinearTest, Execution) {
   Verify({ 1, 2, 3, 2, 1 }, { 18, 2, 13 });
 }
 
+TEST_F(All2AllLinearTest, Int8Execution) {
+  height_ = 5;
+  width_ = 3;
+  // the float weights are ignored once the unit is quantized
+  weights_ = CreateFloatArray({ 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0 });
+  bias_ = CreateFloatArray({ 10, -10, 5 });
+  InitializeInt8({ 2, 0, 4, 2, -2,
+                   6, 2, 0, 4,  6,
+                  -2, 4, 0, 2,  6}, { 0.5, 0.5, 0.5 }, 1);
+  Verify({ 1, 2, 3, 2, 1 }, { 18, 2, 13 });
+}
+
+TEST(BatchedUnitTest, WorkflowBatchSize) {
+  auto first = std::make_shared<All2AllLinear>(nullptr);
+  auto second = std::make_shared<All2AllLinear>(nullptr);
+  auto third = std::make_shared<All2AllLinear>(nullptr);
+  second->LinkFrom(first);
+  third->LinkFrom(second);
+  EXPECT_EQ(1u, third->batch_size());
+  // the batch size of the first unit is the one of the workflow
+  first->set_batch_size(8);
+  EXPECT_EQ(8u, second->batch_size());
+  EXPECT_EQ(8u, third->batch_size());
+  second->set_batch_size(2);
+  EXPECT_EQ(8u, first->batch_size());
+  EXPECT_EQ(2u, third->batch_size());
+}
+
 }
 
 }
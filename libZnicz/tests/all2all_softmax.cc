@@ -49,6 +49,23 @@ TEST_F(All2AllSoftmaxTest, Execution) {
          { 9.93307038e-01,   1.11781981e-07,   6.69285018e-03 });
 }
 
+TEST_F(All2AllSoftmaxTest, Batch) {
+  height_ = 5;
+  width_ = 3;
+  batch_ = 2;
+  // transposed
+  weights_ = CreateFloatArray({ 1, 0, 2, 1, -1,
+                                3, 1, 0, 2,  3,
+                               -1, 2, 0, 1,  3});
+  bias_ = CreateFloatArray({ 10, -10, 5 });
+  Initialize();
+  // each row is normalized separately
+  Verify({ 1, 2, 3, 2, 1,
+           0, 0, 0, 0, 0 },
+         { 9.93307038e-01,   1.11781981e-07,   6.69285018e-03,
+           9.93307147e-01,   2.04735862e-09,   6.69285091e-03 });
+}
+
 }
 
 }
@@ -48,6 +48,22 @@ TEST_F(All2AllTanhTest, Execution) {
   Verify({ 1, 2, 3, 2, 1 }, { 1.7159, 1.49288321, 1.7159 });
 }
 
+TEST_F(All2AllTanhTest, Batch) {
+  height_ = 5;
+  width_ = 3;
+  batch_ = 2;
+  // transposed
+  weights_ = CreateFloatArray({ 1, 0, 2, 1, -1,
+                                3, 1, 0, 2,  3,
+                               -1, 2, 0, 1,  3});
+  bias_ = CreateFloatArray({ 10, -10, 5 });
+  Initialize();
+  Verify({ 1, 2, 3, 2, 1,
+           0, 0, 0, 0, 0 },
+         { 1.7159, 1.49288321, 1.7159,
+           1.71589443, -1.71589443, 1.71153522 });
+}
+
 }
 
 }
@@ -0,0 +1,138 @@
+/*! @file conv.cc
+ *  @brief Convolutional units test
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#define GTEST_HAS_TR1_TUPLE 1
+
+#include <memory>
+#include <vector>
+#include <gtest/gtest.h>
+#include "tests/all2all.h"
+#include "src/conv.h"
+
+template <class T>
+class ConvTest : public ::testing::Test {
+ public:
+  ConvTest() : unit_(new T(nullptr)), parent_(new DummyUnit()) {}
+
+  void Initialize(std::vector<float> weights, std::vector<float> bias,
+                  std::vector<int> padding, std::vector<int> sliding) {
+    weights_ = weights;
+    bias_ = bias;
+    unit_->kx_ = 2;
+    unit_->ky_ = 2;
+    unit_->n_kernels_ = bias_.size();
+    unit_->padding_ = padding;
+    unit_->sliding_ = sliding;
+    unit_->input_shape_ = {3, 3, 1};
+    unit_->weights_.shape[0] = bias_.size();
+    unit_->weights_.shape[1] = weights_.size() / bias_.size();
+    unit_->weights_.data = veles::shared_array<float>(
+        std::shared_ptr<float>(weights_.data(), [](float*) {}),
+        weights_.size());
+    unit_->bias_.shape[0] = bias_.size();
+    unit_->bias_.data = veles::shared_array<float>(
+        std::shared_ptr<float>(bias_.data(), [](float*) {}), bias_.size());
+    output_.resize(unit_->OutputSize() / sizeof(float));
+    unit_->set_output(output_.data());
+    input_ = {1, 2, 3, 4, 5, 6, 7, 8, 9};
+    parent_->set_output(input_.data());
+    unit_->LinkFrom(parent_);
+  }
+
+  void InitializeInt8(std::vector<int8_t> weights, std::vector<float> scales,
+                      float input_scale) {
+    int8_weights_ = weights;
+    scales_ = scales;
+    unit_->int8_weights_.shape[0] = scales_.size();
+    unit_->int8_weights_.shape[1] = int8_weights_.size() / scales_.size();
+    unit_->int8_weights_.data = veles::shared_array<int8_t>(
+        std::shared_ptr<int8_t>(int8_weights_.data(), [](int8_t*) {}),
+        int8_weights_.size());
+    unit_->weights_scales_.shape[0] = scales_.size();
+    unit_->weights_scales_.data = veles::shared_array<float>(
+        std::shared_ptr<float>(scales_.data(), [](float*) {}),
+        scales_.size());
+    unit_->input_scale_ = input_scale;
+    unit_->quantized_ = true;
+  }
+
+  void Verify(std::initializer_list<float> expected) {
+    unit_->Initialize();
+    unit_->Execute();
+    ASSERT_EQ(expected.size(), output_.size());
+    int i = 0;
+    for (auto ex : expected) {
+      EXPECT_NEAR(ex, output_[i++], 1e-6) << i - 1;
+    }
+  }
+
+ private:
+  std::shared_ptr<T> unit_;
+  std::shared_ptr<DummyUnit> parent_;
+  std::vector<float> weights_;
+  std::vector<float> bias_;
+  std::vector<int8_t> int8_weights_;
+  std::vector<float> scales_;
+  std::vector<float> input_;
+  std::vector<float> output_;
+};
+
+namespace veles {
+
+namespace znicz {
+
+class ConvLinearTest : public ConvTest<Conv> {
+};
+
+class ConvStrictRELUTest : public ConvTest<ConvStrictRELU> {
+};
+
+TEST_F(ConvLinearTest, Execution) {
+  Initialize({ 1, 0, 0, -1,
+               0, 1, 1,  0 }, { 0.5, -1 }, { 0, 0, 0, 0 }, { 1, 1 });
+  Verify({ -3.5, 5, -3.5, 7, -3.5, 11, -3.5, 13 });
+}
+
+TEST_F(ConvLinearTest, Int8Execution) {
+  // the float weights are ignored once the unit is quantized
+  Initialize({ 0, 0, 0, 0,
+               0, 0, 0, 0 }, { 0.5, -1 }, { 0, 0, 0, 0 }, { 1, 1 });
+  InitializeInt8({ 2, 0, 0, -2,
+                   0, 2, 2,  0 }, { 0.5, 0.5 }, 1);
+  Verify({ -3.5, 5, -3.5, 7, -3.5, 11, -3.5, 13 });
+}
+
+TEST_F(ConvStrictRELUTest, PaddingAndSliding) {
+  Initialize({ 1, 0, 0, -1,
+               0, 1, 1,  0 }, { 0.5, -1 }, { 1, 1, 0, 0 }, { 2, 2 });
+  Verify({ 0, 0, 0, 1, 0, 3, 0, 13 });
+}
+
+}
+
+}
+
+#include "tests/google/src/gtest_main.cc"
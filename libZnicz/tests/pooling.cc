@@ -0,0 +1,88 @@
+/*! @file pooling.cc
+ *  @brief Pooling units test
+ *  @version 1.0
+ *
+ *  @section Notes
+ *  This code partially conforms to <a href="http://google-styleguide.googlecode.com/svn/trunk/cppguide.xml">Google C++ Style Guide</a>.
+ *
+ *  @section License
+ *  Licensed to the Apache Software Foundation (ASF) under one
+ *  or more contributor license agreements.  See the NOTICE file
+ *  distributed with this work for additional information
+ *  regarding copyright ownership.  The ASF licenses this file
+ *  to you under the Apache License, Version 2.0 (the
+ *  "License"); you may not use this file except in compliance
+ *  with the License.  You may obtain a copy of the License at
+ *
+ *  http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *  Unless required by applicable law or agreed to in writing,
+ *  software distributed under the License is distributed on an
+ *  "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ *  KIND, either express or implied.  See the License for the
+ *  specific language governing permissions and limitations
+ *  under the License.
+ */
+
+#define GTEST_HAS_TR1_TUPLE 1
+
+#include <memory>
+#include <vector>
+#include <gtest/gtest.h>
+#include "tests/all2all.h"
+#include "src/pooling.h"
+
+template <class T>
+class PoolingTest : public ::testing::Test {
+ public:
+  PoolingTest() : unit_(new T(nullptr)), parent_(new DummyUnit()) {}
+
+  void Verify(std::initializer_list<float> expected) {
+    unit_->kx_ = 2;
+    unit_->ky_ = 2;
+    unit_->sliding_ = {2, 2};
+    unit_->input_shape_ = {3, 3, 1};
+    output_.resize(unit_->OutputSize() / sizeof(float));
+    unit_->set_output(output_.data());
+    input_ = {1, 2, 3, 4, 5, 6, 7, 8, 9};
+    parent_->set_output(input_.data());
+    unit_->LinkFrom(parent_);
+    unit_->Initialize();
+    unit_->Execute();
+    ASSERT_EQ(expected.size(), output_.size());
+    int i = 0;
+    for (auto ex : expected) {
+      EXPECT_FLOAT_EQ(ex, output_[i++]) << i - 1;
+    }
+  }
+
+ private:
+  std::shared_ptr<T> unit_;
+  std::shared_ptr<DummyUnit> parent_;
+  std::vector<float> input_;
+  std::vector<float> output_;
+};
+
+namespace veles {
+
+namespace znicz {
+
+class MaxPoolingTest : public PoolingTest<MaxPooling> {
+};
+
+class AvgPoolingTest : public PoolingTest<AvgPooling> {
+};
+
+TEST_F(MaxPoolingTest, PartialWindows) {
+  Verify({ 5, 6, 8, 9 });
+}
+
+TEST_F(AvgPoolingTest, PartialWindows) {
+  Verify({ 3, 4.5, 7.5, 9 });
+}
+
+}
+
+}
+
+#include "tests/google/src/gtest_main.cc"
@@ -49,6 +49,8 @@ import veles.error as error
 from veles.memory import Array
 import veles.opencl_types as opencl_types
 import veles.loader as loader
+from veles.znicz.array_stats import compute_stats
+from veles.znicz.mixed_precision import storage_dtype
 
 
 @implementer(loader.ILoader)
@@ -60,6 +62,7 @@ class ImagenetLoaderBase(loader.Loader):
         self.mean = Array()
         self.rdisp = Array()
         self._file_samples_ = ""
+        self._sample_buffer_ = None
         self.sx = kwargs.get("sx", 256)
         self.sy = kwargs.get("sy", 256)
         self.channels = kwargs.get("channels", 3)
@@ -126,7 +129,7 @@ class ImagenetLoaderBase(loader.Loader):
         self.info("Class Lengths: %s", str(self.class_lengths))
 
         for lbl in self._original_labels_[
-                self.class_lengths[0]+self.class_lengths[1]:]:
+                self.class_lengths[0] + self.class_lengths[1]:]:
             self._train_different_labels_[lbl] += 1
 
         if self.total_samples != len(self._original_labels_):
@@ -150,9 +153,10 @@ class ImagenetLoaderBase(loader.Loader):
         self.rdisp.mem = matrixes[1].astype(
             opencl_types.dtypes[root.common.engine.precision_type])
 
-        if numpy.count_nonzero(numpy.isnan(self.rdisp.mem)):
+        stats = compute_stats(self.rdisp.mem)
+        if stats.nans:
             raise ValueError("rdisp matrix has NaNs")
-        if numpy.count_nonzero(numpy.isinf(self.rdisp.mem)):
+        if stats.infs:
             raise ValueError("rdisp matrix has Infs")
         if self.mean.shape != self.rdisp.shape:
             raise ValueError("mean.shape != rdisp.shape")
@@ -164,10 +168,18 @@ class ImagenetLoaderBase(loader.Loader):
         sh = [self.max_minibatch_size]
         sh.extend((self.final_sy, self.final_sx, self.channels))
         dtype = opencl_types.dtypes[root.common.engine.precision_type]
-        self.minibatch_data.mem = numpy.zeros(sh, dtype=dtype)
+        self.minibatch_data.mem = numpy.zeros(sh, dtype=storage_dtype(dtype))
+        # the samples are stored in the full precision
+        self._sample_buffer_ = (
+            numpy.zeros(sh[1:], dtype=dtype)
+            if self.minibatch_data.dtype != dtype else None)
 
     def fill_data(self, index, index_sample, sample):
-        self._file_samples_.readinto(self.minibatch_data.mem[index])
+        if self._sample_buffer_ is None:
+            self._file_samples_.readinto(self.minibatch_data.mem[index])
+        else:
+            self._file_samples_.readinto(self._sample_buffer_)
+            self.minibatch_data.mem[index] = self._sample_buffer_
         self.minibatch_labels.mem[index] = self.labels_mapping[
             self._original_labels_[int(index_sample)]]
 
@@ -7,6 +7,7 @@ A loader for LMDB base (CAFFE intermediate format).
 Copyright (c) 2014, Samsung Electronics, Co., Ltd.
 """
 
+from collections import namedtuple, OrderedDict
 import numpy
 from zope.interface import implementer
 
@@ -15,9 +16,17 @@ from veles.loader import IImageLoader, ImageLoader, CLASS_NAME
 from veles.znicz.loader.caffe import Datum
 
 
+#: Decoded Datum: the label, the (height, width) size and the uint8 image
+#: in the original shape.
+DecodedDatum = namedtuple("DecodedDatum", ("label", "size", "data"))
+
+
 @implementer(IImageLoader)
 class LMDBLoader(ImageLoader):
     MAPPING = "lmdb"
+    # the defaults for the loaders pickled before the LRU cache
+    cache_size = 1 << 26
+    _cache_evictions = 0
 
     def __init__(self, workflow, **kwargs):
         super(LMDBLoader, self).__init__(workflow, **kwargs)
@@ -30,14 +39,20 @@ class LMDBLoader(ImageLoader):
         self.db_color_space = kwargs.get("db_colorspace", "RGB")
         self.db_splitted_channels = kwargs.get("db_splitted_channels", True)
         self.use_cache = kwargs.get("use_cache", True)
+        # the maximal size of the decoded images in the cache, in bytes;
+        # the last image is kept even if it is larger
+        self.cache_size = kwargs.get("cache_size", self.cache_size)
         self._cache_hits = 0
         self._cache_misses = 0
+        self._cache_evictions = 0
 
     def init_unpickled(self):
         super(LMDBLoader, self).init_unpickled()
         # LMDB base cursors, used as KV-iterators
         self._cursors_ = [None] * 3
-        self._cache_ = None, None
+        # LRU of the decoded data, {(class index, key): DecodedDatum}
+        self._cache_ = OrderedDict()
+        self._cache_used_ = 0
 
     @property
     def cache_hits(self):
@@ -47,6 +62,10 @@ class LMDBLoader(ImageLoader):
     def cache_misses(self):
         return self._cache_misses
 
+    @property
+    def cache_evictions(self):
+        return self._cache_evictions
+
     @property
     def files(self):
         return self._files
@@ -74,8 +93,7 @@ class LMDBLoader(ImageLoader):
     def get_image_label(self, key):
         """Retrieves label for the specified key.
         """
-        datum = self.get_cached_data(key)
-        return datum.label
+        return self.get_cached_data(key).label
 
     def get_image_info(self, key):
         """
@@ -83,39 +101,58 @@ class LMDBLoader(ImageLoader):
         Size must be in OpenCV order (first y, then x),
         color space must be supported by OpenCV (COLOR_*).
         """
-        datum = self.get_cached_data(key)
-        return (datum.height, datum.width), self.db_color_space
+        return self.get_cached_data(key).size, self.db_color_space
 
     def get_image_data(self, key):
         """Return the image data associated with the specified key.
         """
-        datum = self.get_cached_data(key)
+        # the cached image must stay intact
+        return self.get_cached_data(key).data.copy()
+
+    def get_cached_data(self, key):
+        """Returns :class:`DecodedDatum` for the specified key. The recently
+        used ones are kept in the cache until the size of their images
+        exceeds :attr:`cache_size`, so the label, the size and the data of
+        an image are decoded once. The images are read in a random order
+        once per epoch, so unless the whole dataset fits into the cache,
+        most of them are evicted before they are read again and the
+        larger cache only costs memory. The default size is thus small.
+        """
+        if not self.use_cache:
+            return self.decode_datum(self.get_datum(key))
+        decoded = self._cache_.pop(key, None)
+        if decoded is not None:
+            self._cache_hits += 1
+            self._cache_[key] = decoded
+            return decoded
+        self._cache_misses += 1
+        decoded = self.decode_datum(self.get_datum(key))
+        size = decoded.data.nbytes
+        while self._cache_ and self._cache_used_ + size > self.cache_size:
+            _, evicted = self._cache_.popitem(last=False)
+            self._cache_used_ -= evicted.data.nbytes
+            self._cache_evictions += 1
+        self._cache_[key] = decoded
+        self._cache_used_ += size
+        return decoded
+
+    def decode_datum(self, datum):
+        """Converts :class:`veles.znicz.loader.caffe.Datum` to
+        :class:`DecodedDatum`.
+        """
         img = numpy.fromstring(datum.data, dtype=numpy.uint8)
         osh = self.original_shape
         if not self.db_splitted_channels:
             img = img.reshape(osh)
         else:
-            img = numpy.transpose(
-                img.reshape((osh[-1],) + osh[:-1]), (1, 2, 0))
-        return img
-
-    def get_cached_data(self, key):
-        if self.use_cache:
-            if key != self._cache_[0]:
-                datum = self.get_datum(key)
-                self._cache_misses += 1
-            else:
-                datum = self._cache_[1]
-                self._cache_hits += 1
-        else:
-            datum = self.get_datum(key)
-        return datum
+            img = numpy.ascontiguousarray(numpy.transpose(
+                img.reshape((osh[-1],) + osh[:-1]), (1, 2, 0)))
+        return DecodedDatum(datum.label, (datum.height, datum.width), img)
 
     def get_datum(self, key):
         index, dkey = key
         datum = Datum()
         datum.ParseFromString(self._cursors_[index].get(dkey))
-        self._cache_ = key, datum
         return datum
 
     def get_keys(self, index):
@@ -140,9 +177,10 @@ class LMDBLoader(ImageLoader):
 
     def stop(self):
         super(LMDBLoader, self).stop()
-        self.info("Cache hits/misses: %d/%d (%d%%)", self.cache_hits,
-                  self.cache_misses, self.cache_hits * 100 // (
-                      self.cache_hits + self.cache_misses))
+        self.info("Cache hits/misses/evictions: %d/%d/%d (%d%%)",
+                  self.cache_hits, self.cache_misses, self.cache_evictions,
+                  self.cache_hits * 100 // max(
+                      self.cache_hits + self.cache_misses, 1))
 
     def _initialize_cursor(self, index):
         if self._files == (None, None, None):
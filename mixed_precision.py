@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Mixed precision training mode of the CPU (numpy) backend. The minibatch
+data, the activations and the backpropagated errors are stored as float16,
+while the weights, their gradients and all the accumulations stay in
+float32. Since small errors vanish in float16, they are stored multiplied by
+the loss scale, which the gradient descent units divide the gradients by.
+The scale is halved when the gradients overflow and doubled after a number
+of steps without overflows. A step with overflowed gradients is skipped as a
+whole: the units which have already updated their parameters on that step
+restore them.
+
+The loaders' minibatch_data is converted to float16 by the first forward
+units when they are initialized, the loaders fill it by assignment.
+
+It is enabled with root.common.engine.mixed_precision = True.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from __future__ import division
+import numpy
+
+from veles.config import root
+from veles.logger import Logger
+
+
+def is_enabled():
+    return bool(root.common.engine.__content__.get("mixed_precision", False))
+
+
+def storage_dtype(dtype):
+    """Returns the dtype to store the activations and the errors of the
+    given precision in.
+    """
+    dtype = numpy.dtype(dtype)
+    if is_enabled() and dtype == numpy.float32:
+        return numpy.dtype(numpy.float16)
+    return dtype
+
+
+def compute_dtype(dtype):
+    """Returns the dtype to compute and to keep the weights of the values
+    stored in the given dtype in.
+    """
+    dtype = numpy.dtype(dtype)
+    if dtype == numpy.float16:
+        return numpy.dtype(numpy.float32)
+    return dtype
+
+
+def is_scaled(array):
+    """True if the errors in array are multiplied by the loss scale.
+    """
+    return array.dtype == numpy.float16
+
+
+class LossScaler(Logger):
+    """Dynamic loss scale.
+
+    The gradient descent unit which starts storing the errors in float16
+    calls :meth:`begin()` on each step, so that the scale does not change
+    during the backward pass. The units report whether their gradients
+    were finite with :meth:`report()` and call :meth:`protect()` before
+    they update their parameters. If any gradients of the step overflow,
+    the protected parameters are restored, so the step is either applied
+    by all the units or by none of them. This costs a copy of the updated
+    parameters per step.
+
+    Attributes:
+        scale: the current loss scale.
+        growth_interval: the number of steps without overflows after which
+                         the scale is doubled.
+        min_scale: the scale is never halved below this value.
+        max_scale: the scale is never doubled above this value.
+    """
+
+    def __init__(self, scale=2.0 ** 15, growth_interval=2000, min_scale=1.0,
+                 max_scale=2.0 ** 24):
+        super(LossScaler, self).__init__()
+        self.scale = scale
+        self.growth_interval = growth_interval
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.overflows = 0
+        self._good_steps = 0
+        self._overflow = False
+        self._started = False
+        # [(vector, its value before the step)] of the current step
+        self._backups = []
+        self._buffers = {}
+
+    @property
+    def overflowed(self):
+        """True if some gradients have overflowed on the current step.
+        """
+        return self._overflow
+
+    def begin(self):
+        """Applies the outcome of the previous step to the scale.
+        """
+        if self._overflow:
+            self._overflow = False
+            self._good_steps = 0
+            self.overflows += 1
+            self.scale = max(self.scale / 2, self.min_scale)
+            self.debug("Gradients overflowed, decreased the loss scale to "
+                       "%g", self.scale)
+        elif self._started:
+            self._good_steps += 1
+            if self._good_steps >= self.growth_interval:
+                self._good_steps = 0
+                self.scale = min(self.scale * 2, self.max_scale)
+        self._started = True
+        del self._backups[:]
+        return self.scale
+
+    def protect(self, *vectors):
+        """Remembers the values of the vectors (:class:`veles.memory.Array`)
+        which are about to be updated on the current step, so that they are
+        restored if some gradients overflow later on it.
+        """
+        protected = set(id(vector) for vector, _ in self._backups)
+        for vector in vectors:
+            if not vector or id(vector) in protected:
+                continue
+            protected.add(id(vector))
+            vector.map_read()
+            backup = self._buffers.get(id(vector))
+            if backup is None or backup.shape != vector.shape or \
+                    backup.dtype != vector.dtype:
+                backup = self._buffers[id(vector)] = numpy.empty_like(
+                    vector.mem)
+            numpy.copyto(backup, vector.mem)
+            self._backups.append((vector, backup))
+
+    def report(self, finite):
+        if finite or self._overflow:
+            return
+        self._overflow = True
+        # the whole step is skipped: undo the updates applied before
+        for vector, backup in reversed(self._backups):
+            vector.map_invalidate()
+            numpy.copyto(vector.mem, backup)
+        del self._backups[:]
+
+
+def store_minibatch_data(loader):
+    """Converts the minibatch_data of the loader to the storage dtype.
+    """
+    data = loader.minibatch_data
+    if not data:
+        return
+    dtype = storage_dtype(data.dtype)
+    if dtype != data.dtype:
+        data.map_read()
+        data.reset(data.mem.astype(dtype))
+
+
+def loss_scaler(workflow):
+    """Returns the :class:`LossScaler` shared by the units of the workflow.
+    It is not pickled.
+    """
+    scaler = getattr(workflow, "loss_scaler_", None)
+    if scaler is None:
+        scaler = workflow.loss_scaler_ = LossScaler()
+    return scaler
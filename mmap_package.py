@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Memory-mapped packages of the forward units. A package is a directory with
+contents.json and one .npy file per exported array. The headers of the .npy
+files are padded so that the data starts at a 64-byte boundary, and the
+arrays are never compressed, so the loader maps them read-only straight
+into the Array attributes of the units (weights, bias). Nothing is read
+until the pages are touched, and the processes which load the same package
+share its pages.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import json
+import os
+import struct
+
+import numpy
+from numpy.lib.format import dtype_to_descr, magic
+import six
+
+import veles.error as error
+from veles.memory import Array
+
+
+ALIGNMENT = 64
+CONTENTS = "contents.json"
+FORMAT = "mmap"
+VERSION = 1
+
+
+def write_aligned_npy(path, array):
+    """Writes the array in .npy format 1.0 with the header padded to
+    :data:`ALIGNMENT` bytes, regardless of numpy's own padding.
+    """
+    array = numpy.ascontiguousarray(array)
+    header = repr({"descr": dtype_to_descr(array.dtype),
+                   "fortran_order": False, "shape": array.shape})
+    # magic string with the version and 2-byte little endian header length
+    prefix = magic(1, 0) + b"\0\0"
+    header += " " * (-(len(prefix) + len(header) + 1) % ALIGNMENT) + "\n"
+    with open(path, "wb") as fout:
+        fout.write(magic(1, 0))
+        fout.write(struct.pack("<H", len(header)))
+        fout.write(header.encode("latin1"))
+        fout.write(array.tobytes())
+
+
+def _jsonable(value):
+    if isinstance(value, numpy.generic):
+        return value.item()
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    raise TypeError("%s is not JSON serializable" % type(value))
+
+
+def export_package(path, forwards, layers=None):
+    """Writes the exported data of the forward units to the package
+    directory, which is created if it does not exist.
+
+    :param path: the package directory.
+    :param forwards: the forward units.
+    :param layers: the optional "layers" configuration, so that the \
+        workflow can be recreated without the training snapshot.
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    units = []
+    for index, unit in enumerate(forwards):
+        data = {}
+        for attr, value in sorted(unit.package_export().items()):
+            if isinstance(value, numpy.ndarray):
+                name = "%d_%s" % (index, attr)
+                write_aligned_npy(os.path.join(path, name + ".npy"), value)
+                value = "@" + name
+            data[attr] = value
+        units.append({"class": {"name": type(unit).__name__,
+                                "uuid": getattr(unit, "__id__", None)},
+                      "name": unit.name, "data": data})
+    contents = {"format": FORMAT, "version": VERSION, "units": units}
+    if layers is not None:
+        contents["layers"] = layers
+    with open(os.path.join(path, CONTENTS), "w") as fout:
+        json.dump(contents, fout, indent=2, sort_keys=True,
+                  default=_jsonable)
+
+
+def read_contents(path):
+    """Returns the parsed contents.json of the package.
+    """
+    with open(os.path.join(path, CONTENTS)) as fin:
+        contents = json.load(fin)
+    if contents.get("format") != FORMAT or \
+            contents.get("version", 0) > VERSION:
+        raise error.BadFormatError(
+            "%s is not a memory-mapped package of version %d or older" %
+            (path, VERSION))
+    return contents
+
+
+def load_package(path, forwards):
+    """Maps the arrays of the package into the Array attributes of
+    the forward units, which are matched by their order and class. The
+    mapped arrays are read-only, so the units must not be trained.
+
+    :param path: the package directory.
+    :param forwards: the forward units, not initialized yet.
+    :return: the contents of the package, see :func:`read_contents`.
+    """
+    contents = read_contents(path)
+    units = contents["units"]
+    if len(units) != len(forwards):
+        raise error.BadFormatError(
+            "The package has %d units, but there are %d forwards" %
+            (len(units), len(forwards)))
+    for unit, entry in zip(forwards, units):
+        if type(unit).__name__ != entry["class"]["name"]:
+            raise error.BadFormatError(
+                "%s does not match %s in the package" %
+                (unit, entry["class"]["name"]))
+        for attr, value in entry["data"].items():
+            array = getattr(unit, attr, None)
+            if not isinstance(array, Array) or \
+                    not isinstance(value, six.string_types) or \
+                    not value.startswith("@"):
+                continue
+            file_name = os.path.join(path, value[1:] + ".npy")
+            mem = numpy.load(file_name, mmap_mode="r")
+            if mem.size == 0:
+                # empty files can not be mapped
+                mem = numpy.load(file_name)
+            array.reset(mem)
+    return contents
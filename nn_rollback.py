@@ -34,10 +34,11 @@ under the License.
 ███████████████████████████████████████████████████████████████████████████████
 """
 
-import numpy
 from zope.interface import implementer
 from veles.units import IUnit, Unit
 from veles.distributable import IDistributable
+from veles.znicz.array_stats import compute_stats
+from veles.znicz.nn_units import ParameterStore
 
 
 @implementer(IUnit, IDistributable)
@@ -45,8 +46,11 @@ class NNRollback(Unit):
     """
     Unit, whick returns workflow to the save state, if Model starts to diverge.
     """
-    weights_names = (
-        "weights", "bias", "gradient_weights", "gradient_bias")
+    # the arrays of the gradient descent units which are restored along
+    # with the parameters, since they hold the momentum state
+    MOMENT_ATTRS = ("gradient_weights", "gradient_bias",
+                    "gradient_weights_with_moment",
+                    "gradient_bias_with_moment")
 
     def __init__(self, workflow, **kwargs):
         super(NNRollback, self).__init__(workflow, **kwargs)
@@ -59,6 +63,7 @@ class NNRollback(Unit):
         self.improved = None
         self.demand("improved")
         self._gds = {}
+        self._history = []
         self.history_limit = 2
 
         # Workaround for difference in minibatch class serve order
@@ -68,6 +73,9 @@ class NNRollback(Unit):
     def init_unpickled(self):
         super(NNRollback, self).init_unpickled()
         self.slaves = {}
+        self._parameter_store_ = None
+        if not hasattr(self, "_history"):
+            self._history = []
 
     def initialize(self, **kwargs):
         self.info("lr_plus=%.2f lr_minus=%.2f", self.lr_plus, self.lr_minus)
@@ -94,35 +102,61 @@ class NNRollback(Unit):
     def drop_slave(self, slave):
         self._slave_ended(slave)
 
-    def get_weights(self, gd, name, value):
-        weights = getattr(gd, name)
-        weights.map_read()
-        ww = value.get(name, [])
-        ww.append(weights.mem.copy())
-        while len(ww) > self.history_limit:
-            ww.pop(0)
-        return ww
-
-    def calculate_nans(self, gd, name):
-        weights = getattr(gd, name)
-        if weights:
-            weights.map_read()
-            return numpy.count_nonzero(numpy.isnan(weights.mem))
-        else:
-            return 0
-
-    def rollback_weights(self, gd, name, value, rollback_to):
-        weights = getattr(gd, name)
-        ww = value.get(name)
-        if ww is None:
-            self.warning("No rollback for %s" % name)
-        else:
-            self.info("Rolling back to stored weights")
-            weights.map_invalidate()
-            weights_to_return = ww[rollback_to]
-            if rollback_to >= 0:
-                del ww[rollback_to + 1:]
-            return weights_to_return
+    @property
+    def parameter_store(self):
+        """The store of the parameters of the gradient descent units: the
+        workflow's one if it exists.
+        """
+        store = getattr(self.workflow, "parameter_store", None)
+        if store is None:
+            if self._parameter_store_ is None:
+                self._parameter_store_ = ParameterStore(
+                    lambda: list(self._gds))
+            store = self._parameter_store_
+        return store
+
+    def moments(self):
+        """Returns the list of (gradient descent unit, attribute name,
+        array) of the arrays with the momentum state.
+        """
+        moments = []
+        for gd in self._gds:
+            for attr in self.MOMENT_ATTRS:
+                array = getattr(gd, attr, None)
+                if array:
+                    moments.append((gd, attr, array))
+        return moments
+
+    def store_weights(self):
+        store = self.parameter_store
+        moments = []
+        for gd, attr, array in self.moments():
+            array.map_read()
+            moments.append((gd, attr, array.mem.copy()))
+        self._history.append((store.layout, store.get(), moments))
+        while len(self._history) > self.history_limit:
+            self._history.pop(0)
+
+    def calculate_nans(self):
+        nans = compute_stats(self.parameter_store.values).nans
+        for _, _, array in self.moments():
+            array.map_read()
+            nans += compute_stats(array.mem).nans
+        return nans
+
+    def rollback_weights(self, rollback_to):
+        if not self._history:
+            self.warning("No rollback for the weights")
+            return
+        self.info("Rolling back to stored weights")
+        layout, values, moments = self._history[rollback_to]
+        self.parameter_store.set(values, layout)
+        for gd, attr, mem in moments:
+            array = getattr(gd, attr)
+            array.map_invalidate()
+            array.mem[:] = mem
+        if rollback_to >= 0:
+            del self._history[rollback_to + 1:]
 
     def run(self):
         if self.improved:
@@ -139,24 +173,16 @@ class NNRollback(Unit):
                 _gd.learning_rate_bias *= k
                 self.info("Increased lr of %s by %.2f, new_lr %.2e",
                           repr(_gd), k, _gd.learning_rate)
-                for weights_name in self.weights_names:
-                    if getattr(_gd, weights_name, None):
-                        kv[weights_name] = self.get_weights(
-                            _gd, weights_name, kv)
+            self.store_weights()
         elif not self._first_run:
             rollback_to = 0  # -1
 
             # Check for NaNs
-            for _gd, kv in self._gds.items():
-                nz = 0
-                for weights_name in self.weights_names:
-                    nz += self.calculate_nans(_gd, weights_name)
-                if nz:
-                    self.warning("NaNs encountered, will rollback to -%d",
-                                 self.history_limit)
-                    self._minus_steps = self.minus_steps
-                    rollback_to = 0
-                    break
+            if self.calculate_nans():
+                self.warning("NaNs encountered, will rollback to -%d",
+                             self.history_limit)
+                self._minus_steps = self.minus_steps
+                rollback_to = 0
 
             self._minus_steps += 1
             if self._minus_steps < self.minus_steps:
@@ -172,16 +198,13 @@ class NNRollback(Unit):
                 _gd.learning_rate_bias *= k
                 self.info("Decreased lr of %s by %.2f, new_lr %.2e",
                           repr(_gd), k, _gd.learning_rate)
-                for weights_name in self.weights_names:
-                    if getattr(_gd, weights_name, None):
-                        setattr(_gd, "%s.mem[:]" % weights_name,
-                                self.rollback_weights(
-                                    _gd, weights_name, kv, rollback_to))
+            self.rollback_weights(rollback_to)
 
         self._first_run = False
 
     def reset(self):
         self._gds.clear()
+        del self._history[:]
 
     def add_gd(self, _gd, lr_plus=None, lr_minus=None):
         kv = self._gds.get(_gd, {})
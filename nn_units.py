@@ -40,11 +40,15 @@ from collections import defaultdict
 import gc
 import numpy
 import logging
+import os
+import threading
 import time
 import six
+from six.moves import queue
 from zope.interface import implementer
 
 from veles.avatar import Avatar
+import veles.error as error
 from veles.external.prettytable import PrettyTable
 from veles.distributable import IDistributable
 from veles.loader import Loader
@@ -57,8 +61,14 @@ from veles.workflow import Repeater
 from veles.snapshotter import SnapshotterBase, SnapshotterToFile, \
     SnapshotterToDB
 from veles.timeit2 import timeit
+from veles.znicz.array_stats import compute_stats, is_finite
 from veles.znicz.decision import DecisionBase
+import veles.znicz.delta_snapshot as delta_snapshot
 from veles.znicz.evaluator import EvaluatorBase
+import veles.znicz.mixed_precision as mixed_precision
+from veles.znicz.quantization import Int8Weights
+from veles.znicz.numpy_kernels import ScratchPool, adjacent_view, \
+    aligned_empty
 
 
 class Match(list):
@@ -127,9 +137,15 @@ class Forward(ForwardBase):
         weights_stddev: magnitude of the random distribution for weights.
         bias_stddev: magnitude of the random distribution for bias.
         rand: prng.Rand() object for initial weights generation.
+        quantization: :class:`veles.znicz.quantization.Int8Weights` if
+                      the unit computes with int8 weights, otherwise None.
     """
     hide_from_registry = True
     MAPPING = set()
+    # True if numpy_run() supports int8 weights (see quantize())
+    QUANTIZABLE = False
+    # the default for the units pickled before quantization was introduced
+    quantization = None
 
     def __init__(self, workflow, **kwargs):
         kwargs["view_group"] = kwargs.get("view_group", "WORKER")
@@ -149,9 +165,29 @@ class Forward(ForwardBase):
         self.exports = ["weights", "bias", "include_bias",
                         "weights_transposed"]
 
+    def quantize(self, input_range):
+        """Switches the unit to int8 weights, see
+        :mod:`veles.znicz.quantization`.
+
+        Arguments:
+            input_range: (min, max) of the input values.
+        """
+        if not self.QUANTIZABLE:
+            raise error.BadFormatError(
+                "%s does not support int8 weights" % self)
+        self.weights.map_read()
+        self.quantization = Int8Weights(
+            self.weights.mem, self.weights_transposed, input_range)
+
     def package_export(self):
         data = {}
+        if isinstance(self.workflow, NNWorkflow):
+            data["batch_size"] = int(self.workflow.package_batch_size)
+        if self.quantization is not None:
+            data.update(self.quantization.package_export())
         for attr in self.exports:
+            if attr == "weights" and self.quantization is not None:
+                continue
             value = getattr(self, attr)
             if value is not None:
                 if isinstance(value, Array):
@@ -160,6 +196,13 @@ class Forward(ForwardBase):
                 data[attr] = value
         return data
 
+    @property
+    def input_sample_shape(self):
+        """The shape of a single input sample, exported for the native
+        units which need the geometry of the input.
+        """
+        return tuple(self.input.shape[1:])
+
     @property
     def forward_mode(self):
         return self._forward_mode
@@ -173,8 +216,23 @@ class Forward(ForwardBase):
 
     def initialize(self, device, **kwargs):
         self.forward_mode = kwargs.get("forward_mode", False)
+        if mixed_precision.is_enabled():
+            for unit in self.links_from:
+                if isinstance(unit, Loader) and \
+                        unit.minibatch_data is getattr(self, "input", None):
+                    mixed_precision.store_minibatch_data(unit)
         super(Forward, self).initialize(device=device, **kwargs)
 
+    @property
+    def parameter_store(self):
+        """The :class:`ParameterStore` of the workflow if it holds the
+        parameters of this unit, otherwise None.
+        """
+        if not isinstance(self.workflow, NNWorkflow):
+            return None
+        store = self.workflow.parameter_store
+        return store if self in store.units else None
+
     def generate_data_for_slave(self, slave):
         if self.forward_mode:
             return None
@@ -221,22 +279,15 @@ class NNLayerBase(Forward):
             return
         self.output.map_read()
         y = self.output.mem
-        if y.dtype in (numpy.complex64, numpy.complex128):
-            self.debug(
-                "%s: %d samples with %d weights in %.2f sec: "
-                "y: min avg max: %.6f %.6f %.6f" %
-                (self.__class__.__name__, y.shape[0],
-                 self.weights.mem.size, time.time() - t_start,
-                 min(y.real.min(), y.imag.min()),
-                 (numpy.average(y.real) + numpy.average(y.imag)) * 0.5,
-                 max(y.real.max(), y.imag.max())))
-        else:
-            self.debug(
-                "%s: %d samples with %d weights in %.2f sec: "
-                "y: min avg max: %.6f %.6f %.6f" %
-                (self.__class__.__name__, y.shape[0],
-                 self.weights.mem.size, time.time() - t_start,
-                 y.min(), numpy.average(y), y.max()))
+        stats = compute_stats(y)
+        self.debug(
+            "%s: %d samples with %d weights in %.2f sec: "
+            "y: min avg max: %.6f %.6f %.6f%s" %
+            (self.__class__.__name__, y.shape[0],
+             self.weights.mem.size, time.time() - t_start,
+             stats.min, stats.mean, stats.max,
+             "" if stats.is_finite else " (%d NaNs, %d Infs)" % (
+                 stats.nans, stats.infs)))
 
     def ocl_run(self):
         """Forward propagation from batch on GPU.
@@ -441,6 +492,12 @@ class GradientDescentBase(AcceleratedUnit):
         self.apply_gradient = kwargs.get("apply_gradient",
                                          not workflow.is_slave)
 
+    def init_unpickled(self):
+        super(GradientDescentBase, self).init_unpickled()
+        # loss scales of err_output and of err_input on the current step
+        self._loss_scales_ = (None, None)
+        self._gradient_overflow_ = False
+
     @property
     def current_batch_size(self):
         batch_size = getattr(self, "batch_size", None)
@@ -520,7 +577,8 @@ class GradientDescentBase(AcceleratedUnit):
                 assert self.err_input.shape[1:] == self.input.shape[1:]
             if (not self.err_input or
                     self.err_input.shape[0] != self.input.shape[0]):
-                self.err_input.reset(numpy.zeros(self.input.shape, dtype))
+                self.err_input.reset(numpy.zeros(
+                    self.input.shape, mixed_precision.storage_dtype(dtype)))
 
         if self.need_gradient_weights and self.weights:
             side = self.weights_shape[0]
@@ -634,10 +692,9 @@ class GradientDescentBase(AcceleratedUnit):
                                   ("Grad Bias", grad_bias)]:
             w_mean = w_stddev = w_min = w_max = None
             if w_array is not None and w_array.size > 0:
-                w_mean = numpy.mean(w_array)
-                w_stddev = numpy.std(w_array)
-                w_min = numpy.min(w_array)
-                w_max = numpy.max(w_array)
+                stats = compute_stats(w_array)
+                w_mean, w_stddev, w_min, w_max = \
+                    stats.mean, stats.std, stats.min, stats.max
             weight_table.add_row(w_name, w_mean, w_stddev, w_min, w_max)
         self.debug("\n" + weight_table.get_string())
 
@@ -706,17 +763,108 @@ class GradientDescentBase(AcceleratedUnit):
 
     @staticmethod
     def numpy_gradient_step(weight, gradient, lr, factor_l12, l1_vs_l2,
-                            factor_ortho=0, weights_transposed=False):
-        gradient = gradient.copy()
-        gradient += factor_l12 * ((1.0 - l1_vs_l2) * weight +
-                                  0.5 * l1_vs_l2 * numpy.sign(weight))
+                            factor_ortho=0, weights_transposed=False,
+                            out=None, temp=None):
+        """Returns the regularized gradient multiplied by the learning rate.
+
+        Arguments:
+            out: the array to write the result to (may be gradient itself),
+                 allocated if None.
+            temp: the workspace of the same shape as weight, allocated
+                  if None.
+        """
+        if out is None:
+            out = gradient.copy()
+        elif out is not gradient:
+            numpy.copyto(out, gradient)
+        if factor_l12:
+            if temp is None:
+                temp = numpy.empty_like(weight)
+            numpy.multiply(weight, factor_l12 * (1.0 - l1_vs_l2), temp)
+            out += temp
+            if l1_vs_l2:
+                numpy.sign(weight, temp)
+                temp *= 0.5 * factor_l12 * l1_vs_l2
+                out += temp
         if factor_ortho:
             col_sums = (reshape_transposed(weight).sum(axis=1)
                         if weights_transposed else weight.sum(axis=0))
-            for i, row in enumerate(gradient):
+            for i, row in enumerate(out):
                 row += (col_sums - weight[i]) * factor_ortho / weight.shape[0]
-        gradient *= lr
-        return gradient
+        out *= lr
+        return out
+
+    def numpy_scratch(self, name, like, dtype=None):
+        """Returns the buffer of the same shape and dtype (unless specified)
+        as like from the workflow's :func:`scratch_pool()`. Its contents are
+        undefined.
+        """
+        return scratch_pool(self.workflow).get(
+            (id(self), name), like.shape, dtype or like.dtype)
+
+    def numpy_widen(self, name, mem):
+        """Returns mem itself or, if it is stored in a lower precision (see
+        :mod:`veles.znicz.mixed_precision`), its copy in the scratch buffer
+        in the precision of computations.
+        """
+        dtype = mixed_precision.compute_dtype(mem.dtype)
+        if dtype == mem.dtype:
+            return mem
+        buf = self.numpy_scratch(name, mem, dtype)
+        buf[...] = mem
+        return buf
+
+    def numpy_begin_loss_scaling(self):
+        """Finds out the loss scales of err_output and err_input on this
+        step, None means the errors are not scaled.
+        """
+        self._gradient_overflow_ = False
+        scale_in = mixed_precision.is_scaled(self.err_output)
+        scale_out = (self.need_err_input and bool(self.err_input) and
+                     mixed_precision.is_scaled(self.err_input))
+        if not scale_in and not scale_out:
+            self._loss_scales_ = (None, None)
+            return
+        scaler = mixed_precision.loss_scaler(self.workflow)
+        # the unit which starts scaling the errors starts the step
+        scale = scaler.scale if scale_in else scaler.begin()
+        self._loss_scales_ = (scale if scale_in else None,
+                              scale if scale_out else None)
+
+    @property
+    def numpy_err_input_scale(self):
+        """The factor which err_input is multiplied by due to the loss
+        scaling.
+        """
+        scale_in, scale_out = self._loss_scales_
+        return (scale_out or 1.0) / (scale_in or 1.0)
+
+    def numpy_unscale(self, gradient):
+        """Divides the gradient computed from the scaled err_output by the
+        loss scale.
+
+        Returns:
+            False if the gradients of this or of any other unit overflowed
+            on this step, then the update of the unit is skipped.
+        """
+        scale_in, scale_out = self._loss_scales_
+        if scale_in is None and scale_out is None:
+            return True
+        scaler = mixed_precision.loss_scaler(self.workflow)
+        if scale_in is not None and not scaler.overflowed:
+            gradient *= 1.0 / scale_in
+            scaler.report(bool(numpy.isfinite(gradient).all()))
+        if scaler.overflowed:
+            self._gradient_overflow_ = True
+        return not self._gradient_overflow_
+
+    def numpy_protect(self, *vectors):
+        """Must be called before the vectors are updated on a loss scaled
+        step, so that the update is undone if the gradients of a unit which
+        runs later overflow.
+        """
+        if self._loss_scales_ != (None, None):
+            mixed_precision.loss_scaler(self.workflow).protect(*vectors)
 
     def run(self):
         self.gradient_changed = True
@@ -724,6 +872,203 @@ class GradientDescentBase(AcceleratedUnit):
         self.ocl_set_const_args = False
 
 
+class ParameterStore(object):
+    """Keeps the weights and biases of the units in the adjacent slices of
+    a single aligned buffer, so that all of them are got, set, copied or
+    compared by one operation.
+
+    The arrays which have device memory are not moved: the operations
+    gather and scatter them instead.
+
+    Attributes:
+        layout: tuple of (index of the unit, attribute name) of each array
+                in the order of the buffer; pass it to :meth:`set()` along
+                with the values of another store.
+    """
+    ALIGNMENT = 64
+    ATTRS = ("weights", "bias")
+
+    def __init__(self, units):
+        """
+        Arguments:
+            units: function which returns the current list of the units.
+        """
+        self._units = units
+        self._arrays = []
+        self._views = []
+        self._layout = ()
+        self._buffer = None
+
+    @property
+    def arrays(self):
+        """The arrays of the parameters in the order of the buffer.
+        """
+        self._sync()
+        return tuple(self._arrays)
+
+    @property
+    def layout(self):
+        self._sync()
+        return self._layout
+
+    @property
+    def units(self):
+        """The units which own the parameters, in the order of the buffer.
+        """
+        units = self._units()
+        return tuple(sorted(set(units[index] for index, _ in self.layout),
+                            key=units.index))
+
+    @property
+    def size(self):
+        return sum(array.size for array in self.arrays)
+
+    @property
+    def dtype(self):
+        arrays = self.arrays
+        return arrays[0].dtype if arrays else None
+
+    @property
+    def is_packed(self):
+        """True if the arrays are the slices of the buffer.
+        """
+        self._sync()
+        return self._buffer is not None
+
+    @property
+    def values(self):
+        """The flat parameters. If they are packed, this is the buffer
+        itself, otherwise their gathered copy.
+        """
+        if self.is_packed:
+            return self._buffer
+        return self.get()
+
+    def get(self, out=None):
+        """Copies all the parameters into the flat array.
+        """
+        arrays = self.arrays
+        if out is None:
+            out = numpy.empty(self.size, self.dtype)
+        if self._buffer is not None:
+            numpy.copyto(out, self._buffer)
+            return out
+        offset = 0
+        for array in arrays:
+            array.map_read()
+            out[offset:offset + array.size] = array.mem.ravel()
+            offset += array.size
+        return out
+
+    def set(self, values, layout=None):
+        """Assigns all the parameters from the flat array.
+
+        Arguments:
+            values: flat parameters.
+            layout: layout of the values if they were taken from another
+                    store, it is the same as this one's by default.
+        """
+        arrays = self.arrays
+        if len(values) != self.size:
+            raise error.BadFormatError(
+                "Expected %d parameters, got %d" % (self.size, len(values)))
+        if layout is not None and tuple(layout) != self._layout:
+            self._set_permuted(values, layout)
+            return
+        if self._buffer is not None:
+            numpy.copyto(self._buffer, values)
+            return
+        offset = 0
+        for array in arrays:
+            array.map_invalidate()
+            array.mem.ravel()[:] = values[offset:offset + array.size]
+            offset += array.size
+
+    def copy(self, other):
+        """Assigns the parameters of another store of the same model.
+        """
+        self.set(other.values, other.layout)
+
+    def diff(self, values, out=None):
+        """Returns the flat difference between the parameters and values.
+        """
+        current = self.values
+        return numpy.subtract(current, values, out)
+
+    def _set_permuted(self, values, layout):
+        arrays = dict(zip(self._layout, self._arrays))
+        if set(arrays) != set(layout):
+            raise error.BadFormatError(
+                "The layout of the values does not match the parameters")
+        offset = 0
+        for key in layout:
+            array = arrays[key]
+            array.map_invalidate()
+            array.mem.ravel()[:] = values[offset:offset + array.size]
+            offset += array.size
+
+    def _sync(self):
+        """Packs the arrays if they changed since the previous call.
+        """
+        entries = []
+        for index, unit in enumerate(self._units()):
+            for attr in self.ATTRS:
+                array = getattr(unit, attr, None)
+                if array and all(array is not entry[0]
+                                 for entry in entries):
+                    entries.append((array, (index, attr)))
+        if len(entries) == len(self._arrays) and all(
+                entry[0] is array and array.mem is view for entry, array, view
+                in zip(entries, self._arrays, self._views)):
+            return
+        self._pack(entries)
+
+    def _pack(self, entries):
+        self._buffer = None
+        dtypes = set(array.dtype for array, _ in entries)
+        if len(dtypes) > 1:
+            raise error.BadFormatError(
+                "Parameters have different dtypes: %s" % dtypes)
+        if any(getattr(array, "devmem", None) is not None
+               for array, _ in entries):
+            self._arrays = [array for array, _ in entries]
+            self._layout = tuple(key for _, key in entries)
+            self._views = [array.mem for array in self._arrays]
+            return
+        for array, _ in entries:
+            array.map_read()
+        # the arrays which are already adjacent are kept in place
+        by_address = sorted(entries,
+                            key=lambda entry: entry[0].mem.ctypes.data)
+        self._buffer = adjacent_view([array.mem for array, _ in by_address])
+        if self._buffer is not None:
+            entries = by_address
+        self._arrays = [array for array, _ in entries]
+        if self._buffer is None and entries:
+            self._buffer = aligned_empty(
+                sum(array.size for array in self._arrays), dtypes.pop(),
+                self.ALIGNMENT)
+            offset = 0
+            for array in self._arrays:
+                view = self._buffer[offset:offset + array.size].reshape(
+                    array.shape)
+                view[:] = array.mem
+                array.reset(view)
+                offset += array.size
+        self._layout = tuple(key for _, key in entries)
+        self._views = [array.mem for array in self._arrays]
+
+
+def scratch_pool(workflow):
+    """Returns the :class:`veles.znicz.numpy_kernels.ScratchPool` shared by
+    the units of the workflow. It is not pickled.
+    """
+    pool = getattr(workflow, "scratch_pool_", None)
+    if pool is None:
+        pool = workflow.scratch_pool_ = ScratchPool()
+    return pool
+
+
 class NNWorkflow(AcceleratedWorkflow):
     """Base class for neural network workflow.
 
@@ -734,9 +1079,16 @@ class NNWorkflow(AcceleratedWorkflow):
         evaluator: evaluator.* unit.
         decision: decision.Decision unit.
         gds: list of the gradient descent units.
+        package_batch_size: the batch size of the native (libZnicz)
+                            workflow, package_export() writes it to the
+                            forward units.
     """
+    # the default for the workflows pickled before it was introduced
+    package_batch_size = 1
+
     def __init__(self, workflow, **kwargs):
         super(NNWorkflow, self).__init__(workflow, **kwargs)
+        self.package_batch_size = kwargs.get("package_batch_size", 1)
         self._repeater = Repeater(self)
         self._loader = None
         self._forwards = []
@@ -756,6 +1108,50 @@ class NNWorkflow(AcceleratedWorkflow):
     def gds(self):
         return self._gds
 
+    @property
+    def parameter_store(self):
+        """The :class:`ParameterStore` of the forward units. It is not
+        pickled.
+        """
+        store = getattr(self, "parameter_store_", None)
+        if store is None:
+            store = self.parameter_store_ = ParameterStore(
+                self._trainable_units)
+        return store
+
+    def _trainable_units(self):
+        optimizer = getattr(self, "fused_optimizer_", None)
+        if optimizer is None or not optimizer.units:
+            return self.forwards
+        # the units of the same fused group go one after another, so that
+        # the group updates its parameters right in the store
+        order = optimizer.group_order()
+        return sorted(self.forwards, key=lambda unit: order.get(
+            id(getattr(unit, "weights", None)), len(order)))
+
+    def export_parameters(self):
+        """Returns the parameters of all the forward units at once, as the
+        tuple (layout, flat values). The layout holds (index in forwards,
+        attribute name) of each array. It is the bulk alternative to the
+        per unit generate_data_for_slave(), see :meth:`import_parameters`.
+        """
+        store = self.parameter_store
+        units = self._trainable_units()
+        layout = tuple((self.forwards.index(units[index]), attr)
+                       for index, attr in store.layout)
+        return layout, store.get()
+
+    def import_parameters(self, data):
+        """Assigns the parameters returned by :meth:`export_parameters` of
+        a workflow of the same model. The forward units must have been
+        initialized.
+        """
+        layout, values = data
+        units = self._trainable_units()
+        self.parameter_store.set(values, tuple(
+            (units.index(self.forwards[index]), attr)
+            for index, attr in layout))
+
     @property
     def loader(self):
         if self._loader is None:
@@ -806,49 +1202,180 @@ class NNWorkflow(AcceleratedWorkflow):
 
 
 class NNSnapshotterBase(SnapshotterBase):
+    """Snapshotter which logs the statistics of the arrays of the units.
+
+    Attributes:
+        asynchronous: compute the statistics, collect the garbage and, if
+                      the descendant supports it, write the snapshots on
+                      the background thread, so that the training goes on
+                      meanwhile. The logged arrays are copied first.
+        stats_sample_size: the statistics of the larger arrays are
+                           calculated over the sample of this size (see
+                           :func:`veles.znicz.array_stats.compute_stats`).
+        has_invalid_values: the arrays contain NaN or Inf. It is set by
+                            run() even if the snapshotter is asynchronous.
+    """
+    LOGGED_ATTRS = ("input", "weights", "bias", "output", "err_output",
+                    "err_input")
+
     def __init__(self, workflow, **kwargs):
         super(NNSnapshotterBase, self).__init__(workflow, **kwargs)
         self.has_invalid_values = Bool(False)
+        self.asynchronous = kwargs.get("asynchronous", False)
+        self.stats_sample_size = kwargs.get("stats_sample_size")
 
-    def _log_attr(self, unit, attr, logged):
-        val = getattr(unit, attr, None)
-        if val is None:
-            return
-        mem = getattr(val, "mem", None)
-        if mem is None:
-            return
-        val.map_read()
-        if id(mem) not in logged:
-            self.has_invalid_values <<= bool(
-                numpy.count_nonzero(numpy.isnan(mem)) or
-                numpy.count_nonzero(numpy.isinf(mem)))
-            args = ("%s: %s: min max avg: %.6f %.6f %.6f%s",
-                    unit.__class__.__name__, attr,
-                    mem.min(), mem.max(), numpy.average(mem),
-                    " has invalid values" if self.has_invalid_values else "")
-            if self.has_invalid_values:
-                self.error(*args)
-            else:
-                self.info(*args)
-            logged.add(id(mem))
+    def init_unpickled(self):
+        super(NNSnapshotterBase, self).init_unpickled()
+        self._tasks_ = None
 
-    def run(self):
-        if not super(NNSnapshotterBase, self).run():
+    def run_in_background(self, fn, *args):
+        """Calls fn(\*args) on the background thread after the previous
+        calls finish if the snapshotter is asynchronous, otherwise right
+        away.
+        """
+        if not self.asynchronous:
+            fn(*args)
             return
+        if self._tasks_ is None:
+            self._tasks_ = queue.Queue()
+            thread = threading.Thread(target=self._background_loop,
+                                      name="%s background" % self.name)
+            thread.daemon = True
+            thread.start()
+        self._tasks_.put((fn, args))
+
+    def wait(self):
+        """Waits until the background calls finish.
+        """
+        if self._tasks_ is not None:
+            self._tasks_.join()
+
+    def stop(self):
+        self.wait()
+        super(NNSnapshotterBase, self).stop()
+
+    def _background_loop(self):
+        tasks = self._tasks_
+        while True:
+            fn, args = tasks.get()
+            try:
+                fn(*args)
+            except Exception:
+                self.exception("Failed to run %s in background", fn)
+            finally:
+                tasks.task_done()
+
+    def _log_attr(self, unit, attr, mem):
+        stats = compute_stats(mem, self.stats_sample_size)
+        if not self.asynchronous:
+            self.has_invalid_values <<= not stats.is_finite
+        args = ("%s: %s: min max avg: %.6f %.6f %.6f%s%s",
+                unit.__class__.__name__, attr,
+                stats.min, stats.max, stats.mean,
+                " (sampled)" if stats.sampled else "",
+                " has %d NaNs and %d Infs" % (stats.nans, stats.infs)
+                if not stats.is_finite else "")
+        if not stats.is_finite:
+            self.error(*args)
+        else:
+            self.info(*args)
+
+    def _collect_attrs(self):
+        """Returns the list of (unit, attribute name, numpy array) to log.
+        The arrays are copied if the snapshotter is asynchronous, and then
+        has_invalid_values is set here rather than on the background
+        thread.
+        """
         logged = set()
-        for u in self.workflow.start_point.dependent_units():
-            for attr in ("input", "weights", "bias", "output",
-                         "err_output", "err_input"):
-                self._log_attr(u, attr, logged)
-        del logged
+        attrs = []
+        for unit in self.workflow.start_point.dependent_units():
+            for attr in self.LOGGED_ATTRS:
+                val = getattr(unit, attr, None)
+                if val is None:
+                    continue
+                mem = getattr(val, "mem", None)
+                if mem is None:
+                    continue
+                val.map_read()
+                if id(mem) in logged:
+                    continue
+                logged.add(id(mem))
+                if self.asynchronous:
+                    self.has_invalid_values <<= not is_finite(mem)
+                    mem = mem.copy()
+                attrs.append((unit, attr, mem))
+        return attrs
+
+    def _log_attrs(self, attrs):
+        for unit, attr, mem in attrs:
+            self._log_attr(unit, attr, mem)
+        del attrs
         _, dt = timeit(gc.collect)
         if dt > 1.0:
             self.warning("gc.collect() took %.1f sec", dt)
 
+    def run(self):
+        # the previous snapshot is complete before the next one starts,
+        # which also bounds the memory taken by the copies
+        self.wait()
+        if not super(NNSnapshotterBase, self).run():
+            return
+        self.run_in_background(self._log_attrs, self._collect_attrs())
+
 
 class NNSnapshotterToFile(NNSnapshotterBase, SnapshotterToFile):
+    """Snapshotter to the files which optionally writes the delta
+    snapshots (see :mod:`veles.znicz.delta_snapshot`): after the base
+    snapshot, only the arrays which changed are written. Such snapshots
+    are not compressed and must be restored with :meth:`import_`. If the
+    snapshotter is asynchronous, the workflow is pickled and its arrays
+    are copied on the training thread, so the snapshot is consistent,
+    while the arrays are hashed and written on the background thread.
+    The usual compressed snapshots are written by
+    :meth:`veles.snapshotter.SnapshotterToFile.export` on the training
+    thread in either case.
+
+    Attributes:
+        delta: write the delta snapshots.
+        rebase_interval: the number of deltas after which the full base
+                         snapshot is written again.
+    """
     MAPPING = "nnfile"
 
+    def __init__(self, workflow, **kwargs):
+        super(NNSnapshotterToFile, self).__init__(workflow, **kwargs)
+        self.delta = kwargs.get("delta", False)
+        self.rebase_interval = kwargs.get("rebase_interval", 10)
+
+    def init_unpickled(self):
+        super(NNSnapshotterToFile, self).init_unpickled()
+        self._delta_chain_ = None
+
+    def export(self):
+        if not self.delta:
+            return super(NNSnapshotterToFile, self).export()
+        self._destination = os.path.abspath(os.path.join(
+            self.directory, "%s_%s%s" % (
+                self.prefix, self.suffix, delta_snapshot.SUFFIX)))
+        self.info("Snapshotting to %s...", self._destination)
+        if self._delta_chain_ is None:
+            self._delta_chain_ = delta_snapshot.DeltaChain()
+        self._delta_chain_.rebase_interval = self.rebase_interval
+        self.run_in_background(self._save_snapshot, self._delta_chain_.prepare(
+            self.workflow, self._destination, copy=self.asynchronous))
+
+    @staticmethod
+    def import_(file_name):
+        if file_name.endswith(delta_snapshot.SUFFIX):
+            return delta_snapshot.load(file_name)
+        return SnapshotterToFile.import_(file_name)
+
+    def _save_snapshot(self, snapshot):
+        _, dt = timeit(snapshot.save)
+        self.info("Wrote the %s snapshot with %d arrays of %.1f MB in "
+                  "%.1f sec", "base" if snapshot.is_base else "delta",
+                  len(snapshot.arrays), snapshot.size / (1 << 20), dt)
+
 
 class NNSnapshotterToDB(NNSnapshotterBase, SnapshotterToDB):
     MAPPING = "nnodbc"
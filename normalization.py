@@ -61,20 +61,26 @@ class LocalResponseNormalizer(AcceleratedUnit):
 
         super(LocalResponseNormalizer, self).__init__(workflow, **kwargs)
 
-    def _subsums(self, source_array, window_size):
+    def _subsums(self, source_array, window_size, out=None):
         """
         For each channel calculates the sum of its neighbour channels.
         source_array must be a 4-dimensional array (channel dim is the last).
+        The sums are the differences of the cumulative sums along channels,
+        which are computed in-place, so source_array is overwritten.
         """
         assert len(source_array.shape) == 4
-        subsums = numpy.empty_like(source_array)
+        if out is None:
+            out = numpy.empty_like(source_array)
         num_of_chans = source_array.shape[3]
-        for i in range(num_of_chans):
-            min_index = max(0, i - int(window_size / 2))
-            max_index = min(i + int(window_size / 2), num_of_chans - 1)
-            array_slice = source_array[:, :, :, min_index: max_index + 1]
-            subsums[:, :, :, i] = numpy.sum(array_slice, axis=3)
-        return subsums
+        half = window_size // 2
+        cumsum = numpy.cumsum(source_array, axis=3, out=source_array)
+        last = numpy.minimum(numpy.arange(num_of_chans) + half,
+                             num_of_chans - 1)
+        numpy.take(cumsum, last, axis=3, out=out, mode="clip")
+        if half + 1 < num_of_chans:
+            out[:, :, :, half + 1:] -= \
+                cumsum[:, :, :, :num_of_chans - half - 1]
+        return out
 
     # IDistributable implementation
     def generate_data_for_slave(self, slave):
@@ -98,9 +104,14 @@ class LRNormalizerForward(LocalResponseNormalizer, Forward):
     """
     Forward propagation of local response normalization.
     """
+    __id__ = "811d95a5-d8a1-44c2-aea5-8f5328059eb9"
 
     MAPPING = {"norm"}
 
+    def __init__(self, workflow, **kwargs):
+        super(LRNormalizerForward, self).__init__(workflow, **kwargs)
+        self.exports.extend(("alpha", "beta", "k", "n", "input_sample_shape"))
+
     def init_unpickled(self):
         super(LRNormalizerForward, self).init_unpickled()
         self.sources_["normalization"] = {}
@@ -146,13 +157,13 @@ class LRNormalizerForward(LocalResponseNormalizer, Forward):
         self.input.map_read()
 
         assert len(self.input.shape) == 4
-        input_squared = numpy.square(self.input.mem)
-        subsums = self._subsums(input_squared, self.n)
+        inp = self.input.mem
+        subsums = self._subsums(numpy.square(inp), self.n,
+                                out=self.output.mem)
         subsums *= self.alpha
         subsums += self.k
-        subsums **= self.beta
-
-        numpy.copyto(self.output.mem, self.input.mem / subsums)
+        numpy.power(subsums, self.beta, subsums)
+        numpy.divide(inp, subsums, subsums)
 
     def _gpu_run(self):
         self.unmap_vectors(self.input, self.output)
@@ -229,36 +240,24 @@ class LRNormalizerBackward(LocalResponseNormalizer, GradientDescentBase):
         assert len(self.input.shape) == 4
         assert self.input.shape == self.err_output.shape
 
-        num_of_chans = self.input.shape[3]
-
-        input_squared = numpy.square(self.input.mem)
-        input_subsums = self._subsums(input_squared, self.n)
-
-        input_subsums *= self.alpha
-        input_subsums += self.k
-
-        input_subsums_powered = numpy.power(input_subsums, (self.beta + 1))
-
-        err_h = self.err_input.mem
+        inp = self.input.mem
         err_y = self.err_output.mem
+        err_h = self.err_input.mem
 
-        for i in range(num_of_chans):
-            min_index = max(0, i - int(self.n / 2))
-            max_index = min(i + int(self.n / 2), num_of_chans - 1)
-
-            delta_h = numpy.zeros(dtype=numpy.float64,
-                                  shape=err_h[:, :, :, i].shape)
-            for j in range(min_index, max_index + 1):
-                dh = numpy.zeros(shape=delta_h.shape, dtype=numpy.float64)
-                if i == j:
-                    dh += input_subsums[:, :, :, j]
-                dh -= (2 * self.beta * self.alpha *
-                       self.input.mem[:, :, :, i] *
-                       self.input.mem[:, :, :, j])
-                dh *= (err_y[:, :, :, j] /
-                       input_subsums_powered[:, :, :, j])
-                delta_h += dh
-            numpy.copyto(err_h[:, :, :, i], delta_h)
+        # err_h[i] = err_y[i] / s[i]^beta - 2 * alpha * beta * h[i] *
+        #     sum(h[j] * err_y[j] / s[j]^(beta + 1)) over the window of i,
+        # where s = k + alpha * subsums of squares
+        subsums = self._subsums(numpy.square(inp), self.n, out=err_h)
+        subsums *= self.alpha
+        subsums += self.k
+        scaled_err_y = numpy.power(subsums, self.beta)
+        numpy.divide(err_y, scaled_err_y, scaled_err_y)
+        numpy.divide(scaled_err_y, subsums, subsums)
+        subsums *= inp
+        window_sums = self._subsums(subsums, self.n)
+        numpy.multiply(window_sums, inp, err_h)
+        err_h *= -2 * self.alpha * self.beta
+        err_h += scaled_err_y
 
     def _gpu_run(self):
         self.unmap_vectors(self.err_output, self.input, self.err_input)
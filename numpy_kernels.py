@@ -0,0 +1,602 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Vectorized building blocks for the CPU (numpy) execution paths of the
+neural network units. They mirror the OpenCL/CUDA kernels, so that the numpy
+backend produces the same results as the accelerated ones.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from __future__ import division
+from multiprocessing.pool import ThreadPool
+import numpy
+from numpy.lib.stride_tricks import as_strided
+import threading
+
+from veles.config import root
+import veles.error as error
+from veles.memory import reshape
+from veles.znicz.mixed_precision import compute_dtype
+
+
+class MinibatchShards(object):
+    """Splits the minibatch into contiguous shards and processes them in
+    a pool of threads. Most of numpy loops release GIL, so the shards are
+    processed by different cores. The shards of the same minibatch size are
+    always the same, and the results are returned in the order of shards,
+    so their reduction does not depend on the threads scheduling.
+
+    Attributes:
+        threads: number of threads, 1 means processing in the calling thread.
+    """
+
+    # minimal number of elements in a shard
+    MIN_SHARD_SIZE = 1 << 14
+
+    def __init__(self, threads):
+        self.threads = max(int(threads), 1)
+        self._pool = ThreadPool(self.threads) if self.threads > 1 else None
+        self._local = threading.local()
+
+    def bounds(self, size, sample_size=1):
+        """Returns the list of (start, stop) of the shards of range(size).
+
+        Arguments:
+            size: number of samples in the minibatch.
+            sample_size: number of elements in a sample, the shards smaller
+                         than :attr:`MIN_SHARD_SIZE` elements are merged.
+        """
+        count = min(self.threads,
+                    size * sample_size // self.MIN_SHARD_SIZE, size)
+        if self._pool is None or getattr(self._local, "nested", False):
+            count = 1
+        count = max(count, 1)
+        edges = [size * i // count for i in range(count + 1)]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def map(self, fn, size, sample_size=1):
+        """Calls fn(start, stop) for each shard of range(size).
+
+        Returns:
+            The list of the results in the order of shards.
+        """
+        bounds = self.bounds(size, sample_size)
+        if len(bounds) == 1:
+            return [fn(*bounds[0])]
+        return self._pool.map(lambda b: self._call(fn, *b), bounds, 1)
+
+    def _call(self, fn, start, stop):
+        # the shards must not be sharded again, otherwise all the threads
+        # may wait for the nested shards which are never scheduled
+        self._local.nested = True
+        try:
+            return fn(start, stop)
+        finally:
+            self._local.nested = False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+
+_minibatch_shards = None
+_minibatch_shards_lock = threading.Lock()
+
+
+def minibatch_shards():
+    """Returns the shared :class:`MinibatchShards` with the number of threads
+    taken from root.common.engine.numpy_threads (1 by default).
+    """
+    global _minibatch_shards
+    threads = root.common.engine.__content__.get("numpy_threads", 1)
+    with _minibatch_shards_lock:
+        if _minibatch_shards is None or \
+                _minibatch_shards.threads != max(int(threads), 1):
+            if _minibatch_shards is not None:
+                _minibatch_shards.close()
+            _minibatch_shards = MinibatchShards(threads)
+        return _minibatch_shards
+
+
+class ScratchPool(object):
+    """Reusable temporary buffers of the CPU backend, so that the steady
+    state iterations do not allocate them on the heap.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+    def get(self, key, shape, dtype):
+        """Returns the buffer registered under key. It is reallocated if
+        the requested shape or dtype differ. Its contents are undefined.
+        """
+        shape = tuple(shape)
+        dtype = numpy.dtype(dtype)
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[key] = numpy.empty(shape, dtype)
+        return buf
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def sum_rows(rows, out):
+    """Sums the rows of the 2D array into out. The partial sums of the shards
+    are added in the order of shards, so that the result is reproducible.
+    """
+    partials = minibatch_shards().map(
+        lambda start, stop: rows[start:stop].sum(axis=0, dtype=out.dtype),
+        rows.shape[0], rows.shape[1])
+    out[:] = partials[0]
+    for partial in partials[1:]:
+        out += partial
+
+
+def aligned_empty(size, dtype, alignment=64):
+    """Returns the uninitialized flat array which starts at the address
+    aligned to the given number of bytes.
+    """
+    dtype = numpy.dtype(dtype)
+    raw = numpy.empty(size * dtype.itemsize + alignment, numpy.uint8)
+    shift = -raw.ctypes.data % alignment
+    return raw[shift:shift + size * dtype.itemsize].view(dtype)
+
+
+def adjacent_view(arrays):
+    """Returns the flat view of the memory of the C-contiguous numpy arrays
+    if they follow one another in the given order within the same buffer,
+    None otherwise.
+    """
+    if len(arrays) == 0:
+        return None
+    dtype = arrays[0].dtype
+    owner = arrays[0]
+    while owner.base is not None:
+        owner = owner.base
+    if not isinstance(owner, numpy.ndarray):
+        return None
+    position = start = arrays[0].ctypes.data
+    for arr in arrays:
+        base = arr
+        while base.base is not None:
+            base = base.base
+        if base is not owner or arr.dtype != dtype or \
+                not arr.flags.c_contiguous or arr.ctypes.data != position:
+            return None
+        position += arr.nbytes
+    return numpy.ndarray(((position - start) // dtype.itemsize,), dtype,
+                         buffer=owner, offset=start - owner.ctypes.data)
+
+
+def _activation_linear(output):
+    pass
+
+
+def _activation_tanh(output):
+    output *= 0.6666
+    numpy.tanh(output, output)
+    output *= 1.7159
+
+
+def _activation_relu(output):
+    # log(exp(y) + 1) for y <= 15, y otherwise
+    numpy.logaddexp(output, 0, out=output, where=output <= 15)
+
+
+def _activation_strict_relu(output):
+    numpy.maximum(output, 0, out=output)
+
+
+def _activation_sigmoid(output):
+    numpy.negative(output, output)
+    numpy.exp(output, output)
+    output += 1
+    numpy.reciprocal(output, output)
+
+
+ACTIVATIONS = {
+    "ACTIVATION_LINEAR": _activation_linear,
+    "ACTIVATION_TANH": _activation_tanh,
+    "ACTIVATION_RELU": _activation_relu,
+    "ACTIVATION_STRICT_RELU": _activation_strict_relu,
+    "ACTIVATION_SIGMOID": _activation_sigmoid,
+}
+
+
+def apply_bias_with_activation(output, bias, activation_mode):
+    """Adds bias to output and applies the activation function in-place,
+    like apply_bias_with_activation OpenCL/CUDA kernel does.
+
+    Arguments:
+        output: numpy array, its size must be the multiple of bias size.
+        bias: numpy array or None if there is no bias to add.
+        activation_mode: one of :data:`ACTIVATIONS` keys, the same as the
+                         define passed to the OpenCL/CUDA sources.
+    """
+    try:
+        activation = ACTIVATIONS[activation_mode]
+    except KeyError:
+        raise error.BadFormatError(
+            "Unsupported activation: %s" % activation_mode)
+    if bias is not None:
+        output = reshape(output, (output.size // bias.size, bias.size))
+    else:
+        output = reshape(output, (output.shape[0], output.size //
+                                  output.shape[0]))
+
+    def apply(start, stop):
+        rows = output[start:stop]
+        if bias is not None:
+            rows += bias
+        activation(rows)
+
+    minibatch_shards().map(apply, output.shape[0], output.shape[1])
+
+
+def softmax(output, max_idx):
+    """Applies softmax to each row of output in-place and stores the indices
+    of the maximal elements, like apply_exp OpenCL/CUDA kernel does.
+
+    Arguments:
+        output: 2D numpy array, a row per sample.
+        max_idx: numpy array to store the index of the maximum of each row.
+    """
+    def apply(start, stop):
+        rows = output[start:stop]
+        index = rows.argmax(axis=1)
+        max_idx[start:stop] = index
+        rows -= rows[numpy.arange(rows.shape[0]), index][:, None]
+        numpy.exp(rows, rows)
+        rows /= rows.sum(axis=1, keepdims=True)
+
+    minibatch_shards().map(apply, output.shape[0], output.shape[1])
+
+
+class ConvolutionUnpacker(object):
+    """Unrolls batches of multichannel interleaved images into the matrix
+    of kernel applications (im2col) and packs such matrices back (col2im).
+
+    The layout of the unrolled matrix is the same as the one produced by
+    Unpack1D OpenCL/CUDA kernel (and consumed by DirectPack): each row
+    corresponds to a single kernel application (image, y, x) and holds
+    ky * kx * n_channels values.
+
+    Attributes:
+        sx: image width.
+        sy: image height.
+        n_channels: number of channels in the image.
+        kx: kernel width.
+        ky: kernel height.
+        padding: tuple of virtual sample padding (left, top, right, bottom).
+        sliding: tuple of kernel sliding (by x-axis, by y-axis).
+        unpack_size: maximal number of images to process at once.
+        kx_app: number of kernel applications by x-axis.
+        ky_app: number of kernel applications by y-axis.
+        kernel_size: the length of the unrolled kernel application.
+    """
+
+    def __init__(self, sample_shape, kx, ky, padding, sliding, unpack_size,
+                 dtype):
+        self.sy, self.sx = sample_shape[:2]
+        self.n_channels = int(numpy.prod(sample_shape[2:]))
+        self.kx = kx
+        self.ky = ky
+        self.padding = tuple(padding)
+        self.sliding = tuple(sliding)
+        self.unpack_size = unpack_size
+        self.dtype = numpy.dtype(dtype)
+        self.sx_full = self.padding[0] + self.sx + self.padding[2]
+        self.sy_full = self.padding[1] + self.sy + self.padding[3]
+        self.kx_app = 1 + (self.sx_full - self.kx) // self.sliding[0]
+        self.ky_app = 1 + (self.sy_full - self.ky) // self.sliding[1]
+        self.kernel_size = self.kx * self.ky * self.n_channels
+        self._unpacked = numpy.empty(
+            (self.unpack_size * self.kernel_app_per_image, self.kernel_size),
+            dtype=self.dtype)
+        self._padded_in = None
+        self._padded_out = None
+
+    @property
+    def kernel_app_per_image(self):
+        return self.kx_app * self.ky_app
+
+    @property
+    def has_padding(self):
+        return any(self.padding)
+
+    def _padded_buffer(self, name):
+        buf = getattr(self, name)
+        if buf is None:
+            buf = numpy.zeros((self.unpack_size, self.sy_full, self.sx_full,
+                               self.n_channels), dtype=self.dtype)
+            setattr(self, name, buf)
+        return buf
+
+    def _interior(self, padded):
+        return padded[:, self.padding[1]:self.padding[1] + self.sy,
+                      self.padding[0]:self.padding[0] + self.sx]
+
+    def _images(self, images):
+        return images.reshape(
+            (images.shape[0], self.sy, self.sx, self.n_channels))
+
+    def unpack(self, images):
+        """Unrolls the batch of images (im2col).
+
+        Arguments:
+            images: numpy array of at most unpack_size images.
+
+        Returns:
+            The view of the internal workspace of shape
+            (len(images) * kernel_app_per_image, kernel_size). It is
+            overwritten by the next call.
+        """
+        count = images.shape[0]
+        assert count <= self.unpack_size
+        images = self._images(images)
+        if self.has_padding or not images.flags.c_contiguous:
+            # the borders of this buffer are never written, so they stay zero
+            padded = self._padded_buffer("_padded_in")[:count]
+        else:
+            padded = None
+        unpacked = self._unpacked[:count * self.kernel_app_per_image]
+
+        def unpack(start, stop):
+            source = images[start:stop]
+            if padded is not None:
+                self._interior(padded[start:stop])[:] = source
+                source = padded[start:stop]
+            strides = source.strides
+            windows = as_strided(
+                source, shape=(stop - start, self.ky_app, self.kx_app,
+                               self.ky, self.kx, self.n_channels),
+                strides=(strides[0], strides[1] * self.sliding[1],
+                         strides[2] * self.sliding[0]) + strides[1:])
+            numpy.copyto(unpacked[start * self.kernel_app_per_image:
+                                  stop * self.kernel_app_per_image]
+                         .reshape(windows.shape), windows)
+
+        minibatch_shards().map(
+            unpack, count, self.kernel_app_per_image * self.kernel_size)
+        return unpacked
+
+    def workspace(self, count):
+        """Returns the view of the internal workspace for count images, which
+        may be filled and passed to :meth:`pack()`.
+        """
+        assert count <= self.unpack_size
+        return self._unpacked[:count * self.kernel_app_per_image]
+
+    def pack(self, unpacked, images):
+        """Packs the unrolled matrix back (col2im), summing the values of
+        the overlapping kernel applications, and adds the result to images.
+
+        Arguments:
+            unpacked: numpy array of shape
+                      (len(images) * kernel_app_per_image, kernel_size).
+            images: numpy array of at most unpack_size images to update.
+        """
+        count = images.shape[0]
+        assert count <= self.unpack_size
+        assert unpacked.shape == (count * self.kernel_app_per_image,
+                                  self.kernel_size)
+        padded = self._padded_buffer("_padded_out")[:count]
+        windows = unpacked.reshape((count, self.ky_app, self.kx_app,
+                                    self.ky, self.kx, self.n_channels))
+        images = reshape(images, (count, self.sy, self.sx, self.n_channels))
+        y_stop = self.sliding[1] * (self.ky_app - 1) + 1
+        x_stop = self.sliding[0] * (self.kx_app - 1) + 1
+
+        def pack(start, stop):
+            target = padded[start:stop]
+            target[:] = 0
+            for y in range(self.ky):
+                for x in range(self.kx):
+                    target[:, y:y + y_stop:self.sliding[1],
+                           x:x + x_stop:self.sliding[0]] += \
+                        windows[start:stop, :, :, y, x]
+            images[start:stop] += self._interior(target)
+
+        minibatch_shards().map(
+            pack, count, self.kernel_app_per_image * self.kernel_size)
+
+
+class PoolingWindows(object):
+    """Strided views of the pooling windows over batches of multichannel
+    interleaved images, including the partial windows at the right and
+    at the bottom edges.
+
+    Attributes:
+        kx: pooling kernel width.
+        ky: pooling kernel height.
+        sliding: tuple of kernel sliding (by x-axis, by y-axis).
+        out_sx: number of windows by x-axis.
+        out_sy: number of windows by y-axis.
+        fill: value of the virtual elements of the partial windows.
+        counts: numbers of the real elements in each window,
+                shape is (out_sy, out_sx, 1).
+    """
+
+    def __init__(self, input_shape, kx, ky, sliding, out_sx, out_sy, dtype,
+                 fill=0):
+        self.batch_size, self.sy, self.sx = input_shape[:3]
+        self.n_channels = int(numpy.prod(input_shape[3:]))
+        self.kx = kx
+        self.ky = ky
+        self.sliding = tuple(sliding)
+        self.out_sx = out_sx
+        self.out_sy = out_sy
+        self.dtype = numpy.dtype(dtype)
+        self.fill = fill
+        full_sx = max((out_sx - 1) * self.sliding[0] + kx, self.sx)
+        full_sy = max((out_sy - 1) * self.sliding[1] + ky, self.sy)
+        self._padded = None
+        if full_sx != self.sx or full_sy != self.sy:
+            self._padded = numpy.empty(
+                (self.batch_size, full_sy, full_sx, self.n_channels),
+                dtype=self.dtype)
+            self._padded[:] = fill
+        self._cuts = None
+        self._spread = None
+        ys = numpy.arange(out_sy) * self.sliding[1]
+        xs = numpy.arange(out_sx) * self.sliding[0]
+        rows = numpy.minimum(ys + ky, self.sy) - ys
+        cols = numpy.minimum(xs + kx, self.sx) - xs
+        self.counts = numpy.multiply.outer(rows, cols)[:, :, None]
+        # offsets of the first window element in the input for each window
+        self._base_offsets = (
+            ((numpy.arange(self.batch_size)[:, None, None, None] * self.sy +
+              ys[:, None, None]) * self.sx + xs[:, None]) *
+            self.n_channels +
+            numpy.arange(self.n_channels)).astype(numpy.int32)
+        # offsets of window elements relative to the first one
+        dy, dx = numpy.divmod(numpy.arange(ky * kx), kx)
+        self._delta_offsets = ((dy * self.sx + dx) *
+                               self.n_channels).astype(numpy.int32)
+        # numbers of the real elements in each window before the element
+        self._running_counts = numpy.cumsum(
+            (dy[None, None] < rows[:, None, None]) &
+            (dx[None, None] < cols[None, :, None]),
+            axis=-1).astype(self.dtype)[:, :, None, :]
+
+    def windows(self, images, start=0):
+        """Returns the strided view of images of shape
+        (count, out_sy, out_sx, ky, kx, n_channels). The partial windows are
+        completed with :attr:`fill`.
+
+        Arguments:
+            images: numpy array of count images, the shard of the batch.
+            start: index of the first image of the shard in the batch.
+        """
+        count = images.shape[0]
+        images = reshape(images, (count, self.sy, self.sx, self.n_channels))
+        if self._padded is not None:
+            padded = self._padded[start:start + count]
+            padded[:, :self.sy, :self.sx] = images
+            images = padded
+        strides = images.strides
+        return as_strided(
+            images, shape=(count, self.out_sy, self.out_sx,
+                           self.ky, self.kx, self.n_channels),
+            strides=(strides[0], strides[1] * self.sliding[1],
+                     strides[2] * self.sliding[0]) + strides[1:])
+
+    def cuts(self, images, start=0):
+        """Copies the windows into the contiguous workspace of shape
+        (count, out_sy, out_sx, n_channels, ky * kx), so that the window
+        elements are along the last axis in row-major order.
+        """
+        if self._cuts is None:
+            self._cuts = numpy.empty(
+                (self.batch_size, self.out_sy, self.out_sx, self.n_channels,
+                 self.ky * self.kx), dtype=self.dtype)
+        cuts = self._cuts[start:start + images.shape[0]]
+        numpy.copyto(cuts.reshape(cuts.shape[:-1] + (self.ky, self.kx)),
+                     self.windows(images, start).transpose(0, 1, 2, 5, 3, 4))
+        return cuts
+
+    def offsets(self, index, out, start=0):
+        """Converts the indices of the window elements returned by
+        :meth:`cuts()` (e.g., by argmax over the last axis) into the offsets
+        in the input.
+        """
+        numpy.take(self._delta_offsets, index, out=out)
+        out += self._base_offsets[start:start + out.shape[0]]
+
+    def sum(self, images, out, start=0):
+        """Sums the real elements of each window, the fill must be zero.
+        """
+        assert self.fill == 0
+        numpy.sum(self.windows(images, start), axis=(3, 4), out=out,
+                  dtype=compute_dtype(out.dtype))
+
+    def stochastic_select(self, cuts, rand):
+        """Selects the element in each window with the probability
+        proportional to its value (GPU stochastic_pooling kernel algorithm).
+        The windows which sum to zero select the element uniformly.
+
+        Arguments:
+            cuts: nonnegative values in the layout of :meth:`cuts()`, are
+                  destroyed.
+            rand: uint16 random numbers, one per window.
+
+        Returns:
+            The indices of the selected elements along the last axis.
+        """
+        cumsum = numpy.cumsum(cuts, axis=-1, out=cuts)
+        total = cumsum[..., -1]
+        empty = total == 0
+        if empty.any():
+            cumsum[empty] = numpy.broadcast_to(
+                self._running_counts, cumsum.shape)[empty]
+            factor = numpy.where(
+                empty, self.counts.astype(self.dtype), total)
+        else:
+            factor = total
+        position = factor * rand
+        position /= 65536
+        return numpy.argmax(cumsum >= position[..., None], axis=-1)
+
+    def spread(self, values, images, start=0):
+        """Adds each value to all the real elements of its window (the
+        adjoint of :meth:`sum()`).
+
+        Arguments:
+            values: numpy array of shape
+                    (count, out_sy, out_sx, n_channels).
+            images: numpy array of count images to update.
+            start: index of the first image in the batch.
+        """
+        count = values.shape[0]
+        images = reshape(images, (count, self.sy, self.sx, self.n_channels))
+        if self._padded is None:
+            target = images
+        else:
+            if self._spread is None:
+                self._spread = numpy.empty_like(self._padded)
+            target = self._spread[start:start + count]
+            target[:] = 0
+        y_stop = self.sliding[1] * (self.out_sy - 1) + 1
+        x_stop = self.sliding[0] * (self.out_sx - 1) + 1
+        for y in range(self.ky):
+            for x in range(self.kx):
+                target[:, y:y + y_stop:self.sliding[1],
+                       x:x + x_stop:self.sliding[0]] += values
+        if target is not images:
+            images += target[:, :self.sy, :self.sx]
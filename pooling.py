@@ -50,7 +50,6 @@ under the License.
 
 
 from __future__ import division
-from itertools import product
 import logging
 import numpy
 import time
@@ -59,6 +58,7 @@ from zope.interface import implementer
 from veles.memory import Array
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 import veles.znicz.nn_units as nn_units
+from veles.znicz.numpy_kernels import PoolingWindows, minibatch_shards
 from veles.distributable import IDistributable, TriviallyDistributable
 from veles.prng.uniform import Uniform
 from veles.units import Unit
@@ -140,12 +140,15 @@ class Pooling(PoolingBase, nn_units.Forward, TriviallyDistributable):
     """
     MAPPING = set()
 
+    # value of the virtual elements of the partial windows on CPU
+    NUMPY_FILL = 0
+
     def __init__(self, workflow, **kwargs):
         super(Pooling, self).__init__(workflow, **kwargs)
         self.kx = kwargs["kx"]
         self.ky = kwargs["ky"]
         self.sliding = kwargs.get("sliding") or (self.kx, self.ky)
-        self.exports.extend(self.POOL_ATTRS)
+        self.exports.extend(self.POOL_ATTRS + ("input_sample_shape",))
         self._no_output = False
 
     def init_unpickled(self):
@@ -223,20 +226,10 @@ class Pooling(PoolingBase, nn_units.Forward, TriviallyDistributable):
     def cuda_run(self):
         self._gpu_run()
 
-    def numpy_run(self):
-        self.input.map_read()
-        self.output.map_invalidate()
-        for batch, ch, out_x, out_y in product(*map(range, (
-                self.input_batch_size, self.n_channels) + self.out_sxy)):
-            x1 = out_x * self.sliding[0]
-            y1 = out_y * self.sliding[1]
-            test_idx = x1 + self.kx
-            x2 = test_idx if test_idx <= self.sx else self.sx
-            test_idx = y1 + self.ky
-            y2 = test_idx if test_idx <= self.sy else self.sy
-            cut = self.input.mem[batch, y1:y2, x1:x2, ch]
-            val = self.numpy_run_cut(cut, (batch, y1, x1, ch, out_y, out_x))
-            self.output.mem[batch, out_y, out_x, ch] = val
+    def numpy_init(self):
+        self._windows_ = PoolingWindows(
+            self.input.shape, self.kx, self.ky, self.sliding, self.out_sx,
+            self.out_sy, self.input.dtype, self.NUMPY_FILL)
 
     def run(self):
         t1 = time.time()
@@ -295,20 +288,29 @@ class OffsetPooling(Pooling):
         super(OffsetPooling, self).cuda_run()
 
     def numpy_run(self):
+        self.input.map_read()
+        self.output.map_invalidate()
         self.input_offset.map_invalidate()
-        super(OffsetPooling, self).numpy_run()
-
-    def numpy_run_cut(self, cut, coords):
-        batch, y1, x1, ch, out_y, out_x = coords
-        cut_index = self.numpy_run_cut_offset(
-            cut, numpy.ravel_multi_index((batch, out_y, out_x, ch),
-                                         self.output.shape))
-        i, j = numpy.unravel_index(cut_index, cut.shape)
-        idx = numpy.ravel_multi_index((batch, y1 + i, x1 + j, ch),
-                                      self.input.shape)
-        val = numpy.ravel(self.input.mem)[idx]
-        self.input_offset.mem[batch, out_y, out_x, ch] = idx
-        return val
+        minibatch_shards().map(self._numpy_run_shard, self.input.shape[0],
+                               self.input.sample_size)
+
+    def _numpy_run_shard(self, start, stop):
+        index = self.numpy_select(
+            self._windows_.cuts(self.input.mem[start:stop], start), start)
+        offsets = self.input_offset.mem[start:stop]
+        self._windows_.offsets(index, offsets, start)
+        numpy.take(self.input.mem, offsets, out=self.output.mem[start:stop])
+
+    def numpy_select(self, cuts, start):
+        """Returns the indices of the elements to pass through.
+
+        Arguments:
+            cuts: pooling windows as returned by
+                  :meth:`veles.znicz.numpy_kernels.PoolingWindows.cuts()`,
+                  may be overwritten.
+            start: index of the first sample of cuts in the minibatch.
+        """
+        raise NotImplementedError()
 
 
 class MaxPoolingBase(OffsetPooling):
@@ -334,10 +336,14 @@ class MaxPooling(MaxPoolingBase):
     """MaxPooling forward propagation.
     """
 
+    __id__ = "63890b65-e66e-43a4-b616-ebbd56c36417"
+
     MAPPING = {"max_pooling"}
 
-    def numpy_run_cut_offset(self, cut, index):
-        return cut.argmax()
+    NUMPY_FILL = -numpy.inf
+
+    def numpy_select(self, cuts, start):
+        return cuts.argmax(axis=-1)
 
 
 class MaxAbsPooling(MaxPoolingBase):
@@ -361,8 +367,8 @@ class MaxAbsPooling(MaxPoolingBase):
         super(MaxAbsPooling, self).__init__(workflow, **kwargs)
         self.sources_["pooling"] = {"ABS_VALUES": 1}
 
-    def numpy_run_cut_offset(self, cut, index):
-        return numpy.abs(cut).argmax()
+    def numpy_select(self, cuts, start):
+        return numpy.abs(cuts, cuts).argmax(axis=-1)
 
 
 class StochasticPoolingBase(OffsetPooling):
@@ -414,6 +420,7 @@ class StochasticPoolingBase(OffsetPooling):
 
     def numpy_run(self):
         self.uniform.numpy_fill(self.output_size << 1)
+        self.uniform.output.map_read()
         super(StochasticPoolingBase, self).numpy_run()
 
     def ocl_run(self):
@@ -430,13 +437,11 @@ class StochasticPoolingBase(OffsetPooling):
         self.uniform.cuda_fill(self.output_size << 1)
         super(StochasticPoolingBase, self).cuda_run()
 
-    def calculate_position_cpu(self, index, vsum):
-        rnd = self.uniform.output.mem.view(dtype=numpy.uint16)[index]
-        return rnd * vsum / 65536
-
-    def calculate_random_index_cpu(self, cut, index):
-        rnd = self.uniform.output.mem.view(dtype=numpy.uint16)[index]
-        return int(rnd * cut.size >> 16)
+    def numpy_select(self, cuts, start):
+        rand = self.uniform.output.mem.view(dtype=numpy.uint16)[
+            :self.output_size].reshape(self.output_shape)
+        return self._windows_.stochastic_select(
+            self.numpy_positive_values(cuts), rand[start:start + len(cuts)])
 
 
 class StochasticPooling(StochasticPoolingBase):
@@ -445,18 +450,9 @@ class StochasticPooling(StochasticPoolingBase):
 
     MAPPING = {"stochastic_pooling"}
 
-    def numpy_run_cut_offset(self, cut, index):
-        vsum = numpy.sum(cut[cut > 0])
-        if vsum == 0:
-            return self.calculate_random_index_cpu(cut, index)
-        position = self.calculate_position_cpu(index, vsum)
-        vsum = 0
-        for i in range(cut.size):
-            val = cut.ravel()[i]
-            if val > 0:
-                vsum += val
-            if position <= vsum:
-                return i
+    @staticmethod
+    def numpy_positive_values(cuts):
+        return numpy.maximum(cuts, 0, out=cuts)
 
 
 class StochasticAbsPooling(StochasticPoolingBase):
@@ -469,17 +465,9 @@ class StochasticAbsPooling(StochasticPoolingBase):
         super(StochasticAbsPooling, self).__init__(workflow, **kwargs)
         self.sources_["pooling"] = {"ABS_VALUES": 1}
 
-    def numpy_run_cut_offset(self, cut, index):
-        vsum = numpy.sum(numpy.abs(cut))
-        if vsum == 0:
-            return self.calculate_random_index_cpu(cut, index)
-        position = self.calculate_position_cpu(index, vsum)
-        vsum = 0
-        for i in range(cut.size):
-            val = cut.ravel()[i]
-            vsum += abs(val)
-            if position <= vsum:
-                return i
+    @staticmethod
+    def numpy_positive_values(cuts):
+        return numpy.abs(cuts, cuts)
 
 
 class StochasticPoolingDepooling(StochasticPooling):
@@ -530,6 +518,8 @@ class AvgPooling(Pooling):
 
     """
 
+    __id__ = "940ff6f4-7662-4f0c-8b72-e20bce11a434"
+
     MAPPING = {"avg_pooling"}
 
     def init_unpickled(self):
@@ -544,5 +534,13 @@ class AvgPooling(Pooling):
         super(AvgPooling, self).cuda_init()
         self.set_args(self.input, self.output)
 
-    def numpy_run_cut(self, cut, coords):
-        return numpy.sum(cut) / cut.size
+    def numpy_run(self):
+        self.input.map_read()
+        self.output.map_invalidate()
+        minibatch_shards().map(self._numpy_run_shard, self.input.shape[0],
+                               self.input.sample_size)
+
+    def _numpy_run_shard(self, start, stop):
+        output = self.output.mem[start:stop]
+        self._windows_.sum(self.input.mem[start:stop], output, start)
+        output /= self._windows_.counts
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Int8 post-training quantization of the forward workflows. The weights of
+each neuron (convolutional kernel) are quantized symmetrically with their
+own scale, while the input of each layer is quantized with a single scale
+derived from the activation ranges collected on a sample of minibatches
+(calibration). The quantized units export int8 weights together with the
+scales, so that the packages are 4 times smaller, and compute the weighted
+sums from the integer values.
+
+libZnicz's All2All and Conv multiply the int8 values with the integer
+kernel and are faster than with float weights, see its all2all_benchmark.
+The CPU (numpy) backend has no integer matrix multiplication and emulates
+it with the float one, so there int8 only makes the model smaller and
+reproduces the quantization error of the native code, it is not faster.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from __future__ import division
+import numpy
+
+
+INT8_LIMIT = 127
+
+
+def quantize_weights(weights, transposed=False):
+    """Quantizes the weights to int8 with a separate scale for each neuron.
+
+    :param weights: the weights matrix, one row per neuron (one column if \
+        transposed is True).
+    :return: the tuple (int8 matrix with one row per neuron, float32 scales).
+    """
+    matrix = weights.reshape(weights.shape[0],
+                             weights.size // weights.shape[0])
+    if transposed:
+        matrix = matrix.transpose()
+    scales = numpy.abs(matrix).max(axis=1).astype(numpy.float32)
+    scales /= INT8_LIMIT
+    scales[scales == 0] = 1
+    quantized = numpy.rint(matrix / scales[:, numpy.newaxis])
+    numpy.clip(quantized, -INT8_LIMIT, INT8_LIMIT, quantized)
+    return quantized.astype(numpy.int8), scales
+
+
+def input_scale(value_range):
+    """Returns the quantization scale of the values in the given
+    (min, max) range.
+    """
+    limit = max(abs(value_range[0]), abs(value_range[1]))
+    return float(limit / INT8_LIMIT) if limit > 0 else 1.0
+
+
+class Int8Weights(object):
+    """Int8 weights of a quantized unit.
+
+    Attributes:
+        weights: int8 matrix, one row per neuron.
+        scales: float32 per-neuron scales of weights.
+        input_scale: the scale the input is quantized with.
+    """
+
+    def __init__(self, weights, transposed, input_range):
+        self.weights, self.scales = quantize_weights(weights, transposed)
+        self.input_scale = input_scale(input_range)
+        self.gemm_weights_ = None
+        self.output_scales_ = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["gemm_weights_"] = state["output_scales_"] = None
+        return state
+
+    def dot(self, inputs, out, buffer):
+        """Calculates the weighted sums of the int8 quantized inputs
+        and writes the dequantized result to out.
+
+        The integer values are multiplied in the floating point type of out,
+        which is exact while the sums stay below 2^24 in float32. This gives
+        the same results as the integer kernel of libZnicz, but not its
+        speed: numpy has no fast integer matrix multiplication.
+
+        :param inputs: the input matrix, one row per sample.
+        :param out: the output matrix of shape (samples, neurons).
+        :param buffer: scratch matrix of inputs' shape and out's dtype.
+        """
+        if self.gemm_weights_ is None or \
+                self.gemm_weights_.dtype != out.dtype:
+            self.gemm_weights_ = numpy.ascontiguousarray(
+                self.weights.transpose(), dtype=out.dtype)
+            self.output_scales_ = (
+                self.scales * self.input_scale).astype(out.dtype)
+        numpy.multiply(inputs, 1 / self.input_scale, buffer)
+        numpy.rint(buffer, buffer)
+        numpy.clip(buffer, -INT8_LIMIT, INT8_LIMIT, buffer)
+        numpy.dot(buffer, self.gemm_weights_, out)
+        out *= self.output_scales_
+
+    def package_export(self):
+        return {"int8_weights": self.weights, "weights_scales": self.scales,
+                "input_scale": self.input_scale}
+
+
+def calibrate(loader, forwards, minibatches=10):
+    """Runs the initialized forward units on the minibatches from loader
+    and collects the ranges of their inputs.
+
+    :param loader: the loader which feeds the first unit.
+    :param forwards: the forward units in the order of execution.
+    :param minibatches: the maximal number of minibatches to run.
+    :return: dict {unit: (min, max)} for the units which can be quantized.
+    """
+    ranges = {}
+    for _ in range(minibatches):
+        loader.run()
+        for unit in forwards:
+            unit.run()
+            if not unit.QUANTIZABLE:
+                continue
+            unit.input.map_read()
+            data = unit.input.mem[:loader.minibatch_size]
+            low, high = ranges.get(unit, (numpy.inf, -numpy.inf))
+            ranges[unit] = (min(low, float(data.min())),
+                            max(high, float(data.max())))
+        if loader.epoch_ended:
+            break
+    return ranges
+
+
+def quantize(ranges):
+    """Switches the units to int8 weights.
+
+    :param ranges: the result of :func:`calibrate`.
+    """
+    for unit, value_range in ranges.items():
+        unit.quantize(value_range)
@@ -67,6 +67,10 @@ class GDRProp(GradientDescent):
         self.weight_lrs.initialize(self.device)
         self.bias_lrs.initialize(self.device)
 
+    def numpy_init(self):
+        # RProp has its own solver, it is not fused
+        pass
+
     def numpy_weights_update(self):
         self.input.map_read()
         self.err_output.map_read()
@@ -55,6 +55,7 @@ from veles.znicz.conv import ConvolutionalBase
 from veles.znicz.decision import DecisionsRegistry
 from veles.znicz.diff_stats import DiffStats
 from veles.znicz.evaluator import EvaluatorsRegistry
+from veles.znicz.graph_optimizer import optimize_layers
 # Important: do not remove unused imports! It will prevent MatchingObject
 # metaclass from adding the mapping in the corresponding modules
 from veles.znicz import gd, gd_conv, gd_pooling  # pylint: disable=W0611
@@ -210,7 +211,8 @@ class StandardWorkflow(StandardWorkflowBase):
     def extract_forward_workflow(self, loader_unit_factory=None,
                                  loader_name=None, loader_config=None,
                                  result_unit_factory=None,
-                                 result_unit_config=None, cyclic=True):
+                                 result_unit_config=None, cyclic=True,
+                                 optimize=False):
         """
         Generates a separate forward propagation workflow from this one,
         taking the trained weights, settings, etc.
@@ -229,21 +231,30 @@ class StandardWorkflow(StandardWorkflowBase):
         :param cyclic: True if the loader decides whether to stop \
             the workflow; otherwise, False => the extracted workflow \
             is going to do a single iteration.
+        :param optimize: drop the units which are identities in forward \
+            mode, fold the activation units into the preceding kernels and \
+            make the cutters zero-copy where possible (see \
+            :mod:`veles.znicz.graph_optimizer`).
         :return: veles.znicz.standard_workflow.StandardWorkflowBase instance.
         """
         self.debug("Constructing the new workflow...")
+        layers = self.layers
+        sources = range(len(self.forwards))
+        if optimize:
+            layers, sources, report = optimize_layers(layers, self.forwards)
+            self.info("Optimized the forward workflow: %s", report)
         if loader_unit_factory is not None:
             assert loader_name is None and loader_config is None
             wf = StandardWorkflowBase(self.workflow,
                                       name="Forwards@%s" % self.name,
                                       loader_factory=loader_unit_factory,
-                                      layers=self.layers)
+                                      layers=layers)
         else:
             wf = StandardWorkflowBase(self.workflow,
                                       name="Forwards@%s" % self.name,
                                       loader_name=loader_name,
                                       loader_config=loader_config,
-                                      layers=self.layers)
+                                      layers=layers)
         if cyclic:
             start_unit = wf.link_repeater(wf.start_point)
         else:
@@ -279,10 +290,12 @@ class StandardWorkflow(StandardWorkflowBase):
         else:
             wf.link_end_point(last_unit)
         self.debug("Importing forwards...")
-        for fwd_exp, fwd_imp in zip(self.forwards, wf.forwards):
-            fwd_imp.forward_mode = True
+        for index, fwd_imp in zip(sources, wf.forwards):
+            fwd_exp = self.forwards[index]
+            # apply_data_from_master() does nothing in forward mode
             fwd_imp.apply_data_from_master(
                 fwd_exp.generate_data_for_slave(None))
+            fwd_imp.forward_mode = True
         return wf
 
     @StandardWorkflowBase.check_forward_units
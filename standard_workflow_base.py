@@ -47,8 +47,10 @@ from veles.znicz import activation  # pylint: disable=W0611
 from veles.znicz.all2all import All2AllSoftmax
 from veles.znicz import dropout  # pylint: disable=W0611
 from veles.znicz.dropout import DropoutForward
+from veles.znicz import mmap_package
 from veles.znicz import nn_units
 from veles.znicz import normalization  # pylint: disable=W0611
+from veles.znicz import quantization
 from veles.znicz import weights_zerofilling
 from veles.loader.base import UserLoaderRegistry, LoaderMSEMixin
 
@@ -393,6 +395,58 @@ class StandardWorkflowBase(nn_units.NNWorkflow):
         self.end_point.link_from(*parents)
         return self.end_point
 
+    def quantize_forwards(self, minibatches=10):
+        """
+        Switches the forward units which support it to int8 weights (see
+        :mod:`veles.znicz.quantization`). The input ranges are calibrated
+        by running the forward units on the next minibatches of the loader,
+        so the workflow must be initialized. It is intended for the forward
+        workflows returned by
+        :meth:`veles.znicz.standard_workflow.StandardWorkflow.\
+extract_forward_workflow`; package_export() writes int8 weights of the
+        quantized units afterwards.
+        Returns the number of quantized units.
+
+        Arguments:
+            minibatches: the maximal number of minibatches to calibrate on.
+        """
+        ranges = quantization.calibrate(
+            self.loader, self.forwards, minibatches)
+        quantization.quantize(ranges)
+        self.info("Quantized %d units to int8 after calibration",
+                  len(ranges))
+        return len(ranges)
+
+    def export_mmap_package(self, path, layers=None):
+        """
+        Writes the forward units to the memory-mapped package directory
+        (see :mod:`veles.znicz.mmap_package`).
+
+        Arguments:
+            path: the package directory.
+            layers: the optional "layers" configuration to store.
+        """
+        mmap_package.export_package(path, self.forwards, layers)
+        self.info("Exported %d forward units to %s",
+                  len(self.forwards), path)
+
+    def import_mmap_package(self, path):
+        """
+        Maps the read-only weights and biases of the forward units from
+        the package directory written by :meth:`export_mmap_package`,
+        without reading them into memory. Must be called before the
+        workflow is initialized; the mapped arrays are copied if the units
+        pack their parameters into a shared store.
+        Returns the contents of the package.
+
+        Arguments:
+            path: the package directory.
+        """
+        contents = mmap_package.load_package(path, self.forwards)
+        self.info("Mapped %d forward units from %s",
+                  len(self.forwards), path)
+        return contents
+
     def create_workflow(self):
         self.link_repeater(self.start_point)
 
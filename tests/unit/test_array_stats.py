@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for the local inference server.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import numpy
+import unittest
+
+from veles.znicz.array_stats import compute_stats, is_finite
+
+
+class TestArrayStats(unittest.TestCase):
+    def setUp(self):
+        self.array = numpy.random.RandomState(11).rand(1000, 300).astype(
+            numpy.float32) - 0.5
+
+    def assertStats(self, stats, array):
+        self.assertAlmostEqual(stats.min, array.min(), 6)
+        self.assertAlmostEqual(stats.max, array.max(), 6)
+        self.assertAlmostEqual(stats.mean, array.mean(dtype=numpy.float64),
+                               6)
+        self.assertAlmostEqual(stats.std, array.std(dtype=numpy.float64), 5)
+
+    def test_finite(self):
+        stats = compute_stats(self.array, chunk_size=1000)
+        self.assertEqual(stats.count, self.array.size)
+        self.assertTrue(stats.is_finite)
+        self.assertFalse(stats.sampled)
+        self.assertStats(stats, self.array)
+        self.assertStats(compute_stats(self.array[:, ::3]),
+                         self.array[:, ::3])
+
+    def test_invalid(self):
+        self.array[1, 2] = numpy.nan
+        self.array[500, 0] = numpy.inf
+        self.array[999, 299] = -numpy.inf
+        stats = compute_stats(self.array)
+        self.assertEqual((stats.nans, stats.infs), (1, 2))
+        self.assertFalse(stats.is_finite)
+        self.assertStats(stats, self.array[numpy.isfinite(self.array)])
+        stats = compute_stats(numpy.full(10, numpy.nan))
+        self.assertEqual(stats.nans, 10)
+        self.assertTrue(numpy.isnan(stats.mean))
+
+    def test_types(self):
+        stats = compute_stats(numpy.arange(10))
+        self.assertEqual((stats.min, stats.max, stats.mean), (0, 9, 4.5))
+        stats = compute_stats(numpy.array([1 + 2j, 3 - 4j]))
+        self.assertEqual((stats.min, stats.max, stats.mean), (-4, 3, 0.5))
+        self.assertEqual(compute_stats(numpy.zeros(0)).count, 0)
+        array = numpy.tile(numpy.array([-300, 300], numpy.float16), 500)
+        stats = compute_stats(array)
+        self.assertTrue(stats.is_finite)
+        self.assertEqual((stats.mean, stats.std), (0, 300))
+
+    def test_sampled(self):
+        stats = compute_stats(self.array, sample_size=3000)
+        self.assertTrue(stats.sampled)
+        self.assertEqual(stats.count, 3000)
+        self.assertLess(abs(stats.mean - self.array.mean()), 0.05)
+        transposed = self.array.T
+        stats = compute_stats(transposed, sample_size=3000)
+        self.assertEqual(stats.count, 3000)
+        self.assertStats(stats, transposed.reshape(-1)[::100])
+
+    def test_is_finite(self):
+        self.assertTrue(is_finite(self.array))
+        self.assertTrue(is_finite(numpy.arange(10)))
+        self.assertTrue(is_finite(numpy.full(10, 1e308)))
+        self.assertTrue(is_finite(numpy.full(10, 6e4, numpy.float16)))
+        self.array[500, 0] = numpy.nan
+        self.assertFalse(is_finite(self.array))
+        self.assertFalse(is_finite(numpy.array([1, 1j * numpy.inf])))
+
+
+if __name__ == "__main__":
+    unittest.main()
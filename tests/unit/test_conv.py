@@ -466,6 +466,27 @@ class TestConvWithPadding(TestConvBase):
         max_diff = numpy.fabs(ocl_output.ravel() - numpy_output.ravel()).max()
         self.assertLess(max_diff, 1E-06, "Result differs by %.2e" % max_diff)
 
+    def test_compare_ocl_vs_cpu_subblocks(self):
+        """Run test with the batch which does not fit into a single unpack
+        block to compare results of CPU and OpenCL versions of algorithm.
+        """
+        input_shape = (7, 19, 23, 5)
+        weights_shape = (4, 5, 3, 5)
+        input_data = prng.get().rand(*input_shape)
+        weights = prng.get().rand(*weights_shape)
+        bias = prng.get().rand(weights_shape[0])
+
+        unit = PatchedConv(self.parent, n_kernels=weights_shape[0],
+                           ky=weights_shape[1], kx=weights_shape[2],
+                           sliding=(3, 2), padding=(2, 1, 0, 3),
+                           unpack_size=3)
+        ocl_output = self._run_test(unit, self.device, input_data,
+                                    weights, bias).copy()
+        numpy_output = self._run_test(unit, NumpyDevice(), input_data, weights,
+                                      bias)
+        max_diff = numpy.fabs(ocl_output.ravel() - numpy_output.ravel()).max()
+        self.assertLess(max_diff, 1E-06, "Result differs by %.2e" % max_diff)
+
 
 @assign_backend("ocl")
 class OpenCLTestConvNoPadding(TestConvNoPadding):
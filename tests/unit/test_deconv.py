@@ -40,6 +40,7 @@ import os
 from veles.backends import NumpyDevice
 
 from veles.config import root
+from veles.dummy import DummyUnit
 import veles.memory as memory
 import veles.opencl_types as opencl_types
 import veles.prng as rnd
@@ -73,12 +74,18 @@ class TestDeconv(AcceleratedTest, GDNumDiff):
             numpy.float16: 1.5e-1}[self.dtype]
 
     def test_fixed(self):
+        self._test_fixed(self.device)
+
+    def test_fixed_cpu(self):
+        self._test_fixed(NumpyDevice())
+
+    def _test_fixed(self, device):
         inp = numpy.ones([1, 4, 4, 1], dtype=self.dtype)
         forward = conv.Conv(self.parent, kx=3, ky=3, n_kernels=1,
                             padding=(0, 0, 0, 0), sliding=(1, 1),
                             include_bias=False)
         forward.input = Array(inp)
-        forward.initialize(self.device)
+        forward.initialize(device)
         forward.weights.map_invalidate()
         forward.weights.mem[:] = 1.0
         forward.run()
@@ -88,12 +95,67 @@ class TestDeconv(AcceleratedTest, GDNumDiff):
         de.input = forward.output
         de.output_shape_source = forward.input
         de.weights = forward.weights
-        de.initialize(self.device)
+        de.initialize(device)
         de.run()
         de.output.map_read()
         nz = numpy.count_nonzero(de.output.mem - inp * 9)
         self.assertEqual(nz, 0)
 
+    def test_compare_device_vs_cpu(self):
+        """Runs Deconv and GDDeconv with the batch which does not fit into
+        a single unpack block on both device and CPU.
+        """
+        # the second padding is unsafe, so hits are counted
+        for padding in ((2, 2, 2, 2), (1, 3, 3, 1)):
+            for weights_transposed in (False, True):
+                gold = self._run_subblocks(
+                    self.device, padding, weights_transposed)
+                results = self._run_subblocks(
+                    NumpyDevice(), padding, weights_transposed)
+                for name, g, r in zip(("output", "err_input", "weights"),
+                                      gold, results):
+                    max_diff = numpy.fabs(g - r).max()
+                    self.assertLess(max_diff, self.precision_threshold,
+                                    "%s differs by %.2e" % (name, max_diff))
+
+    def _run_subblocks(self, device, padding, weights_transposed):
+        prng = numpy.random.RandomState(13)
+        sx = 1 + (12 + padding[0] + padding[2] - 4) // 2
+        sy = 1 + (12 + padding[1] + padding[3] - 4) // 2
+        inp = prng.rand(5, sy, sx, 4).astype(self.dtype)
+        weights = prng.rand(4, 48).astype(self.dtype)
+        if weights_transposed:
+            weights = weights.transpose().copy()
+        err_output = prng.rand(5, 12, 12, 3).astype(self.dtype)
+
+        de = Deconv(self.parent, unsafe_padding=True,
+                    weights_transposed=weights_transposed)
+        de.link_conv_attrs(DummyUnit(n_kernels=4, kx=4, ky=4, sliding=(2, 2),
+                                     padding=padding, unpack_size=2))
+        de.input = Array(inp)
+        de.weights = Array(weights)
+        de.output_shape_source = Array(numpy.zeros_like(err_output))
+        de.initialize(device)
+        self.assertEqual(bool(de.hits), padding != (2, 2, 2, 2))
+        de.run()
+        de.output.map_read()
+
+        gd = GDDeconv(self.parent, learning_rate=1.0, weights_decay=0.0,
+                      gradient_moment=0.9,
+                      weights_transposed=weights_transposed)
+        gd.link_conv_attrs(de)
+        gd.input = de.input
+        gd.weights = de.weights
+        gd.err_output = Array(err_output)
+        if de.hits:
+            gd.hits = de.hits
+        gd.initialize(device)
+        gd.run()
+        gd.err_input.map_read()
+        gd.weights.map_read()
+        return (de.output.mem.copy(), gd.err_input.mem.copy(),
+                gd.weights.mem.copy())
+
     def test_compute_padding(self):
         sx = 128
         for kx, slide in ((2, 1), (3, 1), (4, 1), (4, 2), (5, 1),
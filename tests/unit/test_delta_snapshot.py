@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for the delta snapshots.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import numpy
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from veles.error import BadFormatError
+from veles.znicz import delta_snapshot
+
+
+class TestDeltaSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix="test-delta-snapshot-")
+        rand = numpy.random.RandomState(3)
+        self.state = {"data": rand.rand(50000), "weights": rand.rand(20000),
+                      "epoch": 0, "small": numpy.arange(10)}
+        self.state["linked"] = self.state["weights"]
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def file_name(self, index):
+        return os.path.join(self.path, "snapshot_%d%s" % (
+            index, delta_snapshot.SUFFIX))
+
+    def update(self):
+        self.state["weights"] = self.state["weights"] + 1
+        self.state["linked"] = self.state["weights"]
+        self.state["epoch"] += 1
+
+    def test_chain(self):
+        chain = delta_snapshot.DeltaChain(rebase_interval=2,
+                                          min_array_size=1024)
+        written = []
+        history = []
+        for index in range(5):
+            written.append(chain.write(self.state, self.file_name(index)))
+            history.append(self.state["weights"])
+            self.update()
+        weights_size = self.state["weights"].nbytes
+        self.assertEqual(written[0], (True, 2, weights_size +
+                                      self.state["data"].nbytes))
+        self.assertEqual(written[1], (False, 1, weights_size))
+        self.assertEqual(written[2], (False, 1, weights_size))
+        self.assertTrue(written[3][0])
+        self.assertLess(os.path.getsize(self.file_name(1)),
+                        os.path.getsize(self.file_name(0)) // 2)
+        for index, weights in enumerate(history):
+            state = delta_snapshot.load(self.file_name(index))
+            self.assertEqual(state["epoch"], index)
+            self.assertEqual(state["weights"].tolist(), weights.tolist())
+            self.assertIs(state["linked"], state["weights"])
+            self.assertEqual(state["data"].tolist(),
+                             self.state["data"].tolist())
+            self.assertEqual(state["small"].tolist(), list(range(10)))
+
+    def test_prepare(self):
+        chain = delta_snapshot.DeltaChain(min_array_size=1024)
+        self.state["bias"] = numpy.arange(10.0)
+        expected = self.state["weights"].tolist()
+        first = chain.prepare(self.state, self.file_name(0), copy=True)
+        self.state["weights"][:] = 0
+        self.state["bias"][:] = 0
+        self.state["epoch"] = 1
+        # the snapshots are saved later, e.g. on another thread
+        second = chain.prepare(self.state, self.file_name(1), copy=True)
+        self.state["weights"][:] = 1
+        first.save()
+        second.save()
+        self.assertTrue(first.is_base)
+        self.assertEqual(len(first.arrays), 2)
+        self.assertFalse(second.is_base)
+        self.assertEqual(list(second.arrays), [delta_snapshot.digest(
+            numpy.zeros_like(self.state["weights"]))])
+        state = delta_snapshot.load(self.file_name(0))
+        self.assertEqual(state["weights"].tolist(), expected)
+        self.assertEqual(state["bias"].tolist(), list(range(10)))
+        self.assertEqual(state["epoch"], 0)
+        state = delta_snapshot.load(self.file_name(1))
+        self.assertFalse(state["weights"].any())
+        self.assertFalse(state["bias"].any())
+        self.assertEqual(state["epoch"], 1)
+        snapshot = chain.prepare(self.state, self.file_name(2))
+        self.assertTrue(any(array is self.state["data"]
+                            for array in snapshot.references))
+
+    def test_missing_parent(self):
+        chain = delta_snapshot.DeltaChain(min_array_size=1024)
+        chain.write(self.state, self.file_name(0))
+        self.update()
+        chain.write(self.state, self.file_name(1))
+        os.remove(self.file_name(0))
+        self.assertRaises(IOError, delta_snapshot.load, self.file_name(1))
+        with open(self.file_name(0), "wb") as fout:
+            fout.write(b"garbage")
+        self.assertRaises(BadFormatError, delta_snapshot.load,
+                          self.file_name(0))
+        self.assertRaises(BadFormatError, delta_snapshot.load,
+                          self.file_name(1))
+
+    def test_same_file_name(self):
+        chain = delta_snapshot.DeltaChain(min_array_size=1024)
+        self.assertTrue(chain.write(self.state, self.file_name(0))[0])
+        self.update()
+        self.assertFalse(chain.write(self.state, self.file_name(1))[0])
+        self.update()
+        self.assertTrue(chain.write(self.state, self.file_name(1))[0])
+        state = delta_snapshot.load(self.file_name(1))
+        self.assertEqual(state["epoch"], 2)
+        self.assertEqual(state["weights"].tolist(),
+                         self.state["weights"].tolist())
+
+    def test_cycle(self):
+        chain = delta_snapshot.DeltaChain(min_array_size=1024)
+        chain.write(self.state, self.file_name(0))
+        self.update()
+        chain.write(self.state, self.file_name(1))
+        # make the delta its own parent
+        with open(self.file_name(1), "rb") as fin:
+            header = pickle.load(fin)
+            rest = fin.read()
+        header["parent"] = os.path.basename(self.file_name(1))
+        with open(self.file_name(1), "wb") as fout:
+            pickle.dump(header, fout)
+            fout.write(rest)
+        self.assertRaises(BadFormatError, delta_snapshot.load,
+                          self.file_name(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
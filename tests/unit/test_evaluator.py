@@ -35,6 +35,7 @@ under the License.
 
 import numpy
 
+from veles.backends import NumpyDevice
 from veles.config import root
 from veles.memory import Array
 from veles.normalization import NoneNormalizer
@@ -79,6 +80,40 @@ class TestEvaluator(AcceleratedTest):
         self.info("Difference is %.12f", max_diff)
         self.assertLess(max_diff, 1.0e-4)
 
+    def test_softmax_device_vs_cpu(self):
+        batch_size = 40
+        n_classes = 10
+
+        prng = numpy.random.RandomState(5)
+        output = prng.rand(batch_size, n_classes).astype(self.dtype)
+        output /= output.sum(axis=1)[:, None]
+        max_idx = output.argmax(axis=1).astype(numpy.int32)
+        labels = prng.randint(-1, n_classes, batch_size).astype(numpy.int32)
+
+        results = []
+        for device in (self.device, NumpyDevice()):
+            ev = evaluator.EvaluatorSoftmax(self.parent)
+            ev.output = Array(output.copy())
+            ev.labels = Array(labels.copy())
+            ev.max_idx = Array(max_idx.copy())
+            ev.batch_size = batch_size - 7
+            ev.initialize(device=device)
+            ev.err_output.map_invalidate()
+            ev.err_output.mem[:] = 1.0e30
+            for _ in range(2):
+                ev.run()
+            for vec in (ev.err_output, ev.n_err, ev.confusion_matrix,
+                        ev.max_err_output_sum):
+                vec.map_read()
+            results.append((ev.err_output.mem.copy(), ev.n_err.mem.copy(),
+                            ev.confusion_matrix.mem.copy(),
+                            ev.max_err_output_sum.mem.copy()))
+        gold, cpu = results
+        self.assertLess(numpy.fabs(gold[0] - cpu[0]).max(), 1.0e-6)
+        self.assertEqual(gold[1].tolist(), cpu[1].tolist())
+        self.assertEqual(gold[2].tolist(), cpu[2].tolist())
+        self.assertAlmostEqual(gold[3][0], cpu[3][0], places=5)
+
     def test_softmax(self):
         batch_size = 25
         n_classes = 75
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import logging
+import numpy
+import unittest
+
+from veles.backends import NumpyDevice
+from veles.config import root
+from veles.dummy import DummyWorkflow
+from veles.memory import Array
+from veles.znicz.gd import GradientDescent
+
+
+class TestFusedOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.fused_gd = root.common.engine.__content__.get("fused_gd", False)
+
+    def tearDown(self):
+        root.common.engine.fused_gd = self.fused_gd
+
+    def _create_gd(self, workflow, rand, **kwargs):
+        gd = GradientDescent(workflow, **kwargs)
+        for name, shape in (("input", (5, 8)), ("output", (5, 3)),
+                            ("err_output", (5, 3)), ("weights", (3, 8)),
+                            ("bias", (3,))):
+            array = Array()
+            array.mem = rand.rand(*shape) - 0.5
+            setattr(gd, name, array)
+        gd.initialize(device=NumpyDevice())
+        return gd
+
+    def _train(self, fused):
+        root.common.engine.fused_gd = fused
+        workflow = DummyWorkflow()
+        rand = numpy.random.RandomState(17)
+        gds = [self._create_gd(workflow, rand, **kwargs) for kwargs in (
+            {"gradient_moment": 0.9, "weights_decay": 0.01},
+            {"gradient_moment": 0.5, "variant_moment_gradient": False,
+             "weights_decay": 0.02, "l1_vs_l2": 0.3},
+            {"variant_gradient": False, "gradient_moment": 0.7},
+            {"gradient_moment": 0.9, "solvers": {"adagrad"}})]
+        for step in range(3):
+            for gd in gds:
+                gd.numpy_run()
+            for gd in gds:
+                gd.learning_rate *= 0.5
+        return gds
+
+    def test_same_as_numpy_update(self):
+        fused = self._train(True)
+        optimizer = fused[0].workflow.fused_optimizer_
+        self.assertEqual(optimizer.units, tuple(fused))
+        for gd in fused:
+            self.assertIs(gd.weights.mem.base, gd.bias.mem.base)
+        for gd, other in zip(fused, self._train(False)):
+            for name in ("weights", "bias", "gradient_weights_with_moment",
+                         "gradient_bias_with_moment"):
+                self.assertTrue(numpy.allclose(
+                    getattr(gd, name).mem, getattr(other, name).mem,
+                    rtol=0, atol=1e-12), name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
@@ -455,6 +455,49 @@ class TestGDConv(AcceleratedTest, GDNumDiff):
                               err_input, weights_derivative, bias_derivative,
                               self.info, self.assertLess, mean=False)
 
+    def test_compare_gpu_vs_cpu_subblocks(self):
+        dtype = opencl_types.dtypes[root.common.engine.precision_type]
+        inp = numpy.zeros([5, 9, 7, 3], dtype=dtype)
+        prng.get().fill(inp)
+        weights = numpy.zeros([4, 4 * 3 * 3], dtype=dtype)
+        prng.get().fill(weights)
+        bias = numpy.zeros(4, dtype=dtype)
+        prng.get().fill(bias)
+        err_output = numpy.zeros([5, 9, 3, 4], dtype=dtype)
+        prng.get().fill(err_output)
+        gpu = self._run_subblocks(self.device, inp, weights, bias, err_output)
+        cpu = self._run_subblocks(NumpyDevice(), inp, weights, bias,
+                                  err_output)
+        for name, a, b in zip(("err_input", "weights", "bias"), gpu, cpu):
+            max_diff = numpy.fabs(a - b).max()
+            self.assertLess(max_diff, self.precision_threshold,
+                            "%s differs by %.2e" % (name, max_diff))
+
+    def _run_subblocks(self, device, inp, weights, bias, err_output):
+        forward = conv.Conv(self.parent, n_kernels=4, kx=3, ky=4,
+                            padding=(1, 2, 0, 1), sliding=(2, 1),
+                            unpack_size=2)
+        forward.input = Array(inp.copy())
+        forward.initialize(device=device)
+        forward.weights.map_invalidate()
+        forward.weights.mem[:] = weights
+        forward.bias.map_invalidate()
+        forward.bias.mem[:] = bias
+
+        c = GradientDescentConv(
+            self.parent, gradient_moment=0, gradient_moment_bias=0,
+            learning_rate=1, weights_decay=0,
+            learning_rate_bias=1, weights_decay_bias=0)
+        c.link_conv_attrs(forward)
+        c.link_attrs(forward, "input", "output", "weights", "bias")
+        c.err_output = Array(err_output.copy())
+        c.initialize(device)
+        c.run()
+        c.err_input.map_read()
+        c.weights.map_read()
+        c.bias.map_read()
+        return c.err_input.mem.copy(), c.weights.mem.copy(), c.bias.mem.copy()
+
 
 @assign_backend("ocl")
 class OpenCLTestGDConv(TestGDConv):
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for the forward workflow graph optimizer.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import numpy
+import unittest
+from zope.interface import implementer
+
+from veles.backends import NumpyDevice
+from veles.dummy import DummyWorkflow
+from veles.loader import FullBatchLoader, IFullBatchLoader, TEST, TRAIN, \
+    VALID
+from veles.memory import Array
+from veles.znicz.activation import ForwardSigmoid, ForwardStrictRELU, \
+    ForwardTanh
+from veles.znicz.all2all import All2All, All2AllSoftmax
+from veles.znicz.conv import Conv
+from veles.znicz.cutter import Cutter
+from veles.znicz.dropout import DropoutForward
+from veles.znicz.graph_optimizer import optimize_layers
+from veles.znicz.standard_workflow import StandardWorkflow
+
+
+@implementer(IFullBatchLoader)
+class RandomLoader(FullBatchLoader):
+    def load_data(self):
+        self.original_data.mem = numpy.random.RandomState(5).rand(
+            20, 12).astype(numpy.float32)
+        self.original_labels[:] = numpy.arange(20, dtype=numpy.int32) % 3
+        self.class_lengths[TEST] = self.class_lengths[VALID] = 0
+        self.class_lengths[TRAIN] = 20
+
+
+class ForwardsWorkflow(StandardWorkflow):
+    def create_workflow(self):
+        self.link_repeater(self.start_point)
+        self.link_loader(self.repeater)
+        self.link_forwards(("input", "minibatch_data"), self.loader)
+        self.link_end_point(self.forwards[-1])
+
+
+class TestGraphOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.parent = DummyWorkflow()
+
+    def test_optimize_layers(self):
+        layers = [
+            {"type": "conv", "->": {"n_kernels": 4, "kx": 3, "ky": 3}},
+            {"type": "activation_str"},
+            {"type": "cutter", "->": {"padding": (0, 0, 0, 0)}},
+            {"type": "cutter", "->": {"padding": (0, 1, 0, 1)}},
+            {"type": "all2all", "->": {"output_sample_shape": 10}},
+            {"type": "dropout", "dropout_ratio": 0.5},
+            {"type": "activation_tanh"},
+            {"type": "activation_sigmoid"},
+            {"type": "softmax", "->": {"output_sample_shape": 2}}]
+        forwards = [
+            Conv(self.parent, n_kernels=4, kx=3, ky=3),
+            ForwardStrictRELU(self.parent),
+            Cutter(self.parent, padding=(0, 0, 0, 0)),
+            Cutter(self.parent, padding=(0, 1, 0, 1)),
+            All2All(self.parent, output_sample_shape=10),
+            DropoutForward(self.parent, dropout_ratio=0.5),
+            ForwardTanh(self.parent),
+            ForwardSigmoid(self.parent),
+            All2AllSoftmax(self.parent, output_sample_shape=2)]
+        result, sources, report = optimize_layers(layers, forwards)
+        self.assertEqual([layer["type"] for layer in result],
+                         ["conv_str", "cutter", "all2all_tanh",
+                          "activation_sigmoid", "softmax"])
+        self.assertEqual(sources, [0, 3, 4, 7, 8])
+        self.assertEqual(result[0]["->"], layers[0]["->"])
+        self.assertTrue(result[1]["->"]["zero_copy"])
+        self.assertNotIn("zero_copy", layers[3]["->"])
+        self.assertEqual(report.identities, 2)
+        self.assertEqual(report.activations, 2)
+        self.assertEqual(report.views, 1)
+
+    @staticmethod
+    def _run_forwards(workflow, data):
+        workflow.loader.minibatch_data.reset(data.copy())
+        for unit in workflow.forwards:
+            unit.initialize(device=NumpyDevice(), forward_mode=True)
+            unit.run()
+        workflow.forwards[-1].output.map_read()
+        return workflow.forwards[-1].output.mem.copy()
+
+    def test_extract_forward_workflow(self):
+        layers = [
+            {"type": "all2all", "->": {"output_sample_shape": 8}},
+            {"type": "activation_tanh"},
+            {"type": "dropout", "dropout_ratio": 0.5},
+            {"type": "softmax", "->": {"output_sample_shape": 3}}]
+
+        def loader_factory(workflow):
+            return RandomLoader(workflow, minibatch_size=5)
+
+        workflow = ForwardsWorkflow(
+            self.parent, layers=layers, loss_function="softmax",
+            loader_factory=loader_factory)
+        data = numpy.random.RandomState(7).rand(5, 12).astype(numpy.float32)
+        expected = self._run_forwards(workflow, data)
+        # the training units do not give their weights in forward mode
+        for unit in workflow.forwards:
+            unit.forward_mode = False
+        extracted = workflow.extract_forward_workflow(
+            loader_unit_factory=loader_factory, cyclic=False, optimize=True)
+        self.assertEqual(len(extracted.forwards), 2)
+        for unit, source in zip(extracted.forwards,
+                                (workflow.forwards[0], workflow.forwards[3])):
+            self.assertTrue(unit.forward_mode)
+            self.assertEqual(unit.weights.mem.tolist(),
+                             source.weights.mem.tolist())
+        actual = self._run_forwards(extracted, data)
+        self.assertLess(numpy.fabs(actual - expected).max(), 1e-6)
+
+    def _run_cutter(self, batch_size, zero_copy):
+        inp = numpy.random.RandomState(3).rand(
+            batch_size, 7, 5, 2).astype(numpy.float32)
+        cutter = Cutter(self.parent, padding=(0, 2, 0, 1),
+                        zero_copy=zero_copy)
+        cutter.input = Array(inp.copy())
+        cutter.initialize(device=NumpyDevice())
+        cutter.run()
+        self.assertEqual(cutter.output.mem.tolist(),
+                         inp[:, 2:6].tolist())
+        return cutter
+
+    def test_zero_copy_cutter(self):
+        cutter = self._run_cutter(1, True)
+        cutter.input.mem[0, 3] = 100
+        self.assertEqual(cutter.output.mem[0, 1].max(), 100)
+        cutter = self._run_cutter(4, True)
+        cutter.input.mem[0, 3] = 100
+        self.assertLess(cutter.output.mem[0, 1].max(), 100)
+        cutter = self._run_cutter(1, False)
+        cutter.input.mem[0, 3] = 100
+        self.assertLess(cutter.output.mem[0, 1].max(), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
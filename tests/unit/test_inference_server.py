@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for the local inference server.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+from multiprocessing import AuthenticationError
+import numpy
+import threading
+import unittest
+
+from veles.backends import NumpyDevice
+from veles.dummy import DummyWorkflow
+from veles.memory import Array
+from veles.znicz.all2all import All2AllSoftmax, All2AllTanh
+from veles.znicz.inference_server import InferenceClient, InferenceServer
+
+
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.rand = numpy.random.RandomState(5)
+        workflow = DummyWorkflow()
+        hidden = All2AllTanh(workflow, output_sample_shape=[12])
+        hidden.input = Array(numpy.zeros((8, 20), numpy.float32))
+        output = All2AllSoftmax(workflow, output_sample_shape=[4])
+        output.link_attrs(hidden, ("input", "output"))
+        self.forwards = [hidden, output]
+        for unit in self.forwards:
+            unit.initialize(device=NumpyDevice())
+
+    def test_infer(self):
+        samples = self.rand.rand(20, 20).astype(numpy.float32)
+        server = InferenceServer(self.forwards)
+        results = server.infer(samples)
+        self.assertEqual(results.shape, (20, 4))
+        expected = server.infer(samples[8:16])
+        self.assertEqual(results[8:16].tolist(), expected.tolist())
+
+    def test_clients(self):
+        samples = self.rand.rand(6, 3, 20).astype(numpy.float32)
+        with InferenceServer(self.forwards, max_latency=0.05) as server:
+            expected = server.infer(samples.reshape(18, 20)).reshape(6, 3, 4)
+            results = [None] * len(samples)
+
+            def request(index):
+                with InferenceClient(server.address) as client:
+                    results[index] = client.infer_many(samples[index])
+
+            threads = [threading.Thread(target=request, args=(i,))
+                       for i in range(len(samples))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with InferenceClient(server.address) as client:
+                self.assertRaises(RuntimeError, client.infer,
+                                  numpy.zeros(7, numpy.float32))
+        for index, result in enumerate(results):
+            self.assertLess(numpy.fabs(numpy.array(result) -
+                                       expected[index]).max(), 1e-6)
+        self.assertGreaterEqual(server.stats.requests, 18)
+        self.assertGreater(server.stats.latency(99), 0)
+
+    def test_batching(self):
+        samples = self.rand.rand(4, 20).astype(numpy.float32)
+        # the minibatch is full before the latency expires
+        with InferenceServer(self.forwards, max_minibatch_size=4,
+                             max_latency=30) as server:
+            with InferenceClient(server.address) as client:
+                client.infer_many(samples)
+        self.assertEqual(server.stats.batches, 1)
+        self.assertEqual(server.stats.requests, 4)
+
+    def test_malformed_sample(self):
+        samples = self.rand.rand(2, 20).astype(numpy.float32)
+        with InferenceServer(self.forwards, max_minibatch_size=2,
+                             max_latency=30) as server:
+            expected = server.infer(samples)
+            with InferenceClient(server.address) as client:
+                conn = client._conn
+                conn.send((0, samples[0]))
+                conn.send((1, numpy.zeros(7, numpy.float32)))
+                conn.send((2, "abc"))
+                conn.send((3, samples[1]))
+                replies = {}
+                for _ in range(4):
+                    request_id, result, err = conn.recv()
+                    replies[request_id] = result, err
+        for request_id in 1, 2:
+            self.assertIsNone(replies[request_id][0])
+            self.assertIn("ValueError", replies[request_id][1])
+        for request_id, sample in (0, 0), (3, 1):
+            self.assertIsNone(replies[request_id][1])
+            self.assertLess(numpy.fabs(
+                replies[request_id][0] - expected[sample]).max(), 1e-6)
+
+    def test_failed_samples(self):
+        samples = self.rand.rand(2, 20).astype(numpy.float32)
+        with InferenceServer(self.forwards) as server:
+            expected = server.infer(samples)
+            with InferenceClient(server.address) as client:
+                with self.assertRaises(RuntimeError) as ctx:
+                    client.infer_many((numpy.zeros(5), samples[0],
+                                       numpy.ones(3)))
+                self.assertIn("2 of 3", str(ctx.exception))
+                result = client.infer(samples[1])
+        self.assertLess(numpy.fabs(result - expected[1]).max(), 1e-6)
+
+    def test_authkey(self):
+        with InferenceServer(self.forwards, authkey=b"secret") as server:
+            self.assertRaises(AuthenticationError, InferenceClient,
+                              server.address, authkey=b"wrong")
+            with InferenceClient(server.address,
+                                 authkey=server.authkey) as client:
+                client.infer(self.rand.rand(20).astype(numpy.float32))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -41,6 +41,21 @@ from veles.tests import AcceleratedTest, assign_backend
 import veles.znicz.kohonen as kohonen
 
 
+def reference_train(inp, weights, coords, sigma, gmult):
+    """One step of KohonenTrainer, one sample at a time as it used to run
+    on CPU.
+    """
+    gradients = numpy.zeros_like(weights)
+    winners = numpy.zeros(len(weights), numpy.int32)
+    for sample in inp:
+        winner = numpy.argmin(numpy.linalg.norm(weights - sample, axis=1))
+        winners[winner] += 1
+        dists = numpy.sum(numpy.square(coords - coords[winner]), axis=1)
+        gravity = numpy.exp(dists / (-2 * sigma * sigma))
+        gradients += gravity[:, None] * (sample - weights) * gmult
+    return weights + gradients, winners
+
+
 class TestKohonen(AcceleratedTest):
     ABSTRACT = True
 
@@ -123,6 +138,25 @@ class TestKohonen(AcceleratedTest):
         max_diff = numpy.fabs(self.total.ravel() - c.total.mem.ravel()).max()
         self.assertLess(max_diff, 0.0001, "Result differs by %.5f" % max_diff)
 
+    def test_forward_chunks(self):
+        for chunk_size in (1, 2, 3):
+            c = kohonen.KohonenForward(self.parent, total=True,
+                                       chunk_size=chunk_size)
+            c.input = Array()
+            c.input.mem = self.input[:]
+            c.weights = Array()
+            c.weights.mem = self.weights[:]
+            c.minibatch_size = 5
+            c.minibatch_offset = 5
+            c.batch_size = 10
+            c.initialize(device=self.device)
+
+            c.numpy_run()
+            c.minibatch_offset = 10
+            c.numpy_run()
+            self.assertEqual(self.output.tolist(), c.output.mem.tolist())
+            self.assertEqual(self.total.tolist(), c.total.mem.tolist())
+
     def test_forward_with_argmins(self):
         self.info("Will test KohonenForward unit forward pass")
         c = kohonen.KohonenForward(self.parent)
@@ -315,6 +349,32 @@ class TestKohonen(AcceleratedTest):
         self.assertLess(max_diff, 0.0001, "Result differs by %.6f" % max_diff)
 
 
+@assign_backend("numpy")
+class NumpyTestKohonen(AcceleratedTest):
+    def test_train_reference(self):
+        rand = numpy.random.RandomState(17)
+        inp = rand.rand(20, 6) - 0.5
+        weights = (rand.rand(12, 6) - 0.5) * 0.1
+        c = kohonen.KohonenTrainer(self.parent, shape=(4, 3))
+        c.input = Array(inp.copy())
+        c.weights.mem = weights.copy()
+        c.gradient_decay = lambda t: 0.5 / (1.0 + t)
+        c.initialize(device=self.device)
+        for _ in range(3):
+            c._coords.map_read()
+            expected, winners = reference_train(
+                inp, weights, c._coords.mem, c.gravity_radius,
+                c.gradient_multiplier)
+            c.winners.map_invalidate()
+            c.winners.mem[:] = 0
+            c.numpy_run()
+            c.weights.map_read()
+            c.winners.map_read()
+            self.assertLess(numpy.fabs(c.weights.mem - expected).max(), 1e-10)
+            self.assertEqual(c.winners.mem.tolist(), winners.tolist())
+            weights = expected
+
+
 @assign_backend("ocl")
 class OpenCLTestKohonen(TestKohonen):
     pass
@@ -41,6 +41,7 @@ import time
 
 from veles.config import root
 from veles.tests import AcceleratedTest, assign_backend
+from veles.znicz.loader.caffe import Datum
 from veles.znicz.loader.loader_lmdb import LMDBLoader
 
 
@@ -68,6 +69,57 @@ class TestLMDBLoader(AcceleratedTest):
         kwargs["use_cache"] = True
         self.lmdb_speed(kwargs)
 
+    def stub_datum(self, loader):
+        parsed = []
+
+        def get_datum(key):
+            parsed.append(key)
+            datum = Datum()
+            datum.label = key[1]
+            datum.height = datum.width = 2
+            datum.data = bytes(bytearray(range(12)))
+            return datum
+
+        loader.get_datum = get_datum
+        return parsed
+
+    def test_cache_lru(self):
+        loader = LMDBLoader(self.parent, db_shape=(2, 2, 3),
+                            db_splitted_channels=False, cache_size=24)
+        parsed = self.stub_datum(loader)
+        for key in ((2, 0), (2, 1), (2, 0), (2, 2), (2, 1), (2, 1)):
+            img = loader.get_image_data(key)
+            self.assertEqual(img.shape, (2, 2, 3))
+            self.assertEqual(loader.get_image_label(key), key[1])
+            img[:] = 0
+        self.assertEqual(loader.get_image_data((2, 1)).ravel().tolist(),
+                         list(range(12)))
+        self.assertEqual(parsed, [(2, 0), (2, 1), (2, 2), (2, 1)])
+        self.assertEqual(loader.cache_misses, 4)
+        self.assertEqual(loader.cache_evictions, 2)
+        self.assertEqual(loader.cache_hits, 9)
+
+    def test_cache_last(self):
+        loader = LMDBLoader(self.parent, db_shape=(2, 2, 3),
+                            db_splitted_channels=False, cache_size=0)
+        parsed = self.stub_datum(loader)
+        for key in ((2, 0), (2, 1)):
+            loader.get_image_data(key)
+            self.assertEqual(loader.get_image_label(key), key[1])
+        self.assertEqual(parsed, [(2, 0), (2, 1)])
+        self.assertEqual(loader.cache_evictions, 1)
+
+    def test_cache_unpickled(self):
+        loader = LMDBLoader(self.parent, db_shape=(2, 2, 3),
+                            db_splitted_channels=False)
+        # the loaders pickled before the LRU cache lack these
+        del loader.cache_size
+        del loader._cache_evictions
+        parsed = self.stub_datum(loader)
+        self.assertEqual(loader.get_image_label((2, 0)), 0)
+        self.assertEqual(parsed, [(2, 0)])
+        self.assertEqual(loader.cache_evictions, 0)
+
     def get_kwargs(self):
         data_path = os.path.join(
             root.common.dirs.datasets, "AlexNet/LMDB_old")
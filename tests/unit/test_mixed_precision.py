@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for the mixed precision mode of the CPU backend.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import logging
+import numpy
+import unittest
+
+from veles.backends import NumpyDevice
+from veles.config import root
+from veles.dummy import DummyWorkflow
+from veles.memory import Array
+from veles.znicz.gd import GradientDescent
+from veles.znicz.mixed_precision import LossScaler, compute_dtype, \
+    storage_dtype, store_minibatch_data
+
+
+class TestMixedPrecision(unittest.TestCase):
+    def setUp(self):
+        self.mixed_precision = root.common.engine.__content__.get(
+            "mixed_precision", False)
+
+    def tearDown(self):
+        root.common.engine.mixed_precision = self.mixed_precision
+
+    def test_dtypes(self):
+        root.common.engine.mixed_precision = False
+        self.assertEqual(storage_dtype(numpy.float32), numpy.float32)
+        root.common.engine.mixed_precision = True
+        self.assertEqual(storage_dtype(numpy.float32), numpy.float16)
+        self.assertEqual(storage_dtype(numpy.float64), numpy.float64)
+        self.assertEqual(compute_dtype(numpy.float16), numpy.float32)
+        self.assertEqual(compute_dtype(numpy.float64), numpy.float64)
+
+    def test_loss_scaler(self):
+        scaler = LossScaler(scale=8.0, growth_interval=2)
+        self.assertEqual(scaler.begin(), 8.0)
+        scaler.report(True)
+        scaler.report(False)
+        scaler.report(False)
+        self.assertEqual(scaler.begin(), 4.0)
+        self.assertEqual(scaler.overflows, 1)
+        self.assertEqual(scaler.begin(), 4.0)
+        self.assertEqual(scaler.begin(), 8.0)
+
+    def test_loss_scaler_protect(self):
+        scaler = LossScaler()
+        first, second = Array(numpy.ones(3)), Array(numpy.ones(2))
+        scaler.begin()
+        scaler.protect(first)
+        first.mem += 1
+        scaler.protect(first)
+        first.mem += 1
+        scaler.report(True)
+        scaler.protect(second)
+        second.mem += 1
+        self.assertFalse(scaler.overflowed)
+        scaler.report(False)
+        self.assertTrue(scaler.overflowed)
+        self.assertEqual(first.mem.tolist(), [1] * 3)
+        self.assertEqual(second.mem.tolist(), [1] * 2)
+        scaler.begin()
+        self.assertFalse(scaler.overflowed)
+        scaler.protect(first)
+        first.mem += 1
+        scaler.begin()
+        scaler.report(False)
+        self.assertEqual(first.mem.tolist(), [2] * 3)
+
+    def test_store_minibatch_data(self):
+        class Loader(object):
+            minibatch_data = Array(numpy.ones((2, 3), numpy.float32))
+
+        root.common.engine.mixed_precision = True
+        data = Loader.minibatch_data
+        store_minibatch_data(Loader)
+        self.assertIs(Loader.minibatch_data, data)
+        self.assertEqual(data.dtype, numpy.float16)
+        self.assertEqual(data.mem.tolist(), [[1] * 3] * 2)
+
+    def _create_gd(self, mixed, workflow=None, err_dtype=numpy.float32):
+        root.common.engine.mixed_precision = mixed
+        rand = numpy.random.RandomState(9)
+        gd = GradientDescent(workflow or DummyWorkflow(), learning_rate=0.1,
+                             gradient_moment=0.9)
+        for name, shape, dtype in (
+                ("input", (6, 10), numpy.float16 if mixed else numpy.float32),
+                ("output", (6, 4), numpy.float16 if mixed else numpy.float32),
+                ("err_output", (6, 4), err_dtype),
+                ("weights", (4, 10), numpy.float32),
+                ("bias", (4,), numpy.float32)):
+            array = Array()
+            array.mem = (rand.rand(*shape) - 0.5).astype(dtype)
+            setattr(gd, name, array)
+        gd.err_output.mem *= 1e-5
+        gd.initialize(device=NumpyDevice())
+        return gd
+
+    def test_gradient_descent(self):
+        gd = self._create_gd(False)
+        weights = gd.weights.mem.copy()
+        gd.numpy_run()
+        mixed = self._create_gd(True)
+        self.assertEqual(mixed.err_input.dtype, numpy.float16)
+        mixed.numpy_run()
+        scale = mixed.workflow.loss_scaler_.scale
+        err_input = mixed.err_input.mem.astype(numpy.float32) / scale
+        self.assertLess(numpy.fabs(err_input - gd.err_input.mem).max(),
+                        numpy.fabs(gd.err_input.mem).max() * 1e-2)
+        delta = numpy.fabs(gd.weights.mem - weights).max()
+        self.assertLess(numpy.fabs(mixed.weights.mem - gd.weights.mem).max(),
+                        delta * 1e-2)
+
+    def test_overflow(self):
+        gd = self._create_gd(True)
+        gd.err_output.mem = numpy.full(gd.err_output.shape, numpy.inf,
+                                       numpy.float16)
+        weights = gd.weights.mem.copy()
+        gd.numpy_run()
+        self.assertEqual(gd.weights.mem.tolist(), weights.tolist())
+        scaler = gd.workflow.loss_scaler_
+        scale = scaler.scale
+        self.assertEqual(scaler.begin(), scale / 2)
+
+    def test_overflow_skips_step(self):
+        workflow = DummyWorkflow()
+        last = self._create_gd(True, workflow)
+        first = self._create_gd(True, workflow, numpy.float16)
+        first.err_output.mem[0, 0] = numpy.inf
+        weights = last.weights.mem.copy(), first.weights.mem.copy()
+        bias = last.bias.mem.copy(), first.bias.mem.copy()
+        last.numpy_run()
+        self.assertNotEqual(last.weights.mem.tolist(), weights[0].tolist())
+        first.numpy_run()
+        self.assertTrue(workflow.loss_scaler_.overflowed)
+        for gd, w, b in zip((last, first), weights, bias):
+            self.assertEqual(gd.weights.mem.tolist(), w.tolist())
+            self.assertEqual(gd.bias.mem.tolist(), b.tolist())
+            self.assertFalse(gd.gradient_weights_with_moment.mem.any())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
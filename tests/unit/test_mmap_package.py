@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for the local inference server.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import json
+import numpy
+import os
+import shutil
+import tempfile
+import unittest
+
+from veles.backends import NumpyDevice
+from veles.dummy import DummyWorkflow
+from veles.error import BadFormatError
+from veles.memory import Array
+from veles.znicz.all2all import All2AllTanh
+from veles.znicz import mmap_package
+
+
+class TestMmapPackage(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix="test-mmap-package-")
+        self.input = numpy.random.RandomState(7).rand(5, 9).astype(
+            numpy.float32)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def create_unit(self):
+        unit = All2AllTanh(DummyWorkflow(), output_sample_shape=[6])
+        unit.input = Array(self.input.copy())
+        return unit
+
+    def test_aligned_npy(self):
+        array = numpy.arange(30, dtype=numpy.float64).reshape(5, 6)
+        file_name = os.path.join(self.path, "array.npy")
+        mmap_package.write_aligned_npy(file_name, array)
+        self.assertEqual(
+            (os.path.getsize(file_name) - array.nbytes) %
+            mmap_package.ALIGNMENT, 0)
+        loaded = numpy.load(file_name, mmap_mode="r")
+        self.assertEqual(loaded.tolist(), array.tolist())
+        self.assertEqual(loaded.ctypes.data % mmap_package.ALIGNMENT, 0)
+
+    def test_export_load(self):
+        unit = self.create_unit()
+        unit.initialize(device=NumpyDevice())
+        unit.run()
+        unit.output.map_read()
+        mmap_package.export_package(self.path, [unit], layers=[
+            {"type": "all2all_tanh", "->": {"output_sample_shape": 6}}])
+        with open(os.path.join(self.path, mmap_package.CONTENTS)) as fin:
+            contents = json.load(fin)
+        self.assertEqual(contents["units"][0]["data"]["weights"],
+                         "@0_weights")
+        self.assertEqual(contents["layers"][0]["type"], "all2all_tanh")
+
+        loaded = self.create_unit()
+        mmap_package.load_package(self.path, [loaded])
+        for attr in ("weights", "bias"):
+            mem = getattr(loaded, attr).mem
+            self.assertIsInstance(mem, numpy.memmap)
+            self.assertFalse(mem.flags.writeable)
+            self.assertEqual(mem.ctypes.data % mmap_package.ALIGNMENT, 0)
+            self.assertEqual(mem.tolist(), getattr(unit, attr).mem.tolist())
+        loaded.initialize(device=NumpyDevice())
+        loaded.run()
+        loaded.output.map_read()
+        self.assertEqual(loaded.output.mem.tolist(), unit.output.mem.tolist())
+
+    def test_mismatch(self):
+        unit = self.create_unit()
+        unit.initialize(device=NumpyDevice())
+        mmap_package.export_package(self.path, [unit])
+        self.assertRaises(BadFormatError, mmap_package.load_package,
+                          self.path, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
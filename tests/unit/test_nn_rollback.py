@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for NNRollback.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import numpy
+import unittest
+
+from veles.dummy import DummyWorkflow
+from veles.memory import Array
+from veles.znicz.nn_rollback import NNRollback
+
+
+class FakeGD(object):
+    def __init__(self, rand):
+        self.learning_rate = self.learning_rate_bias = 0.1
+        self.weights = Array(rand.rand(3, 4))
+        self.bias = Array(rand.rand(3))
+        self.gradient_weights_with_moment = Array(rand.rand(3, 4))
+        self.gradient_bias_with_moment = Array(rand.rand(3))
+
+
+class TestNNRollback(unittest.TestCase):
+    def setUp(self):
+        self.parent = DummyWorkflow()
+
+    def tearDown(self):
+        del self.parent
+
+    def test_rollback(self):
+        gd = FakeGD(numpy.random.RandomState(7))
+        rollback = NNRollback(self.parent, minus_steps=1)
+        rollback.add_gd(gd)
+        rollback.improved = True
+        rollback.run()
+        stored = [array.mem.copy() for array in (
+            gd.weights, gd.bias, gd.gradient_weights_with_moment,
+            gd.gradient_bias_with_moment)]
+        for array in (gd.weights, gd.gradient_weights_with_moment):
+            array.map_write()
+            array.mem[:] = numpy.nan
+        self.assertGreater(rollback.calculate_nans(), 0)
+        rollback.improved = False
+        rollback.run()
+        for array, mem in zip((gd.weights, gd.bias,
+                               gd.gradient_weights_with_moment,
+                               gd.gradient_bias_with_moment), stored):
+            array.map_read()
+            self.assertEqual(array.mem.tolist(), mem.tolist())
+        self.assertAlmostEqual(gd.learning_rate,
+                               0.1 * rollback.lr_plus * rollback.lr_minus)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -34,12 +34,15 @@ under the License.
 
 
 import logging
+import numpy
 import unittest
 from zope.interface import implementer
 
 from veles.accelerated_units import IOpenCLUnit, ICUDAUnit, INumpyUnit
 from veles.dummy import DummyWorkflow
-from veles.znicz.nn_units import Forward, NNSnapshotterToFile
+from veles.memory import Array
+from veles.znicz.nn_units import Forward, NNSnapshotterToFile, \
+    NNWorkflow, ParameterStore
 
 
 @implementer(IOpenCLUnit, ICUDAUnit, INumpyUnit)
@@ -74,6 +77,97 @@ class Test(unittest.TestCase):
         nns.run()
 
 
+class TestParameterStore(unittest.TestCase):
+    def setUp(self):
+        self.parent = DummyWorkflow()
+        rand = numpy.random.RandomState(3)
+        self.units = []
+        for shape in ((4, 6), (3, 4), (2, 3)):
+            unit = TrivialForward(self.parent)
+            unit.weights = Array(rand.rand(*shape))
+            unit.bias = Array(rand.rand(shape[0]))
+            self.units.append(unit)
+        self.store = ParameterStore(lambda: self.units)
+
+    def tearDown(self):
+        del self.parent
+
+    def test_pack(self):
+        originals = [array.mem.copy() for array in (
+            self.units[0].weights, self.units[0].bias, self.units[1].weights,
+            self.units[1].bias, self.units[2].weights, self.units[2].bias)]
+        self.assertTrue(self.store.is_packed)
+        self.assertEqual(self.store.size, 51)
+        values = self.store.values
+        self.assertEqual(values.ctypes.data % ParameterStore.ALIGNMENT, 0)
+        self.assertEqual(self.store.layout, (
+            (0, "weights"), (0, "bias"), (1, "weights"), (1, "bias"),
+            (2, "weights"), (2, "bias")))
+        self.assertEqual(values.tolist(), numpy.concatenate(
+            [mem.ravel() for mem in originals]).tolist())
+        for array in self.store.arrays:
+            self.assertTrue(numpy.shares_memory(array.mem, values))
+        self.assertIs(self.store.units[0], self.units[0])
+
+    def test_get_set(self):
+        values = self.store.get()
+        self.store.set(values * 2)
+        self.assertEqual(self.units[1].bias.mem.tolist(),
+                         (values[40:43] * 2).tolist())
+        self.assertEqual(self.store.diff(values).tolist(), values.tolist())
+
+    def test_set_permuted(self):
+        values = self.store.get()
+        layout = tuple(reversed(self.store.layout))
+        permuted = numpy.concatenate([
+            getattr(self.units[index], attr).mem.ravel()
+            for index, attr in layout]) + 1
+        self.store.set(permuted, layout)
+        self.assertEqual(self.store.get().tolist(), (values + 1).tolist())
+
+    def test_repack(self):
+        values = self.store.get()
+        self.units[2].weights.reset(numpy.zeros((2, 3)))
+        packed = self.store.values
+        self.assertTrue(numpy.shares_memory(
+            self.units[2].weights.mem, packed))
+        values[43:49] = 0
+        self.assertEqual(self.store.get().tolist(), values.tolist())
+
+    def test_unit_data(self):
+        unit = TrivialForward(self.parent)
+        unit.apply_data_from_master(
+            self.units[1].generate_data_for_slave(None))
+        self.assertEqual(unit.weights.mem.tolist(),
+                         self.units[1].weights.mem.tolist())
+        self.assertEqual(unit.bias.mem.tolist(),
+                         self.units[1].bias.mem.tolist())
+
+    def test_workflow_parameters(self):
+        workflows = []
+        for factor in (1, 2):
+            workflow = NNWorkflow(self.parent)
+            for unit in self.units:
+                copy = TrivialForward(workflow)
+                copy.weights = Array(unit.weights.mem * factor)
+                copy.bias = Array(unit.bias.mem * factor)
+                workflow.forwards.append(copy)
+            workflows.append(workflow)
+        layout, values = workflows[1].export_parameters()
+        self.assertEqual(layout[0], (0, "weights"))
+        workflows[0].import_parameters((layout, values))
+        for unit, copy in zip(self.units, workflows[0].forwards):
+            self.assertEqual(copy.bias.mem.tolist(),
+                             (unit.bias.mem * 2).tolist())
+
+    def test_package_batch_size(self):
+        self.assertNotIn("batch_size", self.units[0].package_export())
+        workflow = NNWorkflow(self.parent, package_batch_size=16)
+        unit = TrivialForward(workflow)
+        unit.weights = self.units[0].weights
+        self.assertEqual(unit.package_export()["batch_size"], 16)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     unittest.main()
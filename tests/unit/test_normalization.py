@@ -43,6 +43,33 @@ from veles.tests import AcceleratedTest, assign_backend
 from veles.znicz.normalization import LRNormalizerForward, LRNormalizerBackward
 
 
+def reference_subsums(h, n):
+    """The window sums of the channels computed one channel at a time.
+    """
+    result = numpy.empty_like(h)
+    chans = h.shape[3]
+    for i in range(chans):
+        result[:, :, :, i] = h[:, :, :, max(0, i - n // 2):
+                               min(i + n // 2, chans - 1) + 1].sum(axis=3)
+    return result
+
+
+def reference_backward(h, err_y, alpha, beta, k, n):
+    """The per-channel loop which LRNormalizerBackward used to run.
+    """
+    subsums = reference_subsums(numpy.square(h), n) * alpha + k
+    powered = numpy.power(subsums, beta + 1)
+    err_h = numpy.zeros_like(h)
+    chans = h.shape[3]
+    for i in range(chans):
+        for j in range(max(0, i - n // 2), min(i + n // 2, chans - 1) + 1):
+            dh = -2 * beta * alpha * h[:, :, :, i] * h[:, :, :, j]
+            if i == j:
+                dh += subsums[:, :, :, j]
+            err_h[:, :, :, i] += dh * err_y[:, :, :, j] / powered[:, :, :, j]
+    return err_h
+
+
 class TestNormalization(AcceleratedTest):
     ABSTRACT = True
 
@@ -118,6 +145,42 @@ class TestNormalization(AcceleratedTest):
         self.info("BackProp done.")
 
 
+@assign_backend("numpy")
+class NumpyTestNormalization(AcceleratedTest):
+    def setUp(self):
+        super(NumpyTestNormalization, self).setUp()
+        rand = numpy.random.RandomState(13)
+        self.h = rand.rand(3, 4, 5, 11) * 20 - 10
+        self.err_y = rand.rand(*self.h.shape) - 0.5
+
+    def test_forward_reference(self):
+        fwd = LRNormalizerForward(self.parent, n=5, alpha=0.01, beta=0.75,
+                                  k=2)
+        fwd.input = Array(self.h.copy())
+        fwd.initialize(device=self.device)
+        fwd.numpy_run()
+        fwd.output.map_read()
+        expected = self.h / numpy.power(
+            reference_subsums(numpy.square(self.h), 5) * 0.01 + 2, 0.75)
+        self.assertLess(numpy.fabs(fwd.output.mem - expected).max(), 1e-10)
+        self.assertEqual(fwd.input.mem.tolist(), self.h.tolist())
+
+    def test_backward_reference(self):
+        for n in (3, 5, 15):
+            back = LRNormalizerBackward(self.parent, n=n, alpha=0.01,
+                                        beta=0.75, k=2)
+            back.input = Array(self.h.copy())
+            back.err_output = Array(self.err_y.copy())
+            back.initialize(device=self.device)
+            back.numpy_run()
+            back.err_input.map_read()
+            expected = reference_backward(self.h, self.err_y, 0.01, 0.75, 2,
+                                          n)
+            self.assertLess(
+                numpy.fabs(back.err_input.mem - expected).max(), 1e-10,
+                "n = %d" % n)
+
+
 @assign_backend("ocl")
 class OpenCLTestNormalization(TestNormalization):
     pass
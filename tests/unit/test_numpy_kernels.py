@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import logging
+import numpy
+import unittest
+
+from veles.znicz.numpy_kernels import ConvolutionUnpacker, \
+    MinibatchShards, PoolingWindows, ScratchPool, \
+    apply_bias_with_activation, softmax
+
+
+class TestConvolutionUnpacker(unittest.TestCase):
+    def setUp(self):
+        self.rand = numpy.random.RandomState(13)
+
+    @staticmethod
+    def _unpack_naive(images, kx, ky, padding, sliding):
+        batch, sy, sx, n_channels = images.shape
+        full = numpy.zeros((batch, padding[1] + sy + padding[3],
+                            padding[0] + sx + padding[2], n_channels),
+                           dtype=images.dtype)
+        full[:, padding[1]:padding[1] + sy,
+             padding[0]:padding[0] + sx] = images
+        ny = (full.shape[1] - ky) // sliding[1] + 1
+        nx = (full.shape[2] - kx) // sliding[0] + 1
+        rows = []
+        for b in range(batch):
+            for i in range(ny):
+                for j in range(nx):
+                    rows.append(full[b, i * sliding[1]:i * sliding[1] + ky,
+                                     j * sliding[0]:j * sliding[0] + kx]
+                                .ravel())
+        return numpy.array(rows)
+
+    def _check_unpack(self, shape, kx, ky, padding, sliding):
+        images = self.rand.rand(*shape)
+        unpacker = ConvolutionUnpacker(
+            shape[1:], kx, ky, padding, sliding, shape[0], images.dtype)
+        gold = self._unpack_naive(images, kx, ky, padding, sliding)
+        self.assertEqual(unpacker.kernel_app_per_image * shape[0],
+                         gold.shape[0])
+        for _ in range(2):
+            unpacked = unpacker.unpack(images)
+            self.assertLess(numpy.fabs(unpacked - gold).max(), 1e-12)
+
+    def test_pack(self):
+        for shape, kx, ky, padding, sliding in (
+                ((3, 7, 9, 3), 3, 4, (0, 0, 0, 0), (1, 1)),
+                ((2, 7, 9, 3), 3, 4, (2, 3, 1, 2), (2, 3)),
+                ((4, 5, 5, 1), 5, 5, (2, 2, 2, 2), (2, 2))):
+            images = self.rand.rand(*shape)
+            unpacker = ConvolutionUnpacker(
+                shape[1:], kx, ky, padding, sliding, shape[0], images.dtype)
+            unpacked = self.rand.rand(
+                shape[0] * unpacker.kernel_app_per_image,
+                unpacker.kernel_size)
+            packed = numpy.zeros_like(images)
+            unpacker.pack(unpacked, packed)
+            # col2im is the adjoint of im2col: <im2col(x), y> = <x, col2im(y)>
+            self.assertAlmostEqual(
+                numpy.sum(unpacker.unpack(images) * unpacked),
+                numpy.sum(images * packed), places=10)
+
+    def test_unpack(self):
+        self._check_unpack((3, 7, 9, 3), 3, 4, (0, 0, 0, 0), (1, 1))
+        self._check_unpack((2, 7, 9, 3), 3, 4, (2, 3, 1, 2), (2, 3))
+        self._check_unpack((4, 5, 5, 1), 5, 5, (2, 2, 2, 2), (2, 2))
+
+
+class TestActivations(unittest.TestCase):
+    GOLD = {
+        "ACTIVATION_LINEAR": lambda y: y,
+        "ACTIVATION_TANH": lambda y: numpy.tanh(y * 0.6666) * 1.7159,
+        "ACTIVATION_RELU": lambda y: numpy.where(
+            y > 15, y, numpy.log(numpy.exp(y) + 1)),
+        "ACTIVATION_STRICT_RELU": lambda y: numpy.where(y > 0, y, 0),
+        "ACTIVATION_SIGMOID": lambda y: 1.0 / (1.0 + numpy.exp(-y)),
+    }
+
+    def test_apply_bias_with_activation(self):
+        rand = numpy.random.RandomState(7)
+        for dtype in (numpy.float32, numpy.float64):
+            output = (rand.rand(4, 3, 5, 6) * 40 - 20).astype(dtype)
+            bias = (rand.rand(6) * 4 - 2).astype(dtype)
+            for mode, gold in sorted(self.GOLD.items()):
+                for b in (bias, None):
+                    mem = output.copy()
+                    apply_bias_with_activation(mem, b, mode)
+                    expected = gold(output + (b if b is not None else 0))
+                    self.assertEqual(mem.dtype, dtype)
+                    self.assertLess(
+                        numpy.fabs(mem - expected).max(),
+                        1e-5 if dtype == numpy.float32 else 1e-12, mode)
+
+    def test_softmax(self):
+        output = numpy.random.RandomState(3).rand(6, 9) * 100
+        gold = numpy.exp(output - output.max(axis=1)[:, None])
+        gold /= gold.sum(axis=1)[:, None]
+        max_idx = numpy.zeros(6, dtype=numpy.int32)
+        softmax(output, max_idx)
+        self.assertLess(numpy.fabs(output - gold).max(), 1e-12)
+        self.assertEqual(max_idx.tolist(), gold.argmax(axis=1).tolist())
+
+
+class TestPoolingWindows(unittest.TestCase):
+    def test_partial_windows(self):
+        images = numpy.arange(2 * 5 * 8 * 3, dtype=numpy.float64).reshape(
+            2, 5, 8, 3)
+        windows = PoolingWindows(images.shape, 3, 2, (2, 2), 4, 3,
+                                 images.dtype, -numpy.inf)
+        self.assertEqual(windows.counts.ravel().tolist(),
+                         [6, 6, 6, 4, 6, 6, 6, 4, 3, 3, 3, 2])
+        cuts = windows.cuts(images)
+        offsets = numpy.zeros((2, 3, 4, 3), dtype=numpy.int32)
+        windows.offsets(cuts.argmax(axis=-1), offsets)
+        # the maximum is always the bottom right real element of the window
+        gold = numpy.zeros_like(offsets)
+        for i in range(3):
+            for j in range(4):
+                gold[:, i, j] = images[:, min(i * 2 + 2, 5) - 1,
+                                       min(j * 2 + 3, 8) - 1]
+        self.assertEqual(numpy.take(images, offsets).tolist(),
+                         gold.tolist())
+        output = numpy.zeros(offsets.shape)
+        PoolingWindows(images.shape, 3, 2, (2, 2), 4, 3,
+                       images.dtype).sum(images, output)
+        self.assertEqual(output[0, 2, 3, 0], images[0, 4, 6:8, 0].sum())
+
+    def test_spread(self):
+        # spread() must be the adjoint of sum(): <sum(a), b> == <a, spread(b)>
+        prng = numpy.random.RandomState(7)
+        a = prng.rand(3, 6, 9, 2)
+        b = prng.rand(3, 3, 4, 2)
+        windows = PoolingWindows(a.shape, 3, 3, (2, 2), 4, 3, a.dtype)
+        summed = numpy.zeros_like(b)
+        windows.sum(a, summed)
+        spread = numpy.zeros_like(a)
+        windows.spread(b, spread)
+        self.assertAlmostEqual((summed * b).sum(), (a * spread).sum())
+        self.assertEqual(spread[0, 5, 8, 0], b[0, 2, 3, 0])
+
+
+class TestMinibatchShards(unittest.TestCase):
+    def setUp(self):
+        self.shards = MinibatchShards(4)
+
+    def tearDown(self):
+        self.shards.close()
+
+    def test_bounds(self):
+        big = MinibatchShards.MIN_SHARD_SIZE
+        self.assertEqual(self.shards.bounds(10, big),
+                         [(0, 2), (2, 5), (5, 7), (7, 10)])
+        self.assertEqual(self.shards.bounds(3, big), [(0, 1), (1, 2), (2, 3)])
+        self.assertEqual(self.shards.bounds(10), [(0, 10)])
+        self.assertEqual(MinibatchShards(1).bounds(10, big), [(0, 10)])
+
+    def test_map(self):
+        rows = numpy.random.RandomState(7).rand(1 << 10, 1 << 6)
+        sums = self.shards.map(lambda start, stop: rows[start:stop].sum(),
+                               rows.shape[0], rows.shape[1])
+        self.assertEqual(len(sums), 4)
+        self.assertAlmostEqual(sum(sums), rows.sum())
+        self.assertEqual(sums, self.shards.map(
+            lambda start, stop: rows[start:stop].sum(), rows.shape[0],
+            rows.shape[1]))
+
+    def test_nested(self):
+        def outer(start, stop):
+            return self.shards.map(lambda *bounds: bounds, stop - start,
+                                   MinibatchShards.MIN_SHARD_SIZE)
+
+        self.assertEqual(self.shards.map(
+            outer, 8, MinibatchShards.MIN_SHARD_SIZE),
+            [[(0, 2)], [(0, 2)], [(0, 2)], [(0, 2)]])
+
+
+class TestScratchPool(unittest.TestCase):
+    def test_get(self):
+        pool = ScratchPool()
+        buf = pool.get("a", (3, 4), numpy.float32)
+        self.assertEqual(buf.shape, (3, 4))
+        self.assertIs(pool.get("a", [3, 4], "float32"), buf)
+        self.assertIsNot(pool.get("b", (3, 4), numpy.float32), buf)
+        self.assertEqual(pool.nbytes, 2 * buf.nbytes)
+        other = pool.get("a", (3, 4), numpy.float64)
+        self.assertIsNot(other, buf)
+        self.assertEqual(other.dtype, numpy.float64)
+        pool.clear()
+        self.assertEqual(pool.nbytes, 0)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
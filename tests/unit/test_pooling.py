@@ -120,6 +120,22 @@ class TestMaxPooling(AcceleratedTest):
         c.input_offset.map_read()
         self.assertTrue((c.input_offset.mem == self._gold_offs).all())
 
+    def test_max_device_vs_cpu(self):
+        inp = numpy.zeros([3, 13, 11, 4], dtype=self._dtype)
+        prng.get().fill(inp)
+        results = []
+        for device in (self.device, NumpyDevice()):
+            c = pooling.MaxPooling(self.parent, kx=3, ky=3, sliding=(2, 2))
+            c.input = Array(inp.copy())
+            c.initialize(device=device)
+            c.run()
+            c.output.map_read()
+            c.input_offset.map_read()
+            results.append((c.output.mem.copy(), c.input_offset.mem.copy()))
+        (a, b), (c, d) = results
+        self.assertEqual(numpy.count_nonzero(a - c), 0)
+        self.assertEqual(numpy.count_nonzero(b - d), 0)
+
 
 class TestStochasticPooling(AcceleratedTest):
     ABSTRACT = True
@@ -237,6 +253,26 @@ class TestGDMaxPooling(AcceleratedTest):
         # We cannot check by numeric differentiation here
         # 'cause of the non-differentiable function "max".
 
+    def test_overlapping_cpu(self):
+        # sliding is less than the window, so offsets are repeated
+        c = gd_pooling.GDMaxPooling(self.parent)
+        c.link_pool_attrs(DummyUnit(kx=2, ky=2, sliding=(1, 1)))
+        c.input = Array()
+        c.input.mem = self._input[:1].copy()
+        c.input_offset = Array()
+        c.input_offset.mem = numpy.array(
+            [8, 8, 5, 5, 6, 6] * 4, dtype=numpy.int32).reshape(1, 4, 6, 1)
+        c.err_output = Array()
+        c.err_output.mem = numpy.arange(
+            24, dtype=self._dtype).reshape(1, 4, 6, 1)
+        c.initialize(device=NumpyDevice())
+        c.run()
+        c.err_input.map_read()
+        gold = numpy.zeros(c.input.size, dtype=self._dtype)
+        numpy.add.at(gold, c.input_offset.mem.ravel(),
+                     c.err_output.mem.ravel())
+        self.assertEqual(c.err_input.mem.ravel().tolist(), gold.tolist())
+
 
 class TestAvgPooling(AcceleratedTest):
     ABSTRACT = True
@@ -454,5 +490,6 @@ class OpenCLTestStochasticPoolingDepooling(TestStochasticPoolingDepooling):
 class CUDATestStochasticPoolingDepooling(TestStochasticPoolingDepooling):
     pass
 
+
 if __name__ == "__main__":
     AcceleratedTest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+.. invisible:
+     _   _ _____ _     _____ _____
+    | | | |  ___| |   |  ___/  ___|
+    | | | | |__ | |   | |__ \ `--.
+    | | | |  __|| |   |  __| `--. \
+    \ \_/ / |___| |___| |___/\__/ /
+     \___/\____/\_____|____/\____/
+
+Created on Oct 16, 2026
+
+Unit test for int8 post-training quantization.
+
+███████████████████████████████████████████████████████████████████████████████
+
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+███████████████████████████████████████████████████████████████████████████████
+"""
+
+
+import numpy
+import unittest
+
+from veles.backends import NumpyDevice
+from veles.dummy import DummyWorkflow
+from veles.memory import Array
+from veles.znicz.all2all import All2AllTanh
+from veles.znicz.quantization import Int8Weights, input_scale, \
+    quantize_weights
+
+
+class TestQuantization(unittest.TestCase):
+    def setUp(self):
+        self.rand = numpy.random.RandomState(7)
+
+    def test_quantize_weights(self):
+        weights = (self.rand.rand(4, 30) - 0.5).astype(numpy.float32)
+        weights[2] *= 100
+        weights[3] = 0
+        quantized, scales = quantize_weights(weights)
+        self.assertEqual(quantized.dtype, numpy.int8)
+        self.assertEqual(scales.shape, (4,))
+        self.assertEqual(numpy.abs(quantized[:3]).max(axis=1).tolist(),
+                         [127] * 3)
+        self.assertEqual(quantized[3].tolist(), [0] * 30)
+        error = numpy.fabs(quantized * scales[:, numpy.newaxis] - weights)
+        self.assertTrue((error <= scales[:, numpy.newaxis] / 2 + 1e-7).all())
+        transposed, tscales = quantize_weights(weights.transpose().copy(),
+                                               transposed=True)
+        self.assertEqual(transposed.tolist(), quantized.tolist())
+        self.assertEqual(tscales.tolist(), scales.tolist())
+
+    def test_input_scale(self):
+        self.assertAlmostEqual(input_scale((-2.54, 1.0)), 0.02)
+        self.assertEqual(input_scale((0, 0)), 1.0)
+
+    def test_dot(self):
+        weights = (self.rand.rand(8, 50) - 0.5).astype(numpy.float32)
+        inputs = (self.rand.rand(16, 50) * 2 - 1).astype(numpy.float32)
+        int8 = Int8Weights(weights, False, (inputs.min(), inputs.max()))
+        out = numpy.empty((16, 8), numpy.float32)
+        int8.dot(inputs, out, numpy.empty_like(inputs))
+        expected = numpy.dot(inputs, weights.transpose())
+        self.assertLess(numpy.fabs(out - expected).max(),
+                        numpy.fabs(expected).max() * 0.02)
+        exported = int8.package_export()
+        self.assertEqual(exported["int8_weights"].dtype, numpy.int8)
+        self.assertEqual(exported["weights_scales"].shape, (8,))
+
+    def test_all2all(self):
+        unit = All2AllTanh(DummyWorkflow(), output_sample_shape=[10])
+        unit.input = Array(
+            (self.rand.rand(20, 40) - 0.5).astype(numpy.float32))
+        unit.initialize(device=NumpyDevice())
+        unit.numpy_run()
+        expected = unit.output.mem.copy()
+        unit.quantize((unit.input.mem.min(), unit.input.mem.max()))
+        unit.numpy_run()
+        self.assertLess(numpy.fabs(unit.output.mem - expected).max(), 0.02)
+        data = unit.package_export()
+        self.assertNotIn("weights", data)
+        self.assertEqual(data["int8_weights"].shape, (10, 40))
+        self.assertIn("bias", data)
+
+
+if __name__ == "__main__":
+    unittest.main()